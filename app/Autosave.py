@@ -0,0 +1,160 @@
+"""
+A periodic autosave which writes on a background thread.
+
+Every few turns or seconds, the game thread only takes a snapshot of the
+game, a few microseconds, and hands it over. A writer thread encodes and
+compresses the save and replaces the autosave file atomically: it writes
+a temporary file of its own, syncs it and renames it over the previous
+autosave, so the autosave on disk is always a whole save. The writer only
+keeps the latest snapshot: a snapshot handed over while the previous one
+is still waiting to be written replaces it.
+
+The autosave is read by load_game_file like any other save.
+"""
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.GameCodec import COMPRESSED_EXTENSION, compress_save, encode_snapshot
+
+
+def autosave_name(game_id: str) -> str:
+    """
+    :param game_id: The id of the game, so that the games played at the same time have their own autosave.
+    :return: The name of the autosave of the game in the saved_games folder.
+    """
+    return f'autosave_{game_id}{COMPRESSED_EXTENSION}'
+
+
+class Autosaver:
+    """
+    Saves a game periodically, attached to it as game.autosave.
+    """
+
+    def __init__(self, path, game, every_turns: Optional[int] = 10, every_seconds: Optional[float] = 30.0,
+                 level: int = 6):
+        """
+        Start saving a game.
+        :param path: The path of the autosave.
+        :param game: The game.
+        :param every_turns: The number of turns between saves, or None.
+        :param every_seconds: The number of seconds between saves, or None.
+        :param level: The zlib compression level.
+        """
+        if every_turns is None and every_seconds is None:
+            raise ValueError('An autosave needs a number of turns or seconds')
+        if (every_turns is not None and every_turns < 1) or (every_seconds is not None and every_seconds <= 0):
+            raise ValueError(f'Invalid autosave interval: {every_turns} turns, {every_seconds} seconds')
+
+        self.path = Path(path)
+        self.every_turns = every_turns
+        self.every_seconds = every_seconds
+        self.level = level
+
+        # when the next save is due
+        self.__turns = 0
+        self.__deadline = None
+
+        # the snapshot waiting for the writer, if any, and the game it was taken from
+        self.__condition = threading.Condition()
+        self.__pending: Optional[tuple] = None
+        self.__game = game
+        self.__closed = False
+
+        # statistics: the snapshots handed over, written and replaced before being written,
+        # and the time the game thread spent on them
+        self.saved = 0
+        self.written = 0
+        self.dropped = 0
+        self.save_time_ns = 0
+        # the last error of the writer, raised by close
+        self.error: Optional[Exception] = None
+
+        self.__reset()
+        self.__writer = threading.Thread(target=self.__write_saves, name='autosave', daemon=True)
+        self.__writer.start()
+        game.autosave = self
+
+    def __reset(self):
+        self.__turns = 0
+        if self.every_seconds is not None:
+            self.__deadline = time.monotonic() + self.every_seconds
+
+    def record(self, game):
+        """
+        Count the turn which has just been played, and save the game if it is due.
+        :param game: The game.
+        """
+        self.__turns += 1
+        if (self.every_turns is not None and self.__turns >= self.every_turns) or \
+                (self.__deadline is not None and time.monotonic() >= self.__deadline):
+            self.save(game)
+
+    def save(self, game):
+        """
+        Hand the current state of the game over to the writer.
+        :param game: The game.
+        """
+        start = time.perf_counter_ns()
+        snapshot = game.snapshot(with_random=False)
+        with self.__condition:
+            if self.__pending is not None:
+                # the writer has not taken the previous one yet, so it is not waiting
+                self.dropped += 1
+            else:
+                self.__condition.notify()
+            self.__pending = snapshot
+        self.__reset()
+        self.saved += 1
+        self.save_time_ns += time.perf_counter_ns() - start
+
+    def __write_saves(self):
+        """
+        Write the saves handed over, until the autosave is closed.
+        """
+        while True:
+            with self.__condition:
+                while self.__pending is None and not self.__closed:
+                    self.__condition.wait()
+                if self.__pending is None:
+                    return
+                snapshot = self.__pending
+                self.__pending = None
+
+            try:
+                self.__write(compress_save(encode_snapshot(self.__game, snapshot), self.level))
+                self.written += 1
+            except Exception as error:
+                # keep playing, the next save may succeed
+                self.error = error
+
+    def __write(self, data: bytes):
+        # a temporary file of its own, so that two autosavers of the same path never write to the same one
+        descriptor, temporary_path = tempfile.mkstemp(prefix=self.path.name + '.', suffix='.tmp',
+                                                      dir=self.path.parent)
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+    def close(self, game=None):
+        """
+        Wait for the last save to be written, and stop the writer.
+        :param game: The game to save a last time, if any.
+        """
+        if game is not None:
+            self.save(game)
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify()
+        self.__writer.join()
+        if self.error is not None:
+            raise self.error
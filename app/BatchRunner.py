@@ -0,0 +1,154 @@
+"""
+Run large numbers of complete, unattended games in parallel.
+
+Games are split into chunks of consecutive game indexes, and each chunk
+is played by one worker of a process pool. Every game draws from its own
+random streams, derived from the batch seed and its index, so any single
+game of a batch can be replayed on its own.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.DecisionProvider import DecisionProvider, AlwaysBuyProvider, NeverBuyProvider, ThresholdBuyProvider, \
+    RandomDecisionProvider
+from app.EventSink import NullEventSink
+from app.ExpectimaxDecisionProvider import ExpectimaxDecisionProvider
+from app.Game import Game
+from app.MctsDecisionProvider import MctsDecisionProvider
+from app.PolicyTable import PolicyTableProvider
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+
+
+class GameSummary(NamedTuple):
+    """
+    The outcome of a single simulated game.
+    """
+    game_index: int
+    # the seed of the batch
+    seed: int
+    # tokens of the winners
+    winners: Tuple[str, ...]
+    rounds: int
+    # in seat order
+    balances: Tuple[int, ...]
+    # the positions of the properties owned by each player, in seat order
+    properties: Tuple[Tuple[int, ...], ...]
+
+
+def make_provider(policy: str, rng: Random) -> DecisionProvider:
+    """
+    Create a bot from its policy name.
+    :param policy: One of 'always', 'never', 'random', 'threshold[:reserve]', 'mcts[:iterations]',
+    'expectimax[:depth]' or 'table'.
+    :param rng: The generator used by random bots.
+    :return: The decision provider.
+    """
+    name, _, argument = policy.partition(':')
+    if name == 'always':
+        return AlwaysBuyProvider()
+    if name == 'never':
+        return NeverBuyProvider()
+    if name == 'random':
+        return RandomDecisionProvider(rng=rng)
+    if name == 'threshold':
+        return ThresholdBuyProvider(reserve=int(argument)) if argument else ThresholdBuyProvider()
+    if name == 'mcts':
+        return MctsDecisionProvider(iterations=int(argument), rng=rng) if argument else MctsDecisionProvider(rng=rng)
+    if name == 'expectimax':
+        return ExpectimaxDecisionProvider(depth=int(argument)) if argument else ExpectimaxDecisionProvider()
+    if name == 'table':
+        return PolicyTableProvider()
+    raise ValueError(f'Unknown policy: {policy}')
+
+
+def summarize(game: Game, game_index: int, seed: int) -> GameSummary:
+    """
+    :return: The summary of a finished game.
+    """
+    # a game that ends between two rounds has not started the current one.
+    rounds = game.current_round if game.current_player_id != 0 else game.current_round - 1
+    return GameSummary(
+        game_index=game_index,
+        seed=seed,
+        winners=tuple(winner.token for winner in game.get_winners()),
+        rounds=min(rounds, game.rules.max_round_count),
+        balances=tuple(player.balance for player in game.players),
+        properties=tuple(tuple(game.board.ownership.get_positions(player.token)) for player in game.players),
+    )
+
+
+def play_game(game_index: int, seed: int, policies: Sequence[str], rules: RuleSet = None) -> GameSummary:
+    """
+    Play one complete game without any output.
+    :param game_index: The index of the game in its batch.
+    :param seed: The seed of the batch.
+    :param policies: The policy of each player, in seat order.
+    :param rules: The rules of the game, the standard ones with real dice by default.
+    :return: The summary of the game.
+    """
+    random_streams = RandomStreams(seed, game_index)
+    providers = [make_provider(policy, random_streams.stream(f'player {seat}')) for seat, policy in enumerate(policies)]
+    game = Game(player_count=len(policies), event_sink=NullEventSink(), decision_providers=providers,
+                random_streams=random_streams, rules=rules if rules is not None else RuleSet())
+    game.launch_game()
+    return summarize(game, game_index, seed)
+
+
+def _play_chunk(start: int, stop: int, seed: int, policies: Sequence[str], rules: RuleSet) -> List[GameSummary]:
+    """
+    Play the games [start, stop) of a batch. This is the unit of work of a worker.
+    """
+    return [play_game(game_index, seed, policies, rules) for game_index in range(start, stop)]
+
+
+def iter_batch(game_count: int, policies: Sequence[str] = ('always', 'always'), seed: int = 0,
+               workers: Optional[int] = None, chunk_size: Optional[int] = None,
+               rules: RuleSet = None) -> Iterator[GameSummary]:
+    """
+    Play a batch of games and yield their summaries in game order.
+    :param game_count: The number of games to play.
+    :param policies: The policy of each player, in seat order.
+    :param seed: The seed of the batch.
+    :param workers: The number of worker processes. 1 plays every game in this process.
+    Defaults to the number of CPUs.
+    :param chunk_size: The number of games in a unit of work.
+    :param rules: The rules of every game, the standard ones with real dice by default.
+    """
+    if rules is None:
+        rules = RuleSet()
+    if len(policies) < rules.min_player_count or len(policies) > rules.max_player_count:
+        raise ValueError(f'Invalid number of players: {len(policies)}')
+
+    policies = tuple(policies)
+
+    if workers == 1:
+        yield from _play_chunk(0, game_count, seed, policies, rules)
+        return
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # a few chunks per worker keeps every worker busy until the end.
+    if chunk_size is None:
+        chunk_size = max(1, min(1000, game_count // (workers * 8)))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        starts = range(0, game_count, chunk_size)
+        stops = [min(start + chunk_size, game_count) for start in starts]
+        chunks = executor.map(_play_chunk, starts, stops, [seed] * len(stops), [policies] * len(stops),
+                              [rules] * len(stops))
+        for chunk in chunks:
+            yield from chunk
+
+
+def run_batch(game_count: int, policies: Sequence[str] = ('always', 'always'), seed: int = 0,
+              workers: Optional[int] = None, chunk_size: Optional[int] = None,
+              rules: RuleSet = None) -> List[GameSummary]:
+    """
+    Play a batch of games.
+    :return: The summaries of the games, in game order.
+    """
+    return list(iter_batch(game_count, policies, seed, workers, chunk_size, rules))
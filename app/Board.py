@@ -1,45 +1,69 @@
-from typing import Optional
+from typing import List, Optional
 
-from app.Square import Square, GoSquare, PropertySquare, IncomeTaxSquare, InJailOrVisitingSquare, \
-    FreeParkingSquare, GoToJailSquare, ChanceSquare
+from app.BoardLayout import BoardLayout, standard_layout
+from app.OwnershipIndex import OwnershipIndex
+from app.Square import Square, PropertySquare
 
 
 class Board:
     """
     The monopoly board.
+
+    The squares come from a layout shared by all the games. The property
+    squares of this board are bound to its own ownership index the first
+    time they are used.
     """
 
-    def __init__(self):
-        self.squares = [
-            GoSquare(name='Go', position=1),
-            PropertySquare(name='Central', position=2, price=800, rent=90),
-            PropertySquare(name='Wan Chai', position=3, price=700, rent=65),
-            IncomeTaxSquare(name='Income Tax', position=4),
-            PropertySquare(name='Stanley', position=5, price=600, rent=60),
-            InJailOrVisitingSquare(name='In Jail/Visiting', position=6),
-            PropertySquare(name='Shek O', position=7, price=400, rent=10),
-            PropertySquare(name='Mong Kok', position=8, price=500, rent=40),
-            ChanceSquare(name='Red Chance', position=9),
-            PropertySquare(name='Tsing Yi', position=10, price=400, rent=15),
-            FreeParkingSquare(name='Free Parking', position=11),
-            PropertySquare(name='Shatin', position=12, price=700, rent=75),
-            ChanceSquare(name='Blue Chance', position=13),
-            PropertySquare(name='Tuen Mun', position=14, price=400, rent=20),
-            PropertySquare(name='Tai Po', position=15, price=500, rent=25),
-            GoToJailSquare(name='Go To Jail', position=16),
-            PropertySquare(name='Sai Kung', position=17, price=400, rent=10),
-            PropertySquare(name='Yuen Long', position=18, price=400, rent=25),
-            ChanceSquare(name='Yellow Chance', position=19),
-            PropertySquare(name='Tai O', position=20, price=600, rent=25),
-        ]
+    __slots__ = ('layout', 'square_count', 'pass_through_squares', 'ownership', '__properties')
+
+    def __init__(self, layout: BoardLayout = None, hash_ownership: bool = False):
+        self.layout = layout if layout is not None else standard_layout()
+        self.square_count = self.layout.square_count
+        self.pass_through_squares = self.layout.pass_through_squares
+
+        # who owns which square, the only state of the board, hashed for the games which hash their state.
+        self.ownership = OwnershipIndex(self.square_count, hashed=hash_ownership)
+        self.__properties = {}
+
+    @property
+    def squares(self) -> List[Square]:
+        """
+        :return: All the squares of this board.
+        """
+        return [self.get_square(position) for position in range(1, self.square_count + 1)]
 
     def get_square(self, position: int) -> Optional[Square]:
         # check if the position is out of bounds
-        if position <= 0 or position > len(self.squares):
+        if position <= 0 or position > self.square_count:
             return None
 
         # calculate the index
         index = position - 1
 
-        # return the target square
-        return self.squares[index]
+        # the other squares have no state, so they are shared.
+        if not self.layout.is_property[index]:
+            return self.layout.squares[index]
+
+        # bind the property square to this board on first use
+        square = self.__properties.get(index)
+        if square is None:
+            layout_square: PropertySquare = self.layout.squares[index]
+            square = self.__properties[index] = layout_square.bind(self.ownership)
+        return square
+
+    def get_destination(self, position: int, steps: int) -> int:
+        """
+        :param position: The starting position.
+        :param steps: The number of squares to move forward.
+        :return: The position of the square landed on.
+        """
+        return self.layout.get_destination(position, steps)
+
+    def get_passed_squares(self, position: int, steps: int) -> List[Square]:
+        """
+        Get the squares with a pass through effect crossed by a move, without the square landed on.
+        :param position: The starting position.
+        :param steps: The number of squares to move forward.
+        :return: The squares passed through, in the order they are passed.
+        """
+        return self.layout.get_passed_squares(position, steps)
@@ -0,0 +1,160 @@
+"""
+The static layout of a board, shared by all the games played on it.
+
+Names, prices, rents and the kinds of squares never change during a game,
+so they are built once per process. A game only keeps who owns what, in
+its own ownership index. Worker processes forked after the layout is built
+share it through copy-on-write pages.
+
+Boards are defined in JSON files, e.g. boards/standard.json. A definition
+is validated and compiled once, and the compiled layouts are cached by the
+hash of the definition, so loading the same board again costs one hash.
+"""
+from array import array
+from functools import lru_cache
+from hashlib import blake2b
+from json import loads
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from app.Square import Square, GoSquare, PropertySquare, IncomeTaxSquare, InJailOrVisitingSquare, \
+    FreeParkingSquare, GoToJailSquare, ChanceSquare
+
+
+class BoardLayout:
+    """
+    An immutable sequence of squares.
+    """
+
+    __slots__ = ('squares', 'square_count', 'is_property', 'prices', 'rents', 'pass_through_squares')
+
+    def __init__(self, squares: Sequence[Square]):
+        for index, square in enumerate(squares):
+            if square.position != index + 1:
+                raise ValueError(f'Square {square.name} is at position {square.position}, expected {index + 1}')
+
+        self.squares: Tuple[Square, ...] = tuple(squares)
+        self.square_count = len(self.squares)
+        self.is_property = tuple(isinstance(square, PropertySquare) for square in self.squares)
+        # the price and rent of every square, 0 for the squares which are not properties
+        self.prices = array('q', [getattr(square, 'price', 0) for square in self.squares])
+        self.rents = array('q', [getattr(square, 'rent', 0) for square in self.squares])
+        # only these squares do something when a player passes through them.
+        self.pass_through_squares = tuple(square for square in self.squares
+                                          if type(square).pass_through is not Square.pass_through)
+
+    def get_destination(self, position: int, steps: int) -> int:
+        """
+        :param position: The starting position.
+        :param steps: The number of squares to move forward.
+        :return: The position of the square landed on.
+        """
+        return (position - 1 + steps) % self.square_count + 1
+
+    def get_passed_squares(self, position: int, steps: int) -> List[Square]:
+        """
+        Get the squares with a pass through effect crossed by a move, without the square landed on.
+        :param position: The starting position.
+        :param steps: The number of squares to move forward.
+        :return: The squares passed through, in the order they are passed.
+        """
+        passed = []
+        for square in self.pass_through_squares:
+            # the first step reaching the square, then once per lap
+            step = (square.position - position) % self.square_count or self.square_count
+            while step < steps:
+                passed.append((step, square))
+                step += self.square_count
+
+        if len(passed) > 1:
+            passed.sort(key=lambda item: item[0])
+        return [square for _, square in passed]
+
+
+# the square classes by their name in board definitions
+SQUARE_TYPES = {
+    'go': GoSquare,
+    'property': PropertySquare,
+    'income_tax': IncomeTaxSquare,
+    'jail': InJailOrVisitingSquare,
+    'free_parking': FreeParkingSquare,
+    'go_to_jail': GoToJailSquare,
+    'chance': ChanceSquare,
+}
+
+# the folder of the board definitions shipped with the game
+BOARDS_PATH = Path(__file__).parent / 'boards'
+
+# the compiled layouts by the hash of their definition
+_compiled_layouts: Dict[str, BoardLayout] = {}
+
+
+def layout_from_dict(definition: dict) -> BoardLayout:
+    """
+    Validate a board definition and compile it into a layout.
+    The squares are listed in board order, starting from position 1.
+    :param definition: The definition, e.g. {'squares': [{'type': 'go', 'name': 'Go'}, ...]}.
+    :return: The layout.
+    """
+    squares = definition.get('squares') if isinstance(definition, dict) else None
+    if not isinstance(squares, list) or len(squares) == 0:
+        raise ValueError('A board needs a non empty list of squares')
+
+    compiled = []
+    for position, square in enumerate(squares, start=1):
+        if not isinstance(square, dict):
+            raise ValueError(f'Square {position} is not an object')
+
+        name = square.get('name')
+        if not isinstance(name, str) or not name:
+            raise ValueError(f'Square {position} needs a name')
+
+        square_type = SQUARE_TYPES.get(square.get('type'))
+        if square_type is None:
+            raise ValueError(f'Square {position} ({name}) has an unknown type: {square.get("type")}')
+
+        if square_type is PropertySquare:
+            price = square.get('price')
+            rent = square.get('rent')
+            for field, value in (('price', price), ('rent', rent)):
+                if type(value) is not int or value < 0:
+                    raise ValueError(f'Square {position} ({name}) needs a non negative integer {field}')
+            compiled.append(PropertySquare(price=price, rent=rent, position=position, name=name))
+        else:
+            compiled.append(square_type(position=position, name=name))
+
+    return BoardLayout(compiled)
+
+
+def layout_from_bytes(data: bytes) -> BoardLayout:
+    """
+    Compile a JSON board definition, once per distinct definition.
+    :param data: The content of the definition.
+    :return: The layout, shared by all the callers with the same definition.
+    """
+    digest = blake2b(data, digest_size=16).hexdigest()
+    layout = _compiled_layouts.get(digest)
+    if layout is None:
+        try:
+            definition = loads(data)
+        except ValueError as error:
+            raise ValueError(f'Invalid board definition: {error}')
+        layout = _compiled_layouts[digest] = layout_from_dict(definition)
+    return layout
+
+
+def load_layout(path) -> BoardLayout:
+    """
+    Load a JSON board definition file.
+    :param path: The path of the file.
+    :return: The layout, compiled only if the content of the file was never seen before.
+    """
+    return layout_from_bytes(Path(path).read_bytes())
+
+
+@lru_cache(maxsize=None)
+def standard_layout() -> BoardLayout:
+    """
+    :return: The layout of the standard monopoly board, read once.
+    """
+    return load_layout(BOARDS_PATH / 'standard.json')
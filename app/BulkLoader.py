@@ -0,0 +1,177 @@
+"""
+Load and validate many saved games in parallel, e.g. for offline analytics.
+
+The saves are split into chunks. A thread pool reads the files of each
+chunk, since reading mostly waits on the disk, then each chunk is
+decoded and validated by one worker of a process pool. Only a few chunks
+are in flight at any time, so that memory stays bounded however many
+saves there are, and the results are yielded in the order of the paths.
+
+A save is validated against the schema of Game.to_dict and the board
+before anything is created from it. Every save yields a result, with the
+reason it was rejected if it was: a job over thousands of saves goes on
+past a bad one. A result holds a light record of the state of the game
+by default, or the game itself on demand.
+"""
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from json import loads
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.BoardLayout import BoardLayout, standard_layout
+from app.GameCodec import MAGIC, decode_game_dict, read_save_file, validate_game_dict
+
+
+class SaveRecord(NamedTuple):
+    """
+    The state of a saved game, without creating the game.
+    """
+    current_round: int
+    current_player_id: int
+    # in seat order
+    tokens: Tuple[str, ...]
+    balances: Tuple[int, ...]
+    positions: Tuple[int, ...]
+    exited: Tuple[bool, ...]
+    # the positions of the properties owned by each player, in seat order
+    properties: Tuple[Tuple[int, ...], ...]
+
+
+class LoadResult(NamedTuple):
+    """
+    The outcome of loading a single save.
+    """
+    path: Path
+    # a SaveRecord, or a Game if games were asked for, or None if the save was rejected
+    value: object
+    # why the save was rejected
+    error: Optional[str] = None
+
+
+def decode_save(data: bytes, is_property: Sequence[bool]) -> dict:
+    """
+    :param data: A binary or JSON save.
+    :param is_property: Whether each square of the board is a property.
+    :return: The valid game as a dictionary, like Game.to_dict.
+    """
+    game_dict = decode_game_dict(data) if data.startswith(MAGIC) else loads(data)
+    validate_game_dict(game_dict, is_property)
+    return game_dict
+
+
+def make_record(game_dict: dict) -> SaveRecord:
+    """
+    :param game_dict: A valid game as a dictionary.
+    :return: The record of the game.
+    """
+    players = game_dict['players']
+    return SaveRecord(game_dict['current_round'], game_dict['current_player_id'],
+                      tuple(player['token'] for player in players), tuple(player['balance'] for player in players),
+                      tuple(player['square_position'] for player in players),
+                      tuple(player['has_exited'] for player in players),
+                      tuple(tuple(sorted(player['properties'])) for player in players))
+
+
+def _decode_chunk(contents: List, is_property: Tuple[bool, ...], as_dicts: bool) -> List[Tuple[object, object]]:
+    """
+    Decode and validate the saves of a chunk. This is the unit of work of a worker.
+    :param contents: The content of every save, or why it could not be read.
+    :return: The game dictionary or record of every save and the reason it was rejected, if it was.
+    """
+    results = []
+    for data in contents:
+        if isinstance(data, str):
+            results.append((None, data))
+            continue
+        try:
+            game_dict = decode_save(data, is_property)
+        except ValueError as error:
+            # a bad save is reported, the others of the chunk are still loaded
+            results.append((None, f'{type(error).__name__}: {error}'))
+            continue
+        results.append((game_dict if as_dicts else make_record(game_dict), None))
+    return results
+
+
+def _read_or_error(path) -> object:
+    """
+    :return: The content of a save, or why it could not be read, e.g. a missing file.
+    """
+    try:
+        return read_save_file(path)
+    except (OSError, zlib.error) as error:
+        return f'{type(error).__name__}: {error}'
+
+
+def iter_saves(paths: Iterable, games: bool = False, workers: Optional[int] = None, threads: int = 8,
+               chunk_size: int = 64, max_chunks: Optional[int] = None, board_layout: BoardLayout = None,
+               **game_options) -> Iterator[LoadResult]:
+    """
+    Load saved games, and yield them in the order of their paths.
+    :param paths: The paths of the saves, in any format, e.g. Path('saved_games').glob('*.*').
+    :param games: Whether to create the games, instead of their records.
+    :param workers: The number of worker processes. 1 decodes every save in this process.
+    Defaults to the number of CPUs.
+    :param threads: The number of threads reading the files.
+    :param chunk_size: The number of saves in a unit of work.
+    :param max_chunks: The most chunks in flight, which bounds the memory. Twice the number of workers by default.
+    :param board_layout: The board of the games, the standard one by default.
+    :param game_options: The other arguments of Game, if the games are created.
+    """
+    if chunk_size < 1 or threads < 1:
+        raise ValueError(f'Invalid chunk size or thread count: {chunk_size}, {threads}')
+    from app.Game import Game
+
+    layout = board_layout if board_layout is not None else standard_layout()
+    is_property = tuple(layout.is_property)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_chunks is None:
+        max_chunks = 2 * workers
+
+    def results(chunk: List[Path], decoded: List[Tuple[object, object]]) -> Iterator[LoadResult]:
+        for path, (value, error) in zip(chunk, decoded):
+            if games and value is not None:
+                try:
+                    value = Game(game_dict=value, board_layout=board_layout, **game_options)
+                except ValueError as game_error:
+                    # a valid save may not fit the options, e.g. another number of decision providers
+                    value, error = None, f'{type(game_error).__name__}: {game_error}'
+            yield LoadResult(path, value, error)
+
+    paths = iter(paths)
+    with ThreadPoolExecutor(max_workers=threads) as readers:
+        if workers == 1:
+            while True:
+                chunk = [Path(path) for path in islice(paths, chunk_size)]
+                if not chunk:
+                    return
+                yield from results(chunk, _decode_chunk(list(readers.map(_read_or_error, chunk)), is_property,
+                                                        games))
+
+        with ProcessPoolExecutor(max_workers=workers) as decoders:
+            pending = deque()
+            while True:
+                chunk = [Path(path) for path in islice(paths, chunk_size)]
+                if chunk:
+                    # the chunks in flight are decoded while this one is read
+                    contents = list(readers.map(_read_or_error, chunk))
+                    pending.append((chunk, decoders.submit(_decode_chunk, contents, is_property, games)))
+                if not pending:
+                    return
+                if len(pending) >= max_chunks or not chunk:
+                    done_chunk, future = pending.popleft()
+                    yield from results(done_chunk, future.result())
+
+
+def load_saves(paths: Iterable, games: bool = False, workers: Optional[int] = None,
+               **options) -> List[LoadResult]:
+    """
+    Load saved games.
+    :return: The result of every save, in the order of their paths.
+    """
+    return list(iter_saves(paths, games, workers, **options))
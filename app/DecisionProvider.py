@@ -0,0 +1,321 @@
+"""
+Decision providers answer the questions the game asks a player:
+whether to buy a property, how to get out of jail and whether to
+pay the bail now. Each player has their own provider, so bots and
+humans can play in the same game.
+"""
+from abc import ABC, abstractmethod
+from random import Random
+from typing import Sequence, Tuple
+
+from app.Config import Config
+
+
+class JailStrategy:
+    """
+    The two ways of getting out of jail.
+    """
+    # throw at least a double in one of the next 3 turns.
+    FEELING_LUCKY = 'feeling_lucky'
+    # pay the fine in either of the next 2 turns.
+    BAIL = 'bail'
+
+
+class DecisionProvider(ABC):
+    """
+    Makes the decisions of a single player.
+    """
+
+    @abstractmethod
+    def should_buy(self, player, property_square) -> bool:
+        """
+        :param player: The player who landed on an unowned property.
+        :param property_square: The property square.
+        :return: Whether the player buys the property.
+        """
+        pass
+
+    @abstractmethod
+    def select_jail_strategy(self, player) -> str:
+        """
+        :param player: The jailed player.
+        :return: One of the JailStrategy values.
+        """
+        pass
+
+    @abstractmethod
+    def should_pay_bail_now(self, player) -> bool:
+        """
+        :param player: The jailed player in bail mode.
+        :return: Whether the fine is paid in this turn rather than the next one.
+        """
+        pass
+
+    def should_save_and_exit(self, player) -> bool:
+        """
+        :param player: The player whose turn it is.
+        :return: Whether the game should be saved and exited instead of playing the turn.
+        By default, always play.
+        """
+        return False
+
+
+# ---------------------------------------------------------
+# Bots
+
+class BotDecisionProvider(DecisionProvider, ABC):
+    """
+    Base of the built-in bots, which share the same jail behaviour.
+    """
+
+    def __init__(self, jail_strategy: str = JailStrategy.BAIL, pay_bail_now: bool = True):
+        self.jail_strategy = jail_strategy
+        self.pay_bail_now = pay_bail_now
+
+    def select_jail_strategy(self, player) -> str:
+        return self.jail_strategy
+
+    def should_pay_bail_now(self, player) -> bool:
+        return self.pay_bail_now
+
+
+class AlwaysBuyProvider(BotDecisionProvider):
+    """
+    Buys every property it lands on.
+    """
+
+    def should_buy(self, player, property_square) -> bool:
+        return True
+
+
+class NeverBuyProvider(BotDecisionProvider):
+    """
+    Never buys a property.
+    """
+
+    def should_buy(self, player, property_square) -> bool:
+        return False
+
+
+class ThresholdBuyProvider(BotDecisionProvider):
+    """
+    Buys a property only if at least `reserve` remains after paying for it.
+    """
+
+    def __init__(self, reserve: int = 500, jail_strategy: str = JailStrategy.BAIL, pay_bail_now: bool = True):
+        super().__init__(jail_strategy=jail_strategy, pay_bail_now=pay_bail_now)
+        self.reserve = reserve
+
+    def should_buy(self, player, property_square) -> bool:
+        return player.balance - property_square.price >= self.reserve
+
+
+class RandomDecisionProvider(DecisionProvider):
+    """
+    Answers every question at random.
+    """
+
+    def __init__(self, rng: Random = None, buy_probability: float = 0.5):
+        self.rng = rng if rng is not None else Random()
+        self.buy_probability = buy_probability
+
+    def should_buy(self, player, property_square) -> bool:
+        return self.rng.random() < self.buy_probability
+
+    def select_jail_strategy(self, player) -> str:
+        return self.rng.choice((JailStrategy.FEELING_LUCKY, JailStrategy.BAIL))
+
+    def should_pay_bail_now(self, player) -> bool:
+        return self.rng.random() < 0.5
+
+
+# ---------------------------------------------------------
+# Searching bots
+
+# the kinds of questions
+BUY = 'buy'
+JAIL_STRATEGY = 'jail_strategy'
+PAY_BAIL_NOW = 'pay_bail_now'
+
+
+def possible_answers(kind: str, default) -> Tuple:
+    """
+    :param kind: The kind of question.
+    :param default: The answer of a provider.
+    :return: The possible answers to the question, the given one first.
+    """
+    if kind == JAIL_STRATEGY:
+        return default, JailStrategy.BAIL if default == JailStrategy.FEELING_LUCKY else JailStrategy.FEELING_LUCKY
+    return default, not default
+
+
+class ChoiceDecisionProvider(DecisionProvider, ABC):
+    """
+    Answers every question by choosing among its possible answers, the one of the rollout bot first.
+    Base of the searching bots and of the providers they play with.
+    """
+
+    def __init__(self, rollout_provider: DecisionProvider):
+        self.rollout_provider = rollout_provider
+
+    @abstractmethod
+    def choose(self, player, kind: str, answers: Sequence):
+        """
+        :param player: The player who is asked.
+        :param kind: The kind of question.
+        :param answers: The possible answers, the one of the rollout bot first.
+        :return: The answer.
+        """
+        pass
+
+    def should_buy(self, player, property_square) -> bool:
+        default = self.rollout_provider.should_buy(player, property_square)
+        return self.choose(player, BUY, possible_answers(BUY, default))
+
+    def select_jail_strategy(self, player) -> str:
+        default = self.rollout_provider.select_jail_strategy(player)
+        return self.choose(player, JAIL_STRATEGY, possible_answers(JAIL_STRATEGY, default))
+
+    def should_pay_bail_now(self, player) -> bool:
+        default = self.rollout_provider.should_pay_bail_now(player)
+        return self.choose(player, PAY_BAIL_NOW, possible_answers(PAY_BAIL_NOW, default))
+
+
+class ForcedDecision(ChoiceDecisionProvider):
+    """
+    Gives a fixed answer to one kind of question, and answers the others like the rollout bot.
+    """
+
+    def __init__(self, rollout_provider: DecisionProvider, kind: str, answer):
+        super().__init__(rollout_provider)
+        self.kind = kind
+        self.answer = answer
+
+    def choose(self, player, kind: str, answers: Sequence):
+        return self.answer if kind == self.kind else answers[0]
+
+
+class AnswerProbe(ChoiceDecisionProvider):
+    """
+    Gives forced answers to the first questions of a turn, answers the next ones like the rollout bot,
+    and records every question.
+    """
+
+    def __init__(self, rollout_provider: DecisionProvider):
+        super().__init__(rollout_provider)
+        self.forced = ()
+        # the answers given and the possible answers of every question of the turn
+        self.answers = []
+        self.options = []
+
+    def start(self, forced: Sequence = ()):
+        """
+        Start a turn.
+        :param forced: The answers to the first questions.
+        """
+        self.forced = forced
+        self.answers = []
+        self.options = []
+
+    def choose(self, player, kind: str, answers: Sequence):
+        index = len(self.answers)
+        answer = self.forced[index] if index < len(self.forced) else answers[0]
+        self.answers.append(answer)
+        self.options.append(answers)
+        return answer
+
+
+# ---------------------------------------------------------
+# Configured answers
+
+class ConfigDecisionProvider(DecisionProvider):
+    """
+    Answers with the Config.DEFAULT_* choices, read at the time
+    the question is asked. Used when running the tests.
+    """
+
+    def should_buy(self, player, property_square) -> bool:
+        # anything other than [1] Yes defaults to [2] No
+        return Config.DEFAULT_BUY_PROPERTY_CHOICE == '1'
+
+    def select_jail_strategy(self, player) -> str:
+        # anything other than [1] defaults to [2]
+        if Config.DEFAULT_JAIL_STRATEGY == '1':
+            return JailStrategy.FEELING_LUCKY
+        return JailStrategy.BAIL
+
+    def should_pay_bail_now(self, player) -> bool:
+        # anything other than [2] No defaults to [1] Yes
+        return Config.DEFAULT_BAIL_MODE_PAY_NOW != '2'
+
+
+# ---------------------------------------------------------
+# Human player
+
+class ConsoleDecisionProvider(DecisionProvider):
+    """
+    Asks a human player on the console.
+    """
+
+    def should_buy(self, player, property_square) -> bool:
+        currency = player.game.rules.currency
+        print(f'{player.token}, do you wish to buy this property for {currency} {property_square.price}?')
+        print(f'Your current balance is: {player.balance} '
+              f'and you will be able to collect {currency} {property_square.rent} in rent.')
+        print('[1] Yes         [2] No')
+        answer = input('Enter your choice (1/2):>').strip()
+
+        if answer not in ['1', '2']:
+            print('Invalid answer. Defaulting to [2] No.')
+            answer = '2'
+
+        return answer == '1'
+
+    def select_jail_strategy(self, player) -> str:
+        rules = player.game.rules
+        print(f'\n{player.token}, how do you want to get out of jail? (Enter 1 or 2)')
+        print(
+            f'[1] Play at least a double for the next 3 turns.\n'
+            f'    Pay {rules.currency} {rules.jail_fine} if you fail by your third turn.'
+        )
+        print(f'[2] Pay {rules.currency} {rules.jail_fine} in either of the next 2 turns.')
+        answer = input('Enter your choice (1/2):> ').strip()
+
+        if answer not in ['1', '2']:
+            print('Invalid selection. Defaulting to 2')
+            answer = '2'
+
+        return JailStrategy.FEELING_LUCKY if answer == '1' else JailStrategy.BAIL
+
+    def should_pay_bail_now(self, player) -> bool:
+        rules = player.game.rules
+        print(f'\n{player.token}, do you want to pay {rules.currency} {rules.jail_fine} now?')
+        print('[1] Yes  [2] No')
+        answer = input('Enter your choice (1/2) :>').strip()
+
+        if answer not in ['1', '2']:
+            print('Invalid choice. Defaulting to: [1] Yes')
+            answer = '1'
+
+        return answer == '1'
+
+    def should_save_and_exit(self, player) -> bool:
+        print(f'\n ---- Turn of: {player.token} -------')
+        print(f'1. Play your turn')
+        print(f'2. Save and exit game')
+        answer = input('Enter your choice (1/2) :>').strip()
+
+        if answer == '1':
+            return False
+        if answer != '2':
+            print('Invalid choice. Will save and exit game.')
+        return True
+
+
+def default_decision_provider() -> DecisionProvider:
+    """
+    :return: A console provider when a human is playing, the configured answers otherwise.
+    """
+    if Config.IS_TEST_ENVIRONMENT:
+        return ConfigDecisionProvider()
+    return ConsoleDecisionProvider()
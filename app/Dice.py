@@ -0,0 +1,216 @@
+"""
+Any number of dice with arbitrary faces and weights.
+
+The distribution of the totals is the convolution of the distributions of
+the dice, so its cost grows with the number of totals, not with the number
+of joint outcomes. Every die is sampled from its own alias table, in
+batches, so a single roll only reads the next entry of a buffer. The first
+batch is small and each next one twice as large, up to the buffer size, so
+that dice which only roll a few times, e.g. those of a short game or of a
+clone, never pay for thousands of rolls.
+"""
+from copy import copy
+from random import Random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# the number of rolls of the first batch
+FIRST_BATCH_SIZE = 16
+
+
+class Dice:
+    """
+    A set of dice rolled together.
+    """
+
+    def __init__(self, faces: Sequence[Sequence[int]], weights: Optional[Sequence[Sequence[float]]] = None,
+                 rng: Random = None, buffer_size: int = 4096):
+        """
+        :param faces: The faces of every die.
+        :param weights: The relative weight of every face of every die, uniform by default.
+        :param rng: The generator used to roll.
+        :param buffer_size: The largest number of rolls generated at once.
+        """
+        if not faces or any(len(die_faces) == 0 for die_faces in faces):
+            raise ValueError('Every die needs at least one face')
+        if weights is None:
+            weights = [[1.0] * len(die_faces) for die_faces in faces]
+        if len(weights) != len(faces) or any(len(w) != len(f) for w, f in zip(weights, faces)):
+            raise ValueError('Every face needs a weight')
+        if any(weight < 0 for die_weights in weights for weight in die_weights):
+            raise ValueError('Weights cannot be negative')
+        if any(sum(die_weights) <= 0 for die_weights in weights):
+            raise ValueError('Every die needs a face with a positive weight')
+
+        self.faces = tuple(tuple(die_faces) for die_faces in faces)
+        self.rng = rng if rng is not None else Random()
+        self.buffer_size = buffer_size
+
+        # the probability of every face of every die
+        self.probabilities: List[List[float]] = [[weight / sum(die_weights) for weight in die_weights]
+                                                 for die_weights in weights]
+
+        # the distribution of the values of every die, faces with the same value merged
+        value_distributions = []
+        for die_faces, die_probabilities in zip(self.faces, self.probabilities):
+            distribution: Dict[int, float] = {}
+            for value, probability in zip(die_faces, die_probabilities):
+                distribution[value] = distribution.get(value, 0.0) + probability
+            value_distributions.append(distribution)
+
+        # the distribution of the totals, by convolution
+        self.sum_distribution: Dict[int, float] = {0: 1.0}
+        for distribution in value_distributions:
+            totals: Dict[int, float] = {}
+            for total, total_probability in self.sum_distribution.items():
+                for value, probability in distribution.items():
+                    totals[total + value] = totals.get(total + value, 0.0) + total_probability * probability
+            self.sum_distribution = totals
+
+        # the probability that every die shows a value, for every value
+        self.double_probabilities: Dict[int, float] = {}
+        for value in value_distributions[0]:
+            probability = 1.0
+            for distribution in value_distributions:
+                probability *= distribution.get(value, 0.0)
+            if probability:
+                self.double_probabilities[value] = probability
+        self.double_probability = sum(self.double_probabilities.values())
+
+        self.__alias_tables = [self.__build_alias_table(die_probabilities)
+                               for die_probabilities in self.probabilities]
+
+        # the pre-generated rolls, as the values of the dice
+        self.__buffer: List[Tuple[int, ...]] = []
+        self.__cursor = 0
+        # the number of rolls of the next batch
+        self.__batch_size = min(FIRST_BATCH_SIZE, buffer_size)
+
+        # the values of the last roll
+        self.outcome: Optional[Tuple[int, ...]] = None
+
+    @staticmethod
+    def __build_alias_table(probabilities: List[float]) -> Tuple[List[float], List[int]]:
+        """
+        Build the alias table of the faces of a die with Vose's method.
+        :return: The probability of keeping every face, and its alias.
+        """
+        n = len(probabilities)
+        scaled = [probability * n for probability in probabilities]
+        alias_probability = [1.0] * n
+        alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            alias_probability[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        return alias_probability, alias
+
+    def __refill(self):
+        """
+        Generate the next batch of rolls.
+        """
+        random = self.rng.random
+        batch_size = self.__batch_size
+        columns = []
+        for die_faces, (alias_probability, alias) in zip(self.faces, self.__alias_tables):
+            n = len(die_faces)
+            column = []
+            for _ in range(batch_size):
+                u = random() * n
+                index = int(u)
+                column.append(die_faces[index if u - index < alias_probability[index] else alias[index]])
+            columns.append(column)
+
+        # a new buffer, so a saved one is never overwritten
+        self.__buffer = list(zip(*columns))
+        self.__cursor = 0
+        self.__batch_size = min(2 * batch_size, self.buffer_size)
+
+    def roll(self) -> Tuple[int, ...]:
+        """
+        Roll the dice.
+        :return: The value of every die.
+        """
+        cursor = self.__cursor
+        if cursor == len(self.__buffer):
+            self.__refill()
+            cursor = 0
+        self.outcome = outcome = self.__buffer[cursor]
+        self.__cursor = cursor + 1
+        return outcome
+
+    def roll_values(self) -> Tuple[int, ...]:
+        """
+        Roll the dice.
+        :return: The value of every die.
+        """
+        return self.roll()
+
+    def get_total_value(self) -> int:
+        """
+        :return: The total of the last roll.
+        """
+        return sum(self.outcome)
+
+    def is_double(self) -> bool:
+        """
+        :return: Whether all the dice of the last roll show the same value.
+        """
+        return self.outcome.count(self.outcome[0]) == len(self.outcome)
+
+    def get_values(self) -> Tuple[int, ...]:
+        """
+        :return: The value of every die in the last roll.
+        """
+        return self.outcome
+
+    def copy(self, rng: Random) -> 'Dice':
+        """
+        :param rng: The generator of the copy.
+        :return: Dice sharing the distributions and alias tables of these ones, without their pending rolls.
+        """
+        dice = copy(self)
+        dice.rng = rng
+        dice.__buffer = []
+        dice.__cursor = 0
+        dice.__batch_size = min(FIRST_BATCH_SIZE, dice.buffer_size)
+        return dice
+
+    def snapshot(self) -> Tuple:
+        """
+        :return: The pending rolls, the size of the next batch and the last outcome. The generator is saved
+        separately.
+        """
+        # the buffer is replaced, never changed, when refilled, so it can be shared.
+        return self.__buffer, self.__cursor, self.__batch_size, self.outcome
+
+    def restore(self, snapshot: Tuple):
+        """
+        Go back to a snapshot of these dice, or of dice with the same faces.
+        :param snapshot: The snapshot.
+        """
+        self.__buffer, self.__cursor, self.__batch_size, self.outcome = snapshot
+
+    def total_distribution(self) -> List[Tuple[float, int, bool]]:
+        """
+        :return: The distinct (probability, total, is double) outcomes of a roll.
+        """
+        die_count = len(self.faces)
+        distribution: Dict[Tuple[int, bool], float] = {}
+        for value, probability in self.double_probabilities.items():
+            key = (value * die_count, True)
+            distribution[key] = distribution.get(key, 0.0) + probability
+        for total, probability in self.sum_distribution.items():
+            # the doubles of the total are counted apart
+            probability -= distribution.get((total, True), 0.0)
+            if probability > 1e-12:
+                distribution[(total, False)] = probability
+        return [(probability, total, is_double) for (total, is_double), probability in sorted(distribution.items())]
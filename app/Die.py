@@ -1,4 +1,7 @@
-from random import choice
+from random import Random
+
+# the generator of the dice which do not belong to a game
+_shared_rng = Random()
 
 
 class Die:
@@ -8,8 +11,10 @@ class Die:
     """
     die_pool = [1, 2, 3, 4]
 
-    def __init__(self, value: int = None):
+    def __init__(self, value: int = None, rng: Random = None):
         self.value = value
+        # the generator of this die
+        self.rng = rng if rng is not None else _shared_rng
 
     def roll(self):
         """
@@ -18,5 +23,5 @@ class Die:
         """
 
         # select one number from possible numbers
-        self.value = choice(self.die_pool)
+        self.value = self.rng.choice(self.die_pool)
 
@@ -1,4 +1,8 @@
-from .Config import Config
+from copy import copy
+from random import Random
+
+from .RuleSet import RuleSet
+from .Dice import Dice
 from .Die import Die
 
 
@@ -7,22 +11,79 @@ class DiePair:
     This class represents a pair of dice.
     """
 
-    def __init__(self):
-        # define the two dice
-        self.die1 = Die()
-        self.die2 = Die()
+    def __init__(self, rng: Random = None, rules: RuleSet = None):
+        # define the two dice, rolled with the same generator
+        self.die1 = Die(rng=rng)
+        self.die2 = Die(rng=rng)
+
+        # the rules may fix the faces of the dice, e.g. in the test environment.
+        if rules is None:
+            rules = RuleSet.from_config()
+        if rules.die_pools is not None:
+            self.die1.die_pool = list(rules.die_pools[0])
+            self.die2.die_pool = list(rules.die_pools[1])
 
-        if Config.IS_TEST_ENVIRONMENT:
-            self.die1.die_pool = [Config.DIE_1_VALUE]
-            self.die2.die_pool = [Config.DIE_2_VALUE]
+        # the dice actually rolled, built from the pools of the two dice
+        self.__dice = None
+        self.__pool1 = None
+        self.__pool2 = None
+
+    def __build_dice(self):
+        """
+        Build the dice from the current pools of the two dice.
+        """
+        self.__pool1 = self.die1.die_pool
+        self.__pool2 = self.die2.die_pool
+        self.__dice = Dice([self.__pool1, self.__pool2], rng=self.die1.rng)
 
     def roll_pair(self):
         """
         Roll the pair of dice.
         """
+        die1 = self.die1
+        die2 = self.die2
+
+        # rebuild the dice when a die or a pool was replaced
+        if die1.die_pool is not self.__pool1 or die2.die_pool is not self.__pool2:
+            self.__build_dice()
 
-        self.die1.roll()
-        self.die2.roll()
+        die1.value, die2.value = self.__dice.roll_values()
+
+    def copy(self, rng: Random = None) -> 'DiePair':
+        """
+        :param rng: The generator of the copy.
+        :return: A pair with the same pools and values, rolled with the given generator.
+        """
+        die_pair = copy(self)
+        die_pair.die1 = Die(self.die1.value, rng)
+        die_pair.die1.die_pool = self.die1.die_pool
+        die_pair.die2 = Die(self.die2.value, rng)
+        die_pair.die2.die_pool = self.die2.die_pool
+        # the dice are only built again when a pool changes
+        die_pair.__dice = self.__dice.copy(die_pair.die1.rng) if self.__dice is not None else None
+        return die_pair
+
+    def snapshot(self) -> tuple:
+        """
+        :return: The values of the dice and the pending rolls. The generator is saved separately.
+        """
+        dice = self.__dice.snapshot() if self.__dice is not None else None
+        return self.die1.value, self.die2.value, dice
+
+    def restore(self, snapshot: tuple):
+        """
+        Go back to a snapshot of this pair, or of a pair with the same pools.
+        :param snapshot: The snapshot.
+        """
+        self.die1.value, self.die2.value, dice = snapshot
+        if dice is None:
+            # the dice had not rolled yet, they are built again on the next roll
+            self.__dice = None
+            self.__pool1 = self.__pool2 = None
+        else:
+            if self.die1.die_pool is not self.__pool1 or self.die2.die_pool is not self.__pool2:
+                self.__build_dice()
+            self.__dice.restore(dice)
 
     def get_total_value(self) -> int:
         """
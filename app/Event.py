@@ -0,0 +1,347 @@
+"""
+Typed events emitted by the game engine.
+
+Events only carry raw values. Turning them into text is left
+to the event sink, so a headless game never formats a string.
+"""
+from typing import List, Optional, Tuple
+
+
+class Event:
+    """
+    Base class of all game events.
+    """
+    __slots__ = ()
+
+    # the name of the event in structured output
+    kind = 'event'
+
+    def to_dict(self) -> dict:
+        """
+        :return: The event as a JSON serializable dictionary.
+        """
+        data = {'event': self.kind}
+        for field in self.__slots__:
+            data[field] = getattr(self, field)
+        return data
+
+    def render(self, currency: str) -> Optional[str]:
+        """
+        :param currency: The currency used to display amounts.
+        :return: The console text of the event, or None if the event is silent.
+        """
+        return None
+
+
+# ---------------------------------------------------------
+# Game flow
+
+class RoundStarted(Event):
+    __slots__ = ('current_round',)
+    kind = 'round_started'
+
+    def __init__(self, current_round: int):
+        self.current_round = current_round
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'\nCurrent Round: {self.current_round}\n'
+
+
+class GameOver(Event):
+    __slots__ = ('winners',)
+    kind = 'game_over'
+
+    def __init__(self, winners: List[Tuple[str, int]]):
+        # pairs of (token, balance)
+        self.winners = winners
+
+    def render(self, currency: str) -> Optional[str]:
+        lines = ['\n ------ GAME OVER --------', 'The winners of the game are:-']
+        for token, balance in self.winners:
+            lines.append(f'{token} with a balance of {currency} {balance}')
+        return '\n'.join(lines)
+
+
+class GameSaved(Event):
+    __slots__ = ('file_name',)
+    kind = 'game_saved'
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'Game was saved as: {self.file_name}. Use this name to load it.'
+
+
+class AutosaveFailed(Event):
+    __slots__ = ('path', 'error')
+    kind = 'autosave_failed'
+
+    def __init__(self, path: str, error: str):
+        self.path = path
+        self.error = error
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'The game could not be autosaved to {self.path}: {self.error}'
+
+
+# ---------------------------------------------------------
+# Dice and movement
+
+class DiceRolled(Event):
+    __slots__ = ('token', 'die1', 'die2')
+    kind = 'dice_rolled'
+
+    def __init__(self, token: str, die1: int, die2: int):
+        self.token = token
+        self.die1 = die1
+        self.die2 = die2
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'{self.token}: Rolling dice ...\n' \
+               f'{self.token}: Dice results => Die 1: {self.die1}, Die 2: {self.die2}'
+
+
+class PlayerMoved(Event):
+    __slots__ = ('token', 'from_position', 'to_position', 'steps')
+    kind = 'player_moved'
+
+    def __init__(self, token: str, from_position: int, to_position: int, steps: int):
+        self.token = token
+        self.from_position = from_position
+        self.to_position = to_position
+        self.steps = steps
+
+
+class SquareLanded(Event):
+    __slots__ = ('token', 'position', 'name')
+    kind = 'square_landed'
+
+    def __init__(self, token: str, position: int, name: str):
+        self.token = token
+        self.position = position
+        self.name = name
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'{self.token} has landed on: Square {self.position} ({self.name})'
+
+
+class SquarePassed(Event):
+    __slots__ = ('token', 'position', 'name')
+    kind = 'square_passed'
+
+    def __init__(self, token: str, position: int, name: str):
+        self.token = token
+        self.position = position
+        self.name = name
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'{self.token} has passed through Square {self.position} ({self.name})'
+
+
+# ---------------------------------------------------------
+# Money
+
+class BalanceDeclared(Event):
+    __slots__ = ('token', 'balance')
+    kind = 'balance_declared'
+
+    def __init__(self, token: str, balance: int):
+        self.token = token
+        self.balance = balance
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'{self.token}: My balance is now: {currency} {self.balance}'
+
+
+class SalaryCollected(Event):
+    __slots__ = ('token', 'amount')
+    kind = 'salary_collected'
+
+    def __init__(self, token: str, amount: int):
+        self.token = token
+        self.amount = amount
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'{self.token} has collected a salary!'
+
+
+class TaxPaid(Event):
+    __slots__ = ('token', 'amount')
+    kind = 'tax_paid'
+
+    def __init__(self, token: str, amount: int):
+        self.token = token
+        self.amount = amount
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'{self.token} has paid a tax of {currency} {self.amount}!'
+
+
+class ChanceResolved(Event):
+    __slots__ = ('token', 'amount', 'gained')
+    kind = 'chance_resolved'
+
+    def __init__(self, token: str, amount: int, gained: bool):
+        self.token = token
+        self.amount = amount
+        self.gained = gained
+
+    def render(self, currency: str) -> Optional[str]:
+        if self.gained:
+            return f'{self.token} gained {currency} {self.amount}!'
+        return f'{self.token} lost {currency} {self.amount}!'
+
+
+class RentPaid(Event):
+    __slots__ = ('token', 'owner_token', 'rent', 'property_name')
+    kind = 'rent_paid'
+
+    def __init__(self, token: str, owner_token: str, rent: int, property_name: str):
+        self.token = token
+        self.owner_token = owner_token
+        self.rent = rent
+        self.property_name = property_name
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'{self.token} has paid {currency} {self.rent} in rent for property: {self.property_name}!'
+
+
+class RentCollected(Event):
+    __slots__ = ('token', 'rent', 'property_name')
+    kind = 'rent_collected'
+
+    def __init__(self, token: str, rent: int, property_name: str):
+        self.token = token
+        self.rent = rent
+        self.property_name = property_name
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'{self.token} has collected {currency} {self.rent} in rent for property: {self.property_name}!'
+
+
+# ---------------------------------------------------------
+# Properties
+
+class PropertyBought(Event):
+    __slots__ = ('token', 'position', 'name', 'price')
+    kind = 'property_bought'
+
+    def __init__(self, token: str, position: int, name: str, price: int):
+        self.token = token
+        self.position = position
+        self.name = name
+        self.price = price
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'{self.token} bought Square {self.position} ({self.name}) successfully!'
+
+
+class PropertyDeclined(Event):
+    __slots__ = ('token', 'position', 'name')
+    kind = 'property_declined'
+
+    def __init__(self, token: str, position: int, name: str):
+        self.token = token
+        self.position = position
+        self.name = name
+
+    def render(self, currency: str) -> Optional[str]:
+        return 'Okay. Not buying now.'
+
+
+class PropertyDisowned(Event):
+    __slots__ = ('token', 'position', 'name')
+    kind = 'property_disowned'
+
+    def __init__(self, token: str, position: int, name: str):
+        self.token = token
+        self.position = position
+        self.name = name
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'{self.token} is disowning Square {self.position} ({self.name})'
+
+
+# ---------------------------------------------------------
+# Jail
+
+class PlayerJailed(Event):
+    __slots__ = ('token',)
+    kind = 'player_jailed'
+
+    def __init__(self, token: str):
+        self.token = token
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'{self.token} has been jailed!'
+
+
+class JailStrategySelected(Event):
+    __slots__ = ('token', 'strategy')
+    kind = 'jail_strategy_selected'
+
+    def __init__(self, token: str, strategy: str):
+        self.token = token
+        self.strategy = strategy
+
+
+class BailDeferred(Event):
+    __slots__ = ('token',)
+    kind = 'bail_deferred'
+
+    def __init__(self, token: str):
+        self.token = token
+
+    def render(self, currency: str) -> Optional[str]:
+        return 'Okay, you will pay in your next turn.'
+
+
+class JailDoubleRolled(Event):
+    __slots__ = ('token',)
+    kind = 'jail_double_rolled'
+
+    def __init__(self, token: str):
+        self.token = token
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'{self.token} rolled a double! Getting out of jail.'
+
+
+class JailDoubleMissed(Event):
+    __slots__ = ('token', 'attempt', 'final')
+    kind = 'jail_double_missed'
+
+    def __init__(self, token: str, attempt: int, final: bool):
+        self.token = token
+        self.attempt = attempt
+        self.final = final
+
+    def render(self, currency: str) -> Optional[str]:
+        if self.final:
+            return f'{self.token} did not roll a double by the third turn.'
+        return f'{self.token} did not roll a double. Cannot get out of jail. Try next time.'
+
+
+class FinePaid(Event):
+    __slots__ = ('token', 'amount')
+    kind = 'fine_paid'
+
+    def __init__(self, token: str, amount: int):
+        self.token = token
+        self.amount = amount
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'{self.token} has paid a fine of {currency} {self.amount}.'
+
+
+class PlayerExited(Event):
+    __slots__ = ('token', 'balance')
+    kind = 'player_exited'
+
+    def __init__(self, token: str, balance: int):
+        self.token = token
+        self.balance = balance
+
+    def render(self, currency: str) -> Optional[str]:
+        return f'{self.token} has exited the game due to bankruptcy. Balance is: {self.balance}'
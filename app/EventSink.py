@@ -0,0 +1,73 @@
+from abc import ABC, abstractmethod
+from json import dumps
+from typing import TextIO
+
+from app.Config import Config
+from app.Event import Event
+
+
+class EventSink(ABC):
+    """
+    Receives the events emitted while a game is played.
+    """
+
+    @abstractmethod
+    def emit(self, event: Event):
+        """
+        Handle a single game event.
+        :param event: The event.
+        """
+        pass
+
+    def close(self):
+        """
+        Release any resources held by the sink.
+        By default, do nothing.
+        """
+        pass
+
+
+# ---------------------------------------------------------
+
+class ConsoleEventSink(EventSink):
+    """
+    Prints every event in the same human readable form
+    the game has always used.
+    """
+
+    def __init__(self, currency: str = None):
+        # the currency the amounts are shown in, the one of Config by default.
+        self.currency = currency if currency is not None else Config.CURRENCY
+
+    def emit(self, event: Event):
+        text = event.render(self.currency)
+        if text is not None:
+            print(text)
+
+
+# ---------------------------------------------------------
+
+class NullEventSink(EventSink):
+    """
+    Discards every event. Used for headless games.
+    """
+
+    def emit(self, event: Event):
+        pass
+
+
+# ---------------------------------------------------------
+
+class JsonlEventSink(EventSink):
+    """
+    Writes every event as one JSON object per line.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def emit(self, event: Event):
+        self.stream.write(dumps(event.to_dict()) + '\n')
+
+    def close(self):
+        self.stream.flush()
@@ -0,0 +1,184 @@
+"""
+A bot that decides by an exact expectimax search over the dice.
+
+At every decision, the bot clones the game and plays the next turns for
+every outcome of the dice, weighted by its probability. The bot takes the
+best answer to each of its own questions, while the other players answer
+like the rollout bot. After a number of turns, the share of the net worth
+of the bot is the value of the state.
+
+The same state is often met again, e.g. when two rolls are played in the
+other order, so the values of the searched states are kept in a
+transposition table by Zobrist hash. The chance squares draw their amount
+from a generator seeded by the hash of the state, so that a state always
+has the same value.
+"""
+from typing import List, Sequence, Tuple
+
+from app.DecisionProvider import BUY, AnswerProbe, ChoiceDecisionProvider, DecisionProvider, ThresholdBuyProvider
+from app.DiePair import DiePair
+from app.MctsDecisionProvider import reward
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+from app.TranspositionTable import TranspositionTable
+from app.Zobrist import zobrist_keys
+
+
+def dice_outcomes(pool1: Sequence[int], pool2: Sequence[int]) -> List[Tuple[float, Tuple[int, int]]]:
+    """
+    :return: The distinct outcomes of rolling two dice, by total and double, with one pair of values of each.
+    """
+    outcomes = {}
+    probability = 1.0 / (len(pool1) * len(pool2))
+    for value1 in pool1:
+        for value2 in pool2:
+            key = (value1 + value2, value1 == value2)
+            if key in outcomes:
+                outcomes[key][0] += probability
+            else:
+                outcomes[key] = [probability, (value1, value2)]
+    return [(probability, values) for probability, values in outcomes.values()]
+
+
+class FixedDiePair(DiePair):
+    """
+    Rolls the values it is given, so that the search goes through every outcome.
+    """
+
+    def __init__(self, rules: RuleSet = None):
+        super().__init__(rules=rules)
+        self.next_values = (1, 1)
+
+    def roll_pair(self):
+        self.die1.value, self.die2.value = self.next_values
+
+
+class ExpectimaxDecisionProvider(ChoiceDecisionProvider):
+    """
+    Decides by searching every roll of the dice of the next turns.
+    """
+
+    def __init__(self, depth: int = 4, rollout_provider: DecisionProvider = None,
+                 table: TranspositionTable = None):
+        """
+        :param depth: The number of turns searched, the current one included.
+        :param rollout_provider: The bot of the other players, and the first answer tried by this one.
+        :param table: The transposition table, kept from one decision to the next.
+        """
+        if depth < 1:
+            raise ValueError(f'Invalid search depth: {depth}')
+
+        self.depth = depth
+        super().__init__(rollout_provider if rollout_provider is not None else ThresholdBuyProvider())
+        self.table = table if table is not None else TranspositionTable()
+
+        # the values of the answers of the last decision
+        self.last_values = {}
+
+        # the search in progress
+        self.__player_id = 0
+        self.__player_key = 0
+        self.__probe = AnswerProbe(self.rollout_provider)
+        self.__outcomes = []
+
+    # ---------------------------------------------------------
+
+    def choose(self, player, kind: str, answers: Sequence):
+        """
+        :param player: The player who is asked.
+        :param kind: The kind of question.
+        :param answers: The possible answers, the one to fall back on first.
+        :return: The answer with the best expected value.
+        """
+        player_count = len(player.game.players)
+        game = player.game.clone(decision_providers=[self.rollout_provider] * player_count,
+                                 random_streams=RandomStreams(0), hash_state=True)
+        game.die_pair = FixedDiePair(rules=game.rules)
+        searcher = game.players[player.player_id]
+        searcher.decision_provider = self.__probe
+
+        # the values depend on who searches, so their states are hashed apart.
+        self.__player_id = player.player_id
+        self.__player_key = zobrist_keys('searcher', player_count)[player.player_id]
+        die_pair = player.game.die_pair
+        self.__outcomes = dice_outcomes(die_pair.die1.die_pool, die_pair.die2.die_pool)
+
+        values = []
+        for answer in answers:
+            if kind == BUY:
+                # the question is asked once the player has landed, so only the end of the turn remains.
+                snapshot = game.snapshot(with_random=False)
+                if answer:
+                    searcher.buy_property(game.board.get_square(searcher.square_position))
+                game.finish_turn(searcher)
+                values.append(self.__value(game, self.depth - 1))
+                game.restore(snapshot)
+            else:
+                # the jail questions are asked before rolling, so the whole turn is searched with the answer.
+                values.append(self.__turn(game, self.depth, (answer,)))
+
+        self.last_values = dict(zip(answers, values))
+
+        # the fallback answer wins ties.
+        best = 0
+        for index in range(1, len(answers)):
+            if values[index] > values[best]:
+                best = index
+        return answers[best]
+
+    def __value(self, game, depth: int) -> float:
+        """
+        :return: The value of the state at the start of a turn, searched to the depth.
+        """
+        if depth <= 0 or game.is_game_over():
+            return reward(game, self.__player_id)
+
+        player = game.get_player_by_id(game.current_player_id)
+        if player.has_exited:
+            current_round, current_player_id = game.current_round, game.current_player_id
+            game.end_turn()
+            value = self.__value(game, depth)
+            game.current_round, game.current_player_id = current_round, current_player_id
+            return value
+
+        key = game.get_state_hash() ^ self.__player_key
+        value = self.table.lookup(key, depth)
+        if value is None:
+            value = self.__turn(game, depth, ())
+            self.table.store(key, depth, value)
+        return value
+
+    def __turn(self, game, depth: int, forced: Tuple) -> float:
+        """
+        :param forced: The answers to the first questions of the searching player in this turn.
+        :return: The expected value of the turn of the current player, over the dice.
+        """
+        player = game.get_player_by_id(game.current_player_id)
+        snapshot = game.snapshot(with_random=False)
+        state_hash = game.get_state_hash()
+        chance = game.random_streams.chance
+        probe = self.__probe
+
+        expected = 0.0
+        for index, (probability, values) in enumerate(self.__outcomes):
+            best = None
+            # every sequence of answers of the searching player in this turn, starting with the forced ones
+            pending = [forced]
+            while pending:
+                answers = pending.pop()
+                probe.start(answers)
+                game.die_pair.next_values = values
+                # the chance squares draw the same amounts whenever this outcome is played from this state.
+                chance.seed(state_hash ^ index)
+                game.play_turn(player)
+
+                for question in range(len(answers), len(probe.answers)):
+                    for option in probe.options[question][1:]:
+                        pending.append(tuple(probe.answers[:question]) + (option,))
+
+                value = self.__value(game, depth - 1)
+                if best is None or value > best:
+                    best = value
+                game.restore(snapshot)
+            expected += probability * best
+        return expected
@@ -1,11 +1,19 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 
 from app.Board import Board
-from app.Config import Config
+from app.BoardLayout import BoardLayout
+from app.DecisionProvider import DecisionProvider
 from app.DiePair import DiePair
-from app.Player import Player
-from json import dumps, loads
+from app.Event import RoundStarted, GameOver, GameSaved, AutosaveFailed
+from app.EventSink import EventSink, ConsoleEventSink, NullEventSink
+from app.GameCodec import BINARY, EXTENSIONS, encode_game, encode_json
+from app.Player import Player, HashedPlayer
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+from app.SaveArchive import SaveArchive
+from app.SaveIds import new_save_id, format_save_id
+from app.Zobrist import TURN_KEY, mix
 from pathlib import Path
 
 
@@ -14,86 +22,165 @@ class Game:
     Defines the game.
     """
 
-    def __init__(self, player_count: int = 2, game_dict=None):
-        self.board = Board()
-        self.die_pair = DiePair()
+    def __init__(self, player_count: int = 2, game_dict=None, event_sink: EventSink = None,
+                 decision_providers: List[DecisionProvider] = None, random_streams: RandomStreams = None,
+                 rules: RuleSet = None, board_layout: BoardLayout = None, hash_state: bool = False):
+        # the rules of this game, the ones of Config by default.
+        self.rules = rules if rules is not None else RuleSet.from_config()
+        # where the game reports what happens, the console by default.
+        self.event_sink: EventSink = event_sink if event_sink is not None else ConsoleEventSink(self.rules.currency)
+        # the random generators of this game only.
+        self.random_streams = random_streams if random_streams is not None else RandomStreams()
+        # the standard board by default
+        self.board = Board(board_layout, hash_ownership=hash_state)
+        self.die_pair = DiePair(rng=self.random_streams.dice, rules=self.rules)
         self.game_aborted = False
+        # the TurnJournal which records every turn, if the game is journaled.
+        self.journal = None
+        # the ReplayRecorder of the game, if it is recorded.
+        self.replay = None
+        # the Autosaver of the game, if it is saved periodically.
+        self.autosave = None
+        # the SaveArchive, or its path, the game is saved to when a player saves and exits, instead of a file
+        # of its own.
+        self.archive = None
+        # whether the players keep a hash of their state, e.g. for a search which meets the same states again.
+        self.player_class = HashedPlayer if hash_state else Player
+
+        # the players by token, and the ones still playing, filled once all the players exist.
+        self.players_by_token: Dict[str, Player] = {}
+        self.active_players_by_token: Dict[str, Player] = {}
 
         # create the players.
         if game_dict is not None:
             self.current_round = game_dict['current_round']
             self.current_player_id = game_dict['current_player_id']
-            self.players = [Player(game=self, player_dict=player_dict) for player_dict in game_dict['players']]
+            self.players = [self.player_class(game=self, player_dict=player_dict)
+                            for player_dict in game_dict['players']]
         else:
             self.players = self.create_players(player_count)
             self.current_player_id = 0
             self.current_round = 1
 
+        self.players_by_token = {player.token: player for player in self.players}
+        self.active_players_by_token = {player.token: player for player in self.players if not player.has_exited}
+
+        # let the given providers decide for the players, in seat order.
+        if decision_providers is not None:
+            if len(decision_providers) != len(self.players):
+                raise ValueError(f'Expected {len(self.players)} decision providers, got {len(decision_providers)}')
+            for player, decision_provider in zip(self.players, decision_providers):
+                player.decision_provider = decision_provider
+
     def launch_game(self):
         # show the current turn
-        print(f'\nCurrent Round: {self.current_round}\n')
+        self.event_sink.emit(RoundStarted(self.current_round))
 
         while not self.is_game_over():
             # get the current player from the board.
             player = self.get_player_by_id(self.current_player_id)
 
-            # ensure the player is valid
+            # skip the players who have already exited
             if player.has_exited:
+                self.end_turn()
                 continue
 
-            if not Config.IS_TEST_ENVIRONMENT:
-                # prompt user to press enter to play their turn
-                print(f'\n ---- Turn of: {player.token} -------')
-                print(f'1. Play your turn')
-                print(f'2. Save and exit game')
-                choice = input('Enter your choice (1/2) :>').strip()
-                if choice != '1':
-                    if choice != '2':
-                        print('Invalid choice. Will save and exit game.')
-
-                    self.current_player_id = player.player_id
-                    self.save_game()
-                    self.game_aborted = True
-                    break
+            # the player may prefer to save and exit instead of playing their turn
+            if player.decision_provider.should_save_and_exit(player):
+                self.current_player_id = player.player_id
+                self.save_game(archive=self.archive)
+                self.game_aborted = True
+                break
+
+            self.play_turn(player)
+
+        # the journal is not needed once the game is over or saved
+        if self.journal is not None:
+            self.journal.discard()
+            self.journal = None
+        if self.replay is not None:
+            self.replay.close(self)
+            self.replay = None
+        if self.autosave is not None:
+            try:
+                self.autosave.close(self)
+            except Exception as error:
+                # the game is over or saved all the same
+                self.event_sink.emit(AutosaveFailed(str(self.autosave.path), f'{type(error).__name__}: {error}'))
+            self.autosave = None
 
-            # ask the player to take their turn
-            player.play()
+        if not self.game_aborted:
+            self.announce_winners()
 
-            # check if the player is bankrupt
-            if player.is_bankrupt():
-                player.exit_game()
+    def play_turn(self, player: Player):
+        """
+        Play the turn of the given player and move on to the next one.
+        :param player: The current player.
+        """
+        # ask the player to take their turn
+        player.play()
+        self.finish_turn(player)
+        if self.journal is not None:
+            self.journal.record(self)
+        if self.replay is not None:
+            self.replay.record(self)
+        if self.autosave is not None:
+            self.autosave.record(self)
+
+    def finish_turn(self, player: Player):
+        """
+        Settle the turn the player has just played and move on to the next one.
+        :param player: The current player.
+        """
+        # check if the player is bankrupt
+        if player.is_bankrupt():
+            player.exit_game()
 
-            # once the player is finished with their check if this was the last player
-            if self.current_player_id == (len(self.players) - 1):
+        self.end_turn()
 
-                # increase the round
-                self.current_round += 1
+    def end_turn(self):
+        """
+        Hand the turn over to the next player.
+        """
+        # once the player is finished with their check if this was the last player
+        if self.current_player_id == (len(self.players) - 1):
 
-                # set the next player as the first one
-                self.current_player_id = 0
+            # increase the round
+            self.current_round += 1
 
-                if self.current_round <= 100:
-                    # show the current round
-                    print(f'\nCurrent Round: {self.current_round}\n')
-            else:
-                # move to the next player.
-                self.current_player_id += 1
+            # set the next player as the first one
+            self.current_player_id = 0
 
-        if not self.game_aborted:
-            self.announce_winners()
+            if self.current_round <= self.rules.max_round_count:
+                # show the current round
+                self.event_sink.emit(RoundStarted(self.current_round))
+        else:
+            # move to the next player.
+            self.current_player_id += 1
 
     def announce_winners(self):
-        print('\n ------ GAME OVER --------')
-        print('The winners of the game are:-')
-        for winner in self.get_winners():
-            print(f'{winner.token} with a balance of {Config.CURRENCY} {winner.balance}')
+        self.event_sink.emit(GameOver([(winner.token, winner.balance) for winner in self.get_winners()]))
+
+    def update_active_player(self, player: Player):
+        """
+        Keep track of whether a player of this game is still playing.
+        :param player: The player who exited or came back.
+        """
+        # ignore the players who do not belong to this game
+        if self.players_by_token.get(player.token) is not player:
+            return
+
+        if player.has_exited:
+            self.active_players_by_token.pop(player.token, None)
+        else:
+            self.active_players_by_token[player.token] = player
 
     def is_game_over(self) -> bool:
         # get the number of players remaining
-        active_player_count = len(self.get_active_players())
+        active_player_count = len(self.active_players_by_token)
 
         # return whether there is only one player or we have finished 100 rounds.
-        return active_player_count == 1 or self.current_round > Config.MAX_ROUND_COUNT
+        return active_player_count == 1 or self.current_round > self.rules.max_round_count
 
     def create_players(self, player_count: int) -> List[Player]:
         """
@@ -102,10 +189,11 @@ class Game:
         :return:  The created players.
         """
         # ensure the player number is correct.
-        if player_count < Config.MIN_PLAYER_COUNT or player_count > Config.MAX_PLAYER_COUNT:
+        if player_count < self.rules.min_player_count or player_count > self.rules.max_player_count:
             raise ValueError(f'Invalid number of players: {player_count}')
 
-        players = [Player(token=f'Player {i}', player_id=i - 1, game=self) for i in range(1, player_count + 1)]
+        players = [self.player_class(token=f'Player {i}', player_id=i - 1, game=self)
+                   for i in range(1, player_count + 1)]
         return players
 
     def get_player_by_id(self, player_id) -> Optional[Player]:
@@ -125,12 +213,7 @@ class Game:
         :param player_token: The player token
         :return: The player or none if not found.
         """
-
-        # filter players
-        filtered_players = [player for player in self.players if player.token == player_token]
-        if len(filtered_players) == 0:
-            return None
-        return filtered_players[0]
+        return self.players_by_token.get(player_token)
 
     def get_winners(self) -> List[Player]:
         """
@@ -152,9 +235,93 @@ class Game:
 
     def get_active_players(self) -> List[Player]:
         """
-        :return: The number of players who are yet to retire.
+        :return: The players who are yet to retire, in seat order.
+        """
+        return sorted(self.active_players_by_token.values(), key=lambda player: player.player_id)
+
+    def get_state_hash(self) -> int:
+        """
+        The Zobrist hash of the state of the game: the round and turn, who owns what and the players.
+        Only the games created with hash_state have it.
+        :return: The hash, equal for equal states.
+        """
+        if self.player_class is not HashedPlayer:
+            raise ValueError('The game does not hash its state')
+
+        state_hash = self.board.ownership.hash ^ mix(TURN_KEY ^ (self.current_round << 8 | self.current_player_id))
+        for player in self.players:
+            state_hash ^= player.state_hash
+        return state_hash
+
+    def snapshot(self, with_random: bool = True) -> tuple:
+        """
+        Copy the state of the game which changes while playing: the round and turn, the players,
+        who owns what and the random streams. The rules, board layout and decision providers are shared.
+        :param with_random: Whether to copy the random streams, the most expensive part.
+        :return: The snapshot.
         """
-        return [player for player in self.players if not player.has_exited]
+        random_streams = self.random_streams.snapshot() if with_random else None
+        die_pair = self.die_pair.snapshot() if with_random else None
+        return (self.current_round, self.current_player_id, self.game_aborted,
+                tuple(player.snapshot() for player in self.players), self.board.ownership.snapshot(),
+                random_streams, die_pair)
+
+    def restore(self, snapshot: tuple):
+        """
+        Go back to a snapshot of this game, or of one of its clones.
+        :param snapshot: The snapshot.
+        """
+        (self.current_round, self.current_player_id, self.game_aborted, players, ownership, random_streams,
+         die_pair) = snapshot
+        for player, player_snapshot in zip(self.players, players):
+            player.restore(player_snapshot)
+        self.board.ownership.restore(ownership)
+        if random_streams is not None:
+            self.random_streams.restore(random_streams)
+            self.die_pair.restore(die_pair)
+
+    def clone(self, event_sink: EventSink = None, decision_providers: List[DecisionProvider] = None,
+              random_streams: RandomStreams = None, hash_state: bool = None) -> 'Game':
+        """
+        Copy the game, e.g. to look ahead without changing it.
+        :param event_sink: Where the clone reports what happens, nowhere by default.
+        :param decision_providers: Who decides for the players of the clone, the same providers by default.
+        :param random_streams: The random streams of the clone. By default, a copy of the ones of this game,
+        so that the clone plays exactly like this game would with the same decisions.
+        :param hash_state: Whether the clone hashes its state, like this game by default.
+        :return: The clone.
+        """
+        game = Game.__new__(Game)
+        game.rules = self.rules
+        game.event_sink = event_sink if event_sink is not None else NullEventSink()
+        game.game_aborted = False
+        game.journal = None
+        game.replay = None
+        game.autosave = None
+        game.archive = None
+        if hash_state is None:
+            game.player_class = self.player_class
+        else:
+            game.player_class = HashedPlayer if hash_state else Player
+        copy_random = random_streams is None
+        if copy_random:
+            random_streams = RandomStreams(self.random_streams.seed, self.random_streams.game_index)
+        game.random_streams = random_streams
+        game.board = Board(self.board.layout, hash_ownership=game.player_class is HashedPlayer)
+        game.die_pair = self.die_pair.copy(rng=random_streams.dice)
+
+        if decision_providers is None:
+            decision_providers = [player.decision_provider for player in self.players]
+        game.players_by_token = {}
+        game.active_players_by_token = {}
+        game.players = [game.player_class(game=game, token=player.token, player_id=player.player_id,
+                                          decision_provider=decision_provider)
+                        for player, decision_provider in zip(self.players, decision_providers)]
+        game.players_by_token = {player.token: player for player in game.players}
+        game.active_players_by_token = dict(game.players_by_token)
+
+        game.restore(self.snapshot(with_random=copy_random))
+        return game
 
     def to_dict(self):
         """
@@ -166,28 +333,46 @@ class Game:
             'current_round': self.current_round,
         }
 
-    def get_file_name(self, path: str = ''):
+    def get_file_name(self, path: str = '', extension: str = '.msav'):
         """
-        Get the file name to save a monopoly game.
+        Get a new file name to save a monopoly game, unique among all the processes which save games.
         """
-        path = Path('saved_games').joinpath('config.json')
-        with path.open('r+') as f:
-            config = loads(f.read())
-            counter = config['counter']
-            config['counter'] = counter + 1
-            f.seek(0)
-            f.write(dumps(config, indent=4))
-
-            return f'monopoly_{counter}.json'
+        return f'monopoly_{format_save_id(new_save_id())}{extension}'
 
-    def save_game(self, path: str = ''):
+    def save_game(self, path: str = '', file_format: str = BINARY, archive=None):
         """
         Save the game to file.
+        :param path: The prefix of the saved_games folder.
+        :param file_format: The compact binary format, or JSON to export a readable save.
+        :param archive: The SaveArchive to append the save to, instead of a file of its own, or its path to open
+        it only while saving.
+        :return: The name of the file, or the id of the save in the archive.
         """
-        file_name = self.get_file_name(path)
-        path = Path(path + 'saved_games').joinpath(file_name)
-        with path.open('w') as f:
-            game_data = self.to_dict()
-            f.write(dumps(game_data, indent=4))
-            print(f'Game was saved as: {file_name}. Use this name to load it.')
+        if file_format not in EXTENSIONS:
+            raise ValueError(f'Unknown save format: {file_format}')
+
+        data = encode_game(self) if file_format == BINARY else encode_json(self)
+        if archive is not None:
+            if file_format != BINARY:
+                raise ValueError('An archive only holds binary saves')
+            if isinstance(archive, SaveArchive):
+                save_id = archive.put(data)
+            else:
+                # the other games wait for the archive as long as it is open for writing
+                with SaveArchive(archive) as opened:
+                    save_id = opened.put(data)
+            file_name = format_save_id(save_id)
+            self.event_sink.emit(GameSaved(file_name))
+            return file_name
+
+        while True:
+            file_name = self.get_file_name(path, EXTENSIONS[file_format])
+            try:
+                # never overwrite another save
+                with Path(path + 'saved_games').joinpath(file_name).open('xb') as f:
+                    f.write(data)
+                break
+            except FileExistsError:
+                continue
+        self.event_sink.emit(GameSaved(file_name))
         return file_name
\ No newline at end of file
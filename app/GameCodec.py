@@ -0,0 +1,309 @@
+"""
+A compact binary encoding of saved games.
+
+A save is a fixed header, one record per player and the owner of every
+square, all little endian:
+
+    header   magic 'MSAV', version, player count, current player id,
+             current round, square count
+    player   balance, position, moves since jail, flags, player id,
+             token length, then the token in UTF-8
+    owners   one signed byte per square: the seat of the owner, or -1
+
+A 3-player game takes about 80 bytes, and decoding restores the state
+into a new game without going through a dictionary. The JSON format of
+Game.to_dict is still written on demand, and read by load_game_file, as
+are the binary saves compressed with zlib, e.g. by the autosave.
+"""
+import zlib
+from array import array
+from json import dumps, loads
+from pathlib import Path
+from struct import Struct
+from typing import Dict, Sequence
+
+# the formats of the saved games
+BINARY = 'binary'
+JSON = 'json'
+
+# the file extension of each format
+EXTENSIONS = {BINARY: '.msav', JSON: '.json'}
+
+MAGIC = b'MSAV'
+VERSION = 1
+
+# a binary save compressed with zlib
+COMPRESSED_MAGIC = b'MSAZ'
+COMPRESSED_EXTENSION = '.msavz'
+
+# magic, version, player count, current player id, current round, square count
+HEADER = Struct('<4sBBBxIH')
+# balance, position, moves since jail, flags, player id, token length
+PLAYER = Struct('<iHBBBB')
+
+# the flags of a player
+IS_JAILED = 1
+HAS_EXITED = 2
+JAIL_BAIL_MODE = 4
+JAIL_FEELING_LUCKY_MODE = 8
+
+NO_OWNER = -1
+
+
+def encode_game(game) -> bytes:
+    """
+    :param game: The game.
+    :return: The binary save of the game.
+    """
+    return encode_snapshot(game, game.snapshot(with_random=False))
+
+
+def player_flags(state: tuple) -> int:
+    """
+    :param state: The snapshot of a player.
+    :return: The flags of the player.
+    """
+    _, is_jailed, _, _, has_exited, jail_bail_mode, jail_feeling_lucky_mode = state
+    return ((IS_JAILED if is_jailed else 0) | (HAS_EXITED if has_exited else 0) |
+            (JAIL_BAIL_MODE if jail_bail_mode else 0) | (JAIL_FEELING_LUCKY_MODE if jail_feeling_lucky_mode else 0))
+
+
+def encode_snapshot(game, snapshot: tuple) -> bytes:
+    """
+    Encode a snapshot of a game, e.g. on another thread than the one playing it.
+    :param game: The game the snapshot was taken from, for what does not change while playing.
+    :param snapshot: The snapshot, from Game.snapshot.
+    :return: The binary save of the game in the state of the snapshot, like encode_game.
+    """
+    current_round, current_player_id, _, states, (owner_ids, _, tokens, _), _, _ = snapshot
+    players = game.players
+    seats: Dict[str, int] = {player.token: seat for seat, player in enumerate(players)}
+
+    parts = [HEADER.pack(MAGIC, VERSION, len(players), current_player_id, current_round, len(owner_ids))]
+    for player, state in zip(players, states):
+        token = player.token.encode()
+        if len(token) > 255:
+            raise ValueError(f'The token of {player.token} is too long to save')
+        parts.append(PLAYER.pack(state[0], state[2], state[3], player_flags(state), player.player_id, len(token)))
+        parts.append(token)
+
+    # the squares owned by someone who is not playing are saved without owner
+    owner_seats = [seats.get(token, NO_OWNER) for token in tokens]
+    parts.append(array('b', [NO_OWNER if owner_id == NO_OWNER else owner_seats[owner_id]
+                             for owner_id in owner_ids]).tobytes())
+    return b''.join(parts)
+
+
+def _read(data: bytes):
+    """
+    Read a binary save.
+    :return: The header fields, the player records with their tokens, and the owners.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError('Not a saved game')
+    magic, version, player_count, current_player_id, current_round, square_count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('Not a saved game')
+    if version != VERSION:
+        raise ValueError(f'Unsupported save version: {version}')
+
+    offset = HEADER.size
+    players = []
+    for _ in range(player_count):
+        if offset + PLAYER.size > len(data):
+            raise ValueError('The saved game is truncated')
+        record = PLAYER.unpack_from(data, offset)
+        offset += PLAYER.size
+        token = data[offset:offset + record[-1]].decode()
+        offset += record[-1]
+        players.append((record, token))
+
+    if len(data) != offset + square_count:
+        raise ValueError('The saved game is truncated')
+    if current_player_id >= player_count:
+        raise ValueError(f'Invalid current player id: {current_player_id}')
+    if current_round < 1:
+        raise ValueError(f'Invalid current round: {current_round}')
+    tokens = set()
+    for seat, ((_, square_position, _, _, player_id, _), token) in enumerate(players):
+        if player_id != seat:
+            raise ValueError(f'Invalid player id in seat {seat}: {player_id}')
+        if not 1 <= square_position <= square_count:
+            raise ValueError(f'Invalid position of {token}: {square_position}')
+        if not token or token in tokens:
+            raise ValueError(f'Empty or duplicate token: {token!r}')
+        tokens.add(token)
+
+    owners = array('b')
+    owners.frombytes(data[offset:])
+    for seat in owners:
+        if not NO_OWNER <= seat < player_count:
+            raise ValueError(f'Invalid owner seat: {seat}')
+    return current_player_id, current_round, square_count, players, owners
+
+
+def decode_game_dict(data: bytes) -> dict:
+    """
+    :param data: A binary save.
+    :return: The game as a dictionary, like Game.to_dict.
+    """
+    current_player_id, current_round, _, players, owners = _read(data)
+    properties = [[] for _ in players]
+    for index, seat in enumerate(owners):
+        if seat != NO_OWNER:
+            properties[seat].append(index + 1)
+
+    return {
+        'players': [{
+            'token': token,
+            'balance': balance,
+            'is_jailed': bool(flags & IS_JAILED),
+            'square_position': square_position,
+            'has_exited': bool(flags & HAS_EXITED),
+            'player_id': player_id,
+            'move_count_since_jail': move_count_since_jail,
+            'jail_bail_mode': bool(flags & JAIL_BAIL_MODE),
+            'jail_feeling_lucky_mode': bool(flags & JAIL_FEELING_LUCKY_MODE),
+            'properties': properties[seat],
+        } for seat, ((balance, square_position, move_count_since_jail, flags, player_id, _), token)
+            in enumerate(players)],
+        'current_player_id': current_player_id,
+        'current_round': current_round,
+    }
+
+
+# the schema of the dictionaries of Game.to_dict
+GAME_FIELDS = {'players': list, 'current_player_id': int, 'current_round': int}
+PLAYER_FIELDS = {'token': str, 'balance': int, 'is_jailed': bool, 'square_position': int, 'has_exited': bool,
+                 'player_id': int, 'move_count_since_jail': int, 'jail_bail_mode': bool,
+                 'jail_feeling_lucky_mode': bool, 'properties': list}
+
+
+def _check_fields(value, fields: Dict[str, type], name: str):
+    if not isinstance(value, dict):
+        raise ValueError(f'{name} is not an object')
+    for field, field_type in fields.items():
+        if field not in value:
+            raise ValueError(f'{name} has no {field}')
+        # a bool is an int in Python, but not in a save
+        if type(value[field]) is not field_type:
+            raise ValueError(f'The {field} of {name} is not a {field_type.__name__}')
+
+
+def validate_game_dict(game_dict, is_property: Sequence[bool]):
+    """
+    Check that a dictionary is a valid game, before creating the game.
+    :param game_dict: The game as a dictionary, like Game.to_dict.
+    :param is_property: Whether each square of the board is a property, e.g. BoardLayout.is_property.
+    """
+    _check_fields(game_dict, GAME_FIELDS, 'The game')
+    players = game_dict['players']
+    if not players:
+        raise ValueError('The game has no players')
+    if not 0 <= game_dict['current_player_id'] < len(players):
+        raise ValueError(f'Invalid current player id: {game_dict["current_player_id"]}')
+    if game_dict['current_round'] < 1:
+        raise ValueError(f'Invalid current round: {game_dict["current_round"]}')
+
+    square_count = len(is_property)
+    tokens = set()
+    owned = set()
+    for seat, player_dict in enumerate(players):
+        _check_fields(player_dict, PLAYER_FIELDS, f'Player {seat + 1}')
+        token = player_dict['token']
+        if not token or token in tokens:
+            raise ValueError(f'Invalid or repeated token: {token!r}')
+        tokens.add(token)
+        if player_dict['player_id'] != seat:
+            raise ValueError(f'{token} has the player id {player_dict["player_id"]} in seat {seat}')
+        if not 1 <= player_dict['square_position'] <= square_count:
+            raise ValueError(f'{token} is on square {player_dict["square_position"]}, not on the board')
+        if player_dict['move_count_since_jail'] < 0:
+            raise ValueError(f'{token} has a negative move count')
+        for position in player_dict['properties']:
+            if type(position) is not int or not 1 <= position <= square_count or not is_property[position - 1]:
+                raise ValueError(f'{token} owns {position!r}, which is not a property')
+            if position in owned:
+                raise ValueError(f'The property {position} is owned twice')
+            owned.add(position)
+
+
+def decode_game(data: bytes, **game_options):
+    """
+    Create a game from a binary save.
+    :param data: The binary save.
+    :param game_options: The other arguments of Game, e.g. the event sink or the decision providers.
+    :return: The game.
+    """
+    from app.BoardLayout import standard_layout
+    from app.Game import Game
+
+    current_player_id, current_round, square_count, players, owners = _read(data)
+    layout = game_options.get('board_layout')
+    if layout is None:
+        layout = standard_layout()
+    if layout.square_count != square_count:
+        raise ValueError(f'The game was saved on a board of {square_count} squares')
+    for index, seat in enumerate(owners):
+        if seat != NO_OWNER and not layout.is_property[index]:
+            raise ValueError(f'Square {index + 1} has an owner but is not a property')
+
+    tokens = [token for _, token in players]
+    if tokens != [f'Player {seat}' for seat in range(1, len(players) + 1)] or \
+            any(record[4] != seat for seat, (record, _) in enumerate(players)):
+        # the players were named otherwise, create them from a dictionary
+        return Game(game_dict=decode_game_dict(data), **game_options)
+
+    game = Game(player_count=len(players), **game_options)
+    game.current_round = current_round
+    game.current_player_id = current_player_id
+    for player, ((balance, square_position, move_count_since_jail, flags, _, _), _) in zip(game.players, players):
+        player.restore((balance, bool(flags & IS_JAILED), square_position, move_count_since_jail,
+                        bool(flags & HAS_EXITED), bool(flags & JAIL_BAIL_MODE), bool(flags & JAIL_FEELING_LUCKY_MODE)))
+
+    ownership = game.board.ownership
+    for index, seat in enumerate(owners):
+        if seat != NO_OWNER:
+            ownership.set_owner(index + 1, tokens[seat])
+    return game
+
+
+def encode_json(game) -> bytes:
+    """
+    :return: The game in the JSON format, pretty-printed.
+    """
+    return dumps(game.to_dict(), indent=4).encode()
+
+
+def compress_save(data: bytes, level: int = 6) -> bytes:
+    """
+    :param data: A binary save.
+    :param level: The zlib compression level, from 1 for the fastest to 9 for the smallest.
+    :return: The compressed save.
+    """
+    return COMPRESSED_MAGIC + zlib.compress(data, level)
+
+
+def read_save_file(path) -> bytes:
+    """
+    :return: The content of a save file, decompressed if needed.
+    """
+    data = Path(path).read_bytes()
+    if data.startswith(COMPRESSED_MAGIC):
+        data = zlib.decompress(data[len(COMPRESSED_MAGIC):])
+    return data
+
+
+def load_game_file(path, **game_options):
+    """
+    Load a saved game in any format.
+    :param path: The path of the save.
+    :param game_options: The other arguments of Game.
+    :return: The game.
+    """
+    from app.Game import Game
+
+    data = read_save_file(path)
+    if data.startswith(MAGIC):
+        return decode_game(data, **game_options)
+    return Game(game_dict=loads(data), **game_options)
@@ -0,0 +1,164 @@
+"""
+Exact landing probabilities of a single player, computed from a Markov chain.
+
+The movement of a player only depends on their square, the dice and the
+jail rules. Money, properties and the other players never change where a
+player goes, so the chain is small: one state per square, plus the turns
+spent in jail when trying to throw a double.
+
+A bail player moves from the jail square on their next turn whether they
+pay now or later, so in jail they behave like a free player standing on
+the jail square.
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.Board import Board
+from app.DecisionProvider import JailStrategy
+from app.Dice import Dice
+from app.Die import Die
+from app.RuleSet import RuleSet
+from app.Square import GoToJailSquare
+
+
+class LandingModel:
+    """
+    The Markov chain of the position of a player, one turn per step.
+    """
+
+    def __init__(self, square_kinds: Tuple[str, ...], dice: Dice, jail_strategy: str, jail_position: int):
+        self.square_count = len(square_kinds)
+        self.jail_strategy = jail_strategy
+        self.jail_position = jail_position
+        self.outcomes = dice.total_distribution()
+
+        # states 0..n-1 are the free squares, the next ones the failed double attempts in jail.
+        jail_attempts = 3 if jail_strategy == JailStrategy.FEELING_LUCKY else 0
+        self.state_count = self.square_count + jail_attempts
+
+        go_to_jail = {index for index, kind in enumerate(square_kinds) if kind == GoToJailSquare.__name__}
+        # where a player lands from each state: state -> [(probability, landed square index, next state)]
+        self.moves: List[List[Tuple[float, int, int]]] = [[] for _ in range(self.state_count)]
+
+        for state in range(self.square_count):
+            for probability, total, _ in self.outcomes:
+                self.__add_move(state, state, probability, total, go_to_jail)
+
+        for attempt in range(jail_attempts):
+            state = self.square_count + attempt
+            jail_index = jail_position - 1
+            for probability, total, is_double in self.outcomes:
+                if is_double or attempt == jail_attempts - 1:
+                    # a double, or paying the fine after the last attempt, moves the player.
+                    self.__add_move(state, jail_index, probability, total, go_to_jail)
+                else:
+                    self.moves[state].append((probability, -1, state + 1))
+
+        self.stationary = self.__solve_stationary()
+        self.stationary_landing = self.__landing(self.stationary)
+        self.__landing_after: Dict[int, Tuple[float, ...]] = {}
+
+    def __add_move(self, state: int, from_index: int, probability: float, total: int, go_to_jail):
+        landed = (from_index + total) % self.square_count
+        if landed in go_to_jail:
+            # the jailed player either stands on the jail square or starts trying doubles.
+            if self.jail_strategy == JailStrategy.FEELING_LUCKY:
+                next_state = self.square_count
+            else:
+                next_state = self.jail_position - 1
+        else:
+            next_state = landed
+        self.moves[state].append((probability, landed, next_state))
+
+    def __step(self, distribution: Sequence[float]) -> List[float]:
+        next_distribution = [0.0] * self.state_count
+        for state, mass in enumerate(distribution):
+            if mass:
+                for probability, _, next_state in self.moves[state]:
+                    next_distribution[next_state] += mass * probability
+        return next_distribution
+
+    def __landing(self, distribution: Sequence[float]) -> Tuple[float, ...]:
+        landing = [0.0] * self.square_count
+        for state, mass in enumerate(distribution):
+            if mass:
+                for probability, landed, _ in self.moves[state]:
+                    if landed >= 0:
+                        landing[landed] += mass * probability
+        return tuple(landing)
+
+    def __solve_stationary(self) -> Tuple[float, ...]:
+        """
+        Solve pi = pi P with sum(pi) = 1 by Gaussian elimination.
+        """
+        n = self.state_count
+
+        # (P^T - I) pi = 0, with the last equation replaced by the normalization.
+        matrix = [[0.0] * (n + 1) for _ in range(n)]
+        for state in range(n):
+            matrix[state][state] -= 1.0
+            for probability, _, next_state in self.moves[state]:
+                matrix[next_state][state] += probability
+        matrix[n - 1] = [1.0] * n + [1.0]
+
+        for column in range(n):
+            pivot = max(range(column, n), key=lambda row: abs(matrix[row][column]))
+            matrix[column], matrix[pivot] = matrix[pivot], matrix[column]
+            pivot_value = matrix[column][column]
+            if pivot_value == 0.0:
+                continue
+            for row in range(n):
+                if row != column and matrix[row][column]:
+                    factor = matrix[row][column] / pivot_value
+                    for index in range(column, n + 1):
+                        matrix[row][index] -= factor * matrix[column][index]
+
+        return tuple(max(matrix[i][n] / matrix[i][i], 0.0) if matrix[i][i] else 0.0 for i in range(n))
+
+    def landing_after(self, turns: int) -> Tuple[float, ...]:
+        """
+        :param turns: The turn number, starting from 1 on the Go square.
+        :return: For each square, the probability to land on it in that turn.
+        """
+        if turns < 1:
+            raise ValueError(f'Invalid number of turns: {turns}')
+
+        if turns not in self.__landing_after:
+            distribution = [0.0] * self.state_count
+            distribution[0] = 1.0
+            for _ in range(turns - 1):
+                distribution = self.__step(distribution)
+            self.__landing_after[turns] = self.__landing(distribution)
+        return self.__landing_after[turns]
+
+
+@lru_cache(maxsize=None)
+def _landing_model(square_kinds: Tuple[str, ...], die_pools: Tuple[Tuple[int, ...], ...],
+                   weights: Optional[Tuple[Tuple[float, ...], ...]], jail_strategy: str,
+                   jail_position: int) -> LandingModel:
+    return LandingModel(square_kinds, Dice(die_pools, weights), jail_strategy, jail_position)
+
+
+def landing_model(board: Board = None, die_pools: Sequence[Sequence[int]] = None,
+                  weights: Sequence[Sequence[float]] = None, jail_strategy: str = JailStrategy.BAIL,
+                  rules: RuleSet = None) -> LandingModel:
+    """
+    Get the landing model of a board, cached by board layout, dice and jail rules.
+    :param board: The board, the standard one by default.
+    :param die_pools: The faces of every die, the ones of the rules by default.
+    :param weights: The weights of the faces, uniform by default.
+    :param jail_strategy: How the player gets out of jail.
+    :param rules: The rules, the standard ones by default.
+    :return: The landing model.
+    """
+    if board is None:
+        board = Board()
+    if rules is None:
+        rules = RuleSet()
+    if die_pools is None:
+        die_pools = rules.die_pools if rules.die_pools is not None else (Die.die_pool, Die.die_pool)
+    square_kinds = tuple(type(square).__name__ for square in board.layout.squares)
+    pools = tuple(tuple(pool) for pool in die_pools)
+    if weights is not None:
+        weights = tuple(tuple(die_weights) for die_weights in weights)
+    return _landing_model(square_kinds, pools, weights, jail_strategy, rules.jail_square_position)
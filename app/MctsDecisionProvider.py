@@ -0,0 +1,247 @@
+"""
+A bot that decides by Monte Carlo search.
+
+At every decision, the bot clones the game, applies each possible answer
+and plays the rest of the game, or a number of rounds, with fast rollout
+bots and fresh random streams. The answers are picked with the UCB1 rule,
+so the promising ones get most of the playouts. The search stops after a
+number of iterations or at a deadline, whichever comes first, or only at
+the deadline without a number of iterations, and the answer with the best
+average reward is returned.
+
+The playouts can run on a process pool. When the deadline expires, the
+batches still running are abandoned, so a hosted game never waits for a
+bot longer than its time limit, and the workers stop them at the deadline
+too. A batch plays all its playouts with a single clone of the game,
+restored and reseeded after each one.
+"""
+import itertools
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from random import Random
+from typing import List, Optional, Sequence
+
+from app.DecisionProvider import (BUY, JAIL_STRATEGY, PAY_BAIL_NOW, ChoiceDecisionProvider, DecisionProvider,
+                                  ForcedDecision, ThresholdBuyProvider)
+from app.RandomStreams import RandomStreams
+
+
+def net_worth(game, player) -> int:
+    """
+    :return: The balance of the player plus the price of their properties.
+    """
+    prices = game.board.layout.prices
+    return player.balance + sum(prices[position - 1] for position in game.board.ownership.get_positions(player.token))
+
+
+def reward(game, player_id: int) -> float:
+    """
+    :return: The share of a win for a finished game, the share of the net worth of the players otherwise.
+    """
+    player = game.players[player_id]
+    if player.has_exited:
+        return 0.0
+
+    if game.is_game_over():
+        winners = game.get_winners()
+        return 1.0 / len(winners) if player in winners else 0.0
+
+    worths = [max(net_worth(game, other), 0) for other in game.get_active_players()]
+    total = sum(worths)
+    return max(net_worth(game, player), 0) / total if total else 0.0
+
+
+def playout(game, player_id: int, kind: str, answer, horizon: Optional[int]) -> float:
+    """
+    Answer a question of the current player of a game, then play on.
+    The game must be a clone with its own random streams and rollout bots.
+    :param game: The game, in the state where the question was asked.
+    :param player_id: The id of the player who is asked.
+    :param kind: The kind of question.
+    :param answer: The answer.
+    :param horizon: The number of rounds to play after this one, or None to play the game to the end.
+    :return: The reward of the player.
+    """
+    player = game.players[player_id]
+
+    if kind == BUY:
+        # the question is asked once the player has landed, so only the end of the turn remains.
+        if answer:
+            player.buy_property(game.board.get_square(player.square_position))
+        game.finish_turn(player)
+    else:
+        # the jail questions are asked before rolling, so the whole turn is played with the answer.
+        rollout_provider = player.decision_provider
+        player.decision_provider = ForcedDecision(rollout_provider, kind, answer)
+        game.play_turn(player)
+        player.decision_provider = rollout_provider
+
+    last_round = game.rules.max_round_count if horizon is None else game.current_round + horizon
+    while not game.is_game_over() and game.current_round <= last_round:
+        current_player = game.get_player_by_id(game.current_player_id)
+        if current_player.has_exited:
+            game.end_turn()
+        else:
+            game.play_turn(current_player)
+
+    return reward(game, player_id)
+
+
+def run_playouts(game, player_id: int, kind: str, answer, horizon: Optional[int], seeds: Sequence[int],
+                 deadline: Optional[float] = None) -> List[float]:
+    """
+    Run one playout per seed from the same game. This is the unit of work of a worker.
+    A single clone plays every playout, restored and reseeded in between.
+    :param deadline: The time.monotonic after which no playout is started.
+    :return: The rewards of the playouts which were played.
+    """
+    clone = game.clone(random_streams=RandomStreams(seeds[0]) if seeds else None)
+    start = clone.snapshot()
+    rewards = []
+    for seed in seeds:
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        clone.restore(start)
+        clone.random_streams.reseed(seed)
+        rewards.append(playout(clone, player_id, kind, answer, horizon))
+    return rewards
+
+
+class MctsDecisionProvider(ChoiceDecisionProvider):
+    """
+    Decides by playing out every answer many times.
+    """
+
+    def __init__(self, iterations: int = 200, time_limit: Optional[float] = None, horizon: Optional[int] = 20,
+                 exploration: float = 1.4, rollout_provider: DecisionProvider = None, workers: int = 1,
+                 batch_size: int = 16, rng: Random = None):
+        """
+        :param iterations: The maximum number of playouts per decision, or 0 to play out until the time limit.
+        :param time_limit: The maximum number of seconds per decision, no limit by default.
+        :param horizon: The number of rounds played after the current one, or None to finish every game.
+        :param exploration: The exploration constant of UCB1.
+        :param rollout_provider: The bot of every player in the playouts.
+        :param workers: The number of worker processes. 1 plays the playouts in this process.
+        :param batch_size: The number of playouts sent to a worker at once.
+        :param rng: The generator of the seeds of the playouts.
+        """
+        if iterations < 0 or (iterations == 0 and time_limit is None):
+            raise ValueError('The search needs a number of iterations or a time limit')
+
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.horizon = horizon
+        self.exploration = exploration
+        super().__init__(rollout_provider if rollout_provider is not None else ThresholdBuyProvider())
+        self.workers = workers
+        self.batch_size = batch_size
+        self.rng = rng if rng is not None else Random()
+        self.__executor: Optional[ProcessPoolExecutor] = None
+
+        # the statistics of the last decision, by answer: (playouts, average reward)
+        self.last_statistics = {}
+
+    def close(self):
+        """
+        Stop the worker processes, if any.
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
+
+    # ---------------------------------------------------------
+
+    def choose(self, player, kind: str, answers: Sequence):
+        """
+        :param player: The player who is asked.
+        :param kind: The kind of question.
+        :param answers: The possible answers, the one to fall back on first.
+        :return: The answer with the best average reward.
+        """
+        deadline = time.monotonic() + self.time_limit if self.time_limit is not None else None
+
+        # the game the playouts start from, played by the rollout bots only
+        game = player.game.clone(decision_providers=[self.rollout_provider] * len(player.game.players),
+                                 random_streams=player.game.random_streams.spawn(0))
+
+        counts = [0] * len(answers)
+        totals = [0.0] * len(answers)
+        if self.workers > 1:
+            self.__search_in_pool(game, player.player_id, kind, answers, counts, totals, deadline)
+        else:
+            self.__search_inline(game, player.player_id, kind, answers, counts, totals, deadline)
+
+        self.last_statistics = {answer: (count, total / count if count else 0.0)
+                                for answer, count, total in zip(answers, counts, totals)}
+
+        # the fallback answer wins ties, and decides when no playout finished in time.
+        best = 0
+        for index in range(1, len(answers)):
+            if counts[index] and (not counts[best] or totals[index] / counts[index] > totals[best] / counts[best]):
+                best = index
+        return answers[best]
+
+    def __select(self, counts: List[int], totals: List[float], running: List[int]) -> int:
+        """
+        :param running: The number of playouts of each answer which are still running.
+        :return: The index of the answer to play out next, by UCB1.
+        """
+        visits = [count + running_count for count, running_count in zip(counts, running)]
+        for index, visit_count in enumerate(visits):
+            if visit_count == 0:
+                return index
+
+        log_total = math.log(sum(visits))
+        # an answer without any finished playout yet is assumed to be as good as possible.
+        scores = [(total / count if count else 1.0) + self.exploration * math.sqrt(log_total / visit_count)
+                  for count, total, visit_count in zip(counts, totals, visits)]
+        return scores.index(max(scores))
+
+    def __search_inline(self, game, player_id, kind, answers, counts, totals, deadline):
+        running = [0] * len(answers)
+        for _ in (range(self.iterations) if self.iterations else itertools.count()):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            index = self.__select(counts, totals, running)
+            [result] = run_playouts(game, player_id, kind, answers[index], self.horizon, [self.rng.getrandbits(64)])
+            counts[index] += 1
+            totals[index] += result
+
+    def __search_in_pool(self, game, player_id, kind, answers, counts, totals, deadline):
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        # the playouts of the running batches count as visits, so that UCB1 spreads the batches.
+        running = [0] * len(answers)
+        pending = {}
+        submitted = 0
+        while True:
+            while len(pending) < self.workers and (not self.iterations or submitted < self.iterations):
+                index = self.__select(counts, totals, running)
+                size = min(self.batch_size, self.iterations - submitted) if self.iterations else self.batch_size
+                seeds = [self.rng.getrandbits(64) for _ in range(size)]
+                future = self.__executor.submit(run_playouts, game, player_id, kind, answers[index], self.horizon,
+                                                seeds, deadline)
+                pending[future] = index
+                running[index] += size
+                submitted += size
+
+            if not pending:
+                return
+
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # the deadline expired, give up on the batches. The running ones stop at the deadline too, so
+                # they do not keep the workers busy into the next decision.
+                for future in pending:
+                    future.cancel()
+                return
+
+            for future in done:
+                index = pending.pop(future)
+                results = future.result()
+                running[index] -= len(results)
+                counts[index] += len(results)
+                totals[index] += sum(results)
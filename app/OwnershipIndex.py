@@ -0,0 +1,147 @@
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from app.Zobrist import zobrist_keys
+
+# marks a square without owner
+NO_OWNER = -1
+
+
+class OwnershipIndex:
+    """
+    Tracks who owns which square of a board.
+
+    Every owner gets a small integer id. The index keeps the owner id of
+    every square, and for every owner a bitmask of their squares where
+    bit i stands for position i + 1. Looking up an owner is O(1), and
+    listing the properties of a player is O(number of properties owned).
+    On demand, it also keeps a Zobrist hash of who owns what.
+    """
+
+    def __init__(self, square_count: int, hashed: bool = False):
+        """
+        :param square_count: The number of squares of the board.
+        :param hashed: Whether to keep the hash of who owns what, e.g. for the games created with hash_state.
+        """
+        self.owner_ids = array('h', [NO_OWNER]) * square_count
+        self.masks: List[int] = []
+        self.tokens: List[str] = []
+        self.__ids: Dict[str, int] = {}
+        # the keys of every owner by position, which depend on their token only, or None without hash
+        self.__keys: Optional[List[Tuple[int, ...]]] = [] if hashed else None
+        self.hash = 0
+
+    def get_owner_id(self, token: str) -> int:
+        """
+        :param token: The token of the owner.
+        :return: The id of the owner, assigned on first use.
+        """
+        owner_id = self.__ids.get(token)
+        if owner_id is None:
+            owner_id = len(self.tokens)
+            self.__ids[token] = owner_id
+            self.tokens.append(token)
+            self.masks.append(0)
+            if self.__keys is not None:
+                self.__keys.append(zobrist_keys(f'owner {token}', len(self.owner_ids)))
+        return owner_id
+
+    def get_owner(self, position: int) -> Optional[str]:
+        """
+        :param position: The position of the square.
+        :return: The token of the owner, or None if the square is not owned.
+        """
+        owner_id = self.owner_ids[position - 1]
+        if owner_id == NO_OWNER:
+            return None
+        return self.tokens[owner_id]
+
+    def set_owner(self, position: int, token: Optional[str]):
+        """
+        :param position: The position of the square.
+        :param token: The token of the new owner, or None to disown the square.
+        """
+        index = position - 1
+        bit = 1 << index
+        keys = self.__keys
+
+        # remove the square from the previous owner
+        previous_id = self.owner_ids[index]
+        if previous_id != NO_OWNER:
+            self.masks[previous_id] &= ~bit
+            if keys is not None:
+                self.hash ^= keys[previous_id][index]
+
+        if token is None:
+            self.owner_ids[index] = NO_OWNER
+        else:
+            owner_id = self.get_owner_id(token)
+            self.owner_ids[index] = owner_id
+            self.masks[owner_id] |= bit
+            if keys is not None:
+                self.hash ^= keys[owner_id][index]
+
+    def get_mask(self, token: str) -> int:
+        """
+        :return: The bitmask of the squares owned by the token.
+        """
+        owner_id = self.__ids.get(token)
+        return 0 if owner_id is None else self.masks[owner_id]
+
+    def get_positions(self, token: str) -> List[int]:
+        """
+        :return: The positions of the squares owned by the token, in board order.
+        """
+        positions = []
+        mask = self.get_mask(token)
+        while mask:
+            lowest_bit = mask & -mask
+            positions.append(lowest_bit.bit_length())
+            mask ^= lowest_bit
+        return positions
+
+    def count(self, token: str) -> int:
+        """
+        :return: The number of squares owned by the token.
+        """
+        return bin(self.get_mask(token)).count('1')
+
+    def count_owned(self) -> int:
+        """
+        :return: The number of squares owned by anyone.
+        """
+        mask = 0
+        for owner_mask in self.masks:
+            mask |= owner_mask
+        return bin(mask).count('1')
+
+    def snapshot(self) -> Tuple:
+        """
+        :return: A copy of who owns what, with its hash or None.
+        """
+        return (array('h', self.owner_ids), tuple(self.masks), tuple(self.tokens),
+                self.hash if self.__keys is not None else None)
+
+    def restore(self, snapshot: Tuple):
+        """
+        Go back to a snapshot, in place so that the squares bound to this index see it.
+        :param snapshot: The snapshot, from this index or another one of the same size.
+        """
+        owner_ids, masks, tokens, state_hash = snapshot
+        self.owner_ids[:] = owner_ids
+        self.masks[:] = masks
+        if len(self.tokens) != len(tokens) or tuple(self.tokens) != tokens:
+            self.tokens[:] = tokens
+            self.__ids = {token: owner_id for owner_id, token in enumerate(tokens)}
+            if self.__keys is not None:
+                self.__keys = [zobrist_keys(f'owner {token}', len(self.owner_ids)) for token in tokens]
+
+        if self.__keys is None:
+            return
+        if state_hash is None:
+            # a snapshot of an index without hash
+            state_hash = 0
+            for index, owner_id in enumerate(self.owner_ids):
+                if owner_id != NO_OWNER:
+                    state_hash ^= self.__keys[owner_id][index]
+        self.hash = state_hash
@@ -1,6 +1,7 @@
-from random import choice
-
-from app.Config import Config
+from app.DecisionProvider import DecisionProvider, JailStrategy, default_decision_provider
+from app.Event import RentPaid, PropertyBought, RentCollected, BalanceDeclared, PlayerExited, PropertyDisowned, \
+    JailDoubleRolled, JailDoubleMissed, FinePaid, BailDeferred, DiceRolled, PlayerMoved, JailStrategySelected
+from app.Zobrist import player_keys
 
 
 class Player:
@@ -8,17 +9,26 @@ class Player:
     Represents a player of the game.
     """
 
-    def __init__(self, game, token: str = 'Player 1', player_id: int = 0, player_dict=None):
+    __slots__ = ('game', 'decision_provider', 'token', 'player_id', 'balance', 'is_jailed', 'square_position',
+                 'move_count_since_jail', '__has_exited', 'jail_bail_mode', 'jail_feeling_lucky_mode')
+
+    def __init__(self, game, token: str = 'Player 1', player_id: int = 0, player_dict=None,
+                 decision_provider: DecisionProvider = None):
         from app.Game import Game
 
         self.game: Game = game
 
+        # who makes the decisions of this player.
+        if decision_provider is None:
+            decision_provider = default_decision_provider()
+        self.decision_provider: DecisionProvider = decision_provider
+
         if player_dict is not None:
             self.__init_from_dict(player_dict)
         else:
             self.token = token
             self.player_id = player_id
-            self.balance: int = Config.SALARY
+            self.balance: int = self.game.rules.salary
             self.is_jailed: bool = False
             self.square_position: int = 1
             self.move_count_since_jail = 0
@@ -46,12 +56,22 @@ class Player:
             property_: PropertySquare = self.game.board.get_square(property_position)
             property_.owner_token = self.token
 
+    @property
+    def has_exited(self) -> bool:
+        return self.__has_exited
+
+    @has_exited.setter
+    def has_exited(self, has_exited: bool):
+        self.__has_exited = has_exited
+        # let the game know who is still playing
+        self.game.update_active_player(self)
+
     # methods
     def collect_salary(self):
         """
         Ask the player to collect a salary.
         """
-        self.balance += Config.SALARY
+        self.balance += self.game.rules.salary
 
     def pay_tax(self) -> int:
         """
@@ -77,7 +97,7 @@ class Player:
         """
         self.is_jailed = True
         self.move_count_since_jail = 0
-        self.square_position = Config.JAIL_SQUARE_POSITION
+        self.square_position = self.game.rules.jail_square_position
         self.jail_feeling_lucky_mode = False
         self.jail_bail_mode = False
 
@@ -87,11 +107,8 @@ class Player:
         :return: The lost money
         """
 
-        # create amounts all the way to VND 300
-        amounts = [i * 10 for i in range(1, 31)]
-
         # get the random amount
-        amount = choice(amounts)
+        amount = self.game.random_streams.chance.choice(self.game.rules.chance_loss_amounts)
 
         # update the current balance
         self.balance = self.balance - amount
@@ -104,11 +121,8 @@ class Player:
         :return: The gained money
         """
 
-        # create amounts all the way to VND 300
-        amounts = [i * 10 for i in range(1, 21)]
-
         # get the random amount
-        amount = choice(amounts)
+        amount = self.game.random_streams.chance.choice(self.game.rules.chance_gain_amounts)
 
         # update the current balance
         self.balance = self.balance + amount
@@ -122,7 +136,7 @@ class Player:
 
         # pay the rent.
         self.balance -= rent
-        print(f'{self.token} has paid {Config.CURRENCY} {rent} in rent for property: {property_name}!')
+        self.game.event_sink.emit(RentPaid(self.token, owner_token, rent, property_name))
 
         # ask the owner to collect the rent.
         other_player = self.game.get_player(owner_token)
@@ -141,7 +155,9 @@ class Player:
         # buy the property
         self.balance -= property_square.price
         property_square.owner_token = self.token
-        print(f'{self.token} bought {property_square.to_string()} successfully!')
+        self.game.event_sink.emit(
+            PropertyBought(self.token, property_square.position, property_square.name, property_square.price)
+        )
         self.declare_balance()
 
     def collect_rent(self, rent: int, property_name: str):
@@ -151,13 +167,13 @@ class Player:
         :param rent: The rent to be collected.
         """
         self.balance += rent
-        print(f'{self.token} has collected {Config.CURRENCY} {rent} in rent for property: {property_name}!')
+        self.game.event_sink.emit(RentCollected(self.token, rent, property_name))
 
     def declare_balance(self):
         """
         Declare the balance.
         """
-        print(f'{self.token}: My balance is now: {Config.CURRENCY} {self.balance}')
+        self.game.event_sink.emit(BalanceDeclared(self.token, self.balance))
 
     def is_bankrupt(self) -> bool:
         """
@@ -166,32 +182,30 @@ class Player:
         return self.balance < 0
 
     def get_properties(self):
-        from app.Square import PropertySquare
-        # store the properties here.
-        properties = []
-
-        # filter the property squares that belong to this
-        # user.
-        for square in self.game.board.squares:
-            if not isinstance(square, PropertySquare):
-                continue
-            if square.owner_token == self.token:
-                properties.append(square)
-        return properties
+        """
+        :return: The property squares owned by this player, in board order.
+        """
+        board = self.game.board
+        return [board.get_square(position) for position in board.ownership.get_positions(self.token)]
+
+    def get_property_count(self) -> int:
+        """
+        :return: The number of properties owned by this player.
+        """
+        return self.game.board.ownership.count(self.token)
 
     def exit_game(self):
         """
         Exit the game.
         """
-        # import the property square to avoid a circular import
-        from app.Square import PropertySquare
+        event_sink = self.game.event_sink
 
         # mark the user as exited.
         self.has_exited = True
-        print(f'{self.token} has exited the game due to bankruptcy. Balance is: {self.balance}')
+        event_sink.emit(PlayerExited(self.token, self.balance))
         # disown all the properties that belong to this player.
         for prop in self.get_properties():
-            print(f'{self.token} is disowning {prop.to_string()}')
+            event_sink.emit(PropertyDisowned(self.token, prop.position, prop.name))
             prop.owner_token = None
 
     def __play_jail_feeling_lucky_mode(self):
@@ -215,7 +229,7 @@ class Player:
         if die_pair.is_double():
             # take the user out of jail. Move them out of jail, land them to them
             # on the appropriate square.
-            print(f'{self.token} rolled a double! Getting out of jail.')
+            self.game.event_sink.emit(JailDoubleRolled(self.token))
             self.is_jailed = False
             self.move_and_land_on_square(dice_total)
             return
@@ -223,21 +237,22 @@ class Player:
         if self.move_count_since_jail < 3:
             # no double detected so far, ask the user to try their luck
             # the next time.
-            print(f'{self.token} did not roll a double. Cannot get out of jail. Try next time.')
+            self.game.event_sink.emit(JailDoubleMissed(self.token, self.move_count_since_jail, final=False))
             return
 
         if self.move_count_since_jail == 3:
             # the user has rolled three times, no double was detected.
             # they need to pay 150 VND and move forward the
             # number of spaces shown by throw.
-            print(f'{self.token} did not roll a double by the third turn.')
+            self.game.event_sink.emit(JailDoubleMissed(self.token, self.move_count_since_jail, final=True))
             self.pay_fine()
             self.is_jailed = False
             self.move_and_land_on_square(dice_total)
 
     def pay_fine(self):
-        self.balance -= Config.JAIL_FINE
-        print(f'{self.token} has paid a fine of {Config.CURRENCY} {Config.JAIL_FINE}.')
+        jail_fine = self.game.rules.jail_fine
+        self.balance -= jail_fine
+        self.game.event_sink.emit(FinePaid(self.token, jail_fine))
         self.declare_balance()
 
     def __play_jail_bail_mode_mode(self):
@@ -248,22 +263,11 @@ class Player:
         if self.move_count_since_jail == 0:
             # this is the first move since being jailed.
             # ask the user to pay a fine.
-            print(f'\n{self.token}, do you want to pay {Config.CURRENCY} {Config.JAIL_FINE} now?')
-            print('[1] Yes  [2] No')
-            answer = Config.DEFAULT_BAIL_MODE_PAY_NOW
-            if not Config.IS_TEST_ENVIRONMENT:
-                answer = input('Enter your choice (1/2) :>').strip()
-
-            # ensure the user provided valid input
-            if answer not in ['1', '2']:
-                print('Invalid choice. Defaulting to: [1] Yes')
-                answer = '1'
-
-            if answer == '1':
+            if self.decision_provider.should_pay_bail_now(self):
                 self.pay_fine()
                 self.is_jailed = False
             else:
-                print('Okay, you will pay in your next turn.')
+                self.game.event_sink.emit(BailDeferred(self.token))
         else:
             self.pay_fine()
             self.is_jailed = False
@@ -282,29 +286,21 @@ class Player:
         die_pair = self.game.die_pair
 
         # roll the dice
-        print(f'{self.token}: Rolling dice ...')
         die_pair.roll_pair()
-        print(f'{self.token}: Dice results => {die_pair.get_results()}')
+        self.game.event_sink.emit(DiceRolled(self.token, die_pair.die1.value, die_pair.die2.value))
 
     def move_and_land_on_square(self, dice_total: int):
-        for i in range(1, dice_total):
-            # get the next position
-            next_position = (self.square_position + i) % Config.MAX_SQUARE_COUNT
-            if next_position == 0:
-                next_position = Config.MAX_SQUARE_COUNT
+        board = self.game.board
 
-            # get the square at that position
-            square = self.game.board.get_square(position=next_position)
-
-            # pass through the square
+        # pass through the squares which do something when passed
+        for square in board.get_passed_squares(self.square_position, dice_total):
             square.pass_through(self)
 
         # land on the last square
-        last_square_position = (self.square_position + dice_total) % Config.MAX_SQUARE_COUNT
-        if last_square_position == 0:
-            last_square_position = Config.MAX_SQUARE_COUNT
+        last_square_position = board.get_destination(self.square_position, dice_total)
+        self.game.event_sink.emit(PlayerMoved(self.token, self.square_position, last_square_position, dice_total))
         self.square_position = last_square_position
-        square = self.game.board.get_square(last_square_position)
+        square = board.get_square(last_square_position)
         square.land_on(self)
 
     def __play_no_jail_mode(self):
@@ -318,27 +314,15 @@ class Player:
         """
         Define how the user will get out of jail.
         """
-        print(f'\n{self.token}, how do you want to get out of jail? (Enter 1 or 2)')
-        print(
-            f'[1] Play at least a double for the next 3 turns.\n'
-            f'    Pay {Config.CURRENCY} {Config.JAIL_FINE} if you fail by your third turn.'
-        )
-        print(f'[2] Pay {Config.CURRENCY} {Config.JAIL_FINE} in either of the next 2 turns.')
+        strategy = self.decision_provider.select_jail_strategy(self)
 
-        user_response = Config.DEFAULT_JAIL_STRATEGY
-
-        if not Config.IS_TEST_ENVIRONMENT:
-            user_response = input('Enter your choice (1/2):> ').strip()
-
-        if user_response not in ['1', '2']:
-            print('Invalid selection. Defaulting to 2')
-            user_response = '2'
-        if user_response == '1':
+        if strategy == JailStrategy.FEELING_LUCKY:
             self.jail_feeling_lucky_mode = True
             self.jail_bail_mode = False
         else:
             self.jail_feeling_lucky_mode = False
             self.jail_bail_mode = True
+        self.game.event_sink.emit(JailStrategySelected(self.token, strategy))
 
     def play(self):
         # the user is not jailed,
@@ -359,6 +343,24 @@ class Player:
             # play with the bail mode
             self.__play_jail_bail_mode_mode()
 
+    def snapshot(self) -> tuple:
+        """
+        :return: The state of the player which changes during a game.
+        """
+        return (self.balance, self.is_jailed, self.square_position, self.move_count_since_jail, self.has_exited,
+                self.jail_bail_mode, self.jail_feeling_lucky_mode)
+
+    def restore(self, snapshot: tuple):
+        """
+        Go back to a snapshot of this player, or of the player in the same seat of another game.
+        :param snapshot: The snapshot.
+        """
+        (self.balance, self.is_jailed, self.square_position, self.move_count_since_jail, has_exited,
+         self.jail_bail_mode, self.jail_feeling_lucky_mode) = snapshot
+        # let the game know only when it changes
+        if has_exited != self.has_exited:
+            self.has_exited = has_exited
+
     def to_dict(self):
         """
         Serialize the player to a dictionary
@@ -373,5 +375,115 @@ class Player:
             'move_count_since_jail': self.move_count_since_jail,
             'jail_bail_mode': self.jail_bail_mode,
             'jail_feeling_lucky_mode': self.jail_feeling_lucky_mode,
-            'properties': [p.position for p in self.get_properties()]
-        }
\ No newline at end of file
+            'properties': self.game.board.ownership.get_positions(self.token)
+        }
+
+
+class HashedPlayer(Player):
+    """
+    A player who keeps a Zobrist hash of their balance, position and jail state, updated as they change.
+    Every change costs a little more, so only the games which hash their state use these players.
+    """
+
+    __slots__ = ('__keys', '__state_hash', '__balance', '__balance_hash', '__square_position',
+                 '__move_count_since_jail', '__is_jailed', '__has_exited', '__jail_bail_mode',
+                 '__jail_feeling_lucky_mode')
+
+    def __init__(self, game, token: str = 'Player 1', player_id: int = 0, player_dict=None,
+                 decision_provider: DecisionProvider = None):
+        if player_dict is not None:
+            player_id = player_dict['player_id']
+
+        # every value starts at 0 and every flag off, the setters keep the hash up to date from there.
+        self.__keys = player_keys(player_id, game.board.square_count)
+        self.__state_hash = self.__keys.initial_hash
+        self.__balance = 0
+        self.__balance_hash = self.__keys.balance_hash(0)
+        self.__square_position = 0
+        self.__move_count_since_jail = 0
+        self.__is_jailed = False
+        self.__has_exited = False
+        self.__jail_bail_mode = False
+        self.__jail_feeling_lucky_mode = False
+        super().__init__(game, token, player_id, player_dict, decision_provider)
+
+    @property
+    def state_hash(self) -> int:
+        """
+        :return: The Zobrist hash of the state of the player, without their properties.
+        """
+        return self.__state_hash
+
+    @property
+    def balance(self) -> int:
+        return self.__balance
+
+    @balance.setter
+    def balance(self, balance: int):
+        balance_hash = self.__keys.balance_hash(balance)
+        self.__state_hash ^= self.__balance_hash ^ balance_hash
+        self.__balance_hash = balance_hash
+        self.__balance = balance
+
+    @property
+    def square_position(self) -> int:
+        return self.__square_position
+
+    @square_position.setter
+    def square_position(self, square_position: int):
+        keys = self.__keys.position
+        self.__state_hash ^= keys[self.__square_position] ^ keys[square_position]
+        self.__square_position = square_position
+
+    @property
+    def move_count_since_jail(self) -> int:
+        return self.__move_count_since_jail
+
+    @move_count_since_jail.setter
+    def move_count_since_jail(self, move_count_since_jail: int):
+        # at most 3 turns are spent in jail
+        keys = self.__keys.move_count
+        self.__state_hash ^= keys[self.__move_count_since_jail & 7] ^ keys[move_count_since_jail & 7]
+        self.__move_count_since_jail = move_count_since_jail
+
+    @property
+    def is_jailed(self) -> bool:
+        return self.__is_jailed
+
+    @is_jailed.setter
+    def is_jailed(self, is_jailed: bool):
+        if is_jailed != self.__is_jailed:
+            self.__state_hash ^= self.__keys.is_jailed
+        self.__is_jailed = is_jailed
+
+    @property
+    def jail_bail_mode(self) -> bool:
+        return self.__jail_bail_mode
+
+    @jail_bail_mode.setter
+    def jail_bail_mode(self, jail_bail_mode: bool):
+        if jail_bail_mode != self.__jail_bail_mode:
+            self.__state_hash ^= self.__keys.jail_bail_mode
+        self.__jail_bail_mode = jail_bail_mode
+
+    @property
+    def jail_feeling_lucky_mode(self) -> bool:
+        return self.__jail_feeling_lucky_mode
+
+    @jail_feeling_lucky_mode.setter
+    def jail_feeling_lucky_mode(self, jail_feeling_lucky_mode: bool):
+        if jail_feeling_lucky_mode != self.__jail_feeling_lucky_mode:
+            self.__state_hash ^= self.__keys.jail_feeling_lucky_mode
+        self.__jail_feeling_lucky_mode = jail_feeling_lucky_mode
+
+    @property
+    def has_exited(self) -> bool:
+        return self.__has_exited
+
+    @has_exited.setter
+    def has_exited(self, has_exited: bool):
+        if has_exited != self.__has_exited:
+            self.__state_hash ^= self.__keys.has_exited
+        self.__has_exited = has_exited
+        # let the game know who is still playing
+        self.game.update_active_player(self)
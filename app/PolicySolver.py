@@ -0,0 +1,406 @@
+"""
+Offline value iteration of the buy and jail decisions.
+
+The game is seen from one player, over an abstract state: their position,
+their balance bucket, the number of properties they own, the number owned
+by the other players and how they stand in jail. The other players are
+folded into the turn: between two turns of the player, they pay rent in
+proportion to the properties the player owns and buy free properties, at
+the rates given by the landing probabilities of the board.
+
+As the richest player wins, the value of a state is the expected lead of
+the player when the game ends: their balance, plus what the others paid
+them or lost buying properties, minus what they were paid by the player.
+The game ends after any turn with probability 1 / expected_turns, and a
+turn of the player stands for a round of the game, so that the game lasts
+the number of rounds of the rules by default, however many play. Going
+bankrupt is worth -bankruptcy_penalty. The solved decisions are
+written to a PolicyTable.
+
+This module needs NumPy. Run it as a script to compute the table of the
+standard game of four players: python -m app.PolicySolver [path]
+"""
+import sys
+from typing import List, Tuple
+
+import numpy as np
+
+from app.Board import Board
+from app.BoardLayout import BoardLayout, standard_layout
+from app.Dice import Dice
+from app.Die import Die
+from app.MarkovChain import landing_model
+from app.PolicyTable import PolicyTable, POLICIES_PATH, STANDARD_OPPONENT_COUNT
+from app.RuleSet import RuleSet
+from app.Square import GoSquare, PropertySquare, IncomeTaxSquare, ChanceSquare, GoToJailSquare
+
+# how a player stands in jail, at the start of their turn
+FREE = 0
+JAILED = 1
+# the number of doubles missed while feeling lucky
+MISSED_ONCE = 2
+MISSED_TWICE = 3
+
+
+class PolicySolver:
+    """
+    Solves the buy and jail decisions of one board and rule set.
+    """
+
+    def __init__(self, layout: BoardLayout = None, rules: RuleSet = None, opponent_count: int = 1,
+                 bucket_width: int = 500, bucket_count: int = 24, expected_turns: int = None,
+                 bankruptcy_penalty: float = None, opponent_buy_rate: float = 1.0):
+        """
+        :param layout: The board, the standard one by default.
+        :param rules: The rules, the standard ones by default.
+        :param opponent_count: The number of other players.
+        :param bucket_width: The width of a balance bucket.
+        :param bucket_count: The number of balance buckets.
+        :param expected_turns: The expected number of turns of the player left in the game, the number of rounds
+        of the rules by default.
+        :param bankruptcy_penalty: The cost of going bankrupt, twice the salary by default.
+        :param opponent_buy_rate: How often the other players buy the free properties they land on.
+        """
+        self.layout = layout if layout is not None else standard_layout()
+        self.rules = rules if rules is not None else RuleSet()
+        self.opponent_count = opponent_count
+        self.bucket_width = bucket_width
+        self.bucket_count = bucket_count
+        # the turns of the others are folded into the turn of the player, so each turn is a round.
+        self.discount = 1.0 - 1.0 / (expected_turns if expected_turns is not None else self.rules.max_round_count)
+        self.bankruptcy_penalty = bankruptcy_penalty if bankruptcy_penalty is not None else 2 * self.rules.salary
+        self.opponent_buy_rate = opponent_buy_rate
+
+        squares = self.layout.squares
+        self.square_count = self.layout.square_count
+        self.property_count = sum(self.layout.is_property)
+        self.go_positions = [square.position for square in squares if isinstance(square, GoSquare)]
+        self.jail_position = self.rules.jail_square_position
+
+        # the dice, with the doubles only needed in jail
+        die_pools = self.rules.die_pools if self.rules.die_pools is not None else (Die.die_pool, Die.die_pool)
+        self.outcomes = Dice(die_pools).total_distribution()
+        totals = {}
+        for probability, total, _ in self.outcomes:
+            totals[total] = totals.get(total, 0.0) + probability
+        self.totals = sorted(totals.items())
+
+        gains = self.rules.chance_gain_amounts
+        losses = self.rules.chance_loss_amounts
+        self.chance_gain = sum(gains) / len(gains)
+        self.chance_loss = sum(losses) / len(losses)
+
+        # how often another player lands on a property, and the average rent of a landing
+        landing = landing_model(Board(self.layout), die_pools, rules=self.rules).stationary_landing
+        property_landing = [(landing[index], square.rent) for index, square in enumerate(squares)
+                            if isinstance(square, PropertySquare)]
+        self.property_landing = sum(probability for probability, _ in property_landing)
+        self.average_rent = (sum(probability * rent for probability, rent in property_landing) /
+                             self.property_landing if self.property_landing else 0.0)
+
+        # the states: jail state, position, bucket, owned, owned by others
+        self.count_size = (self.property_count + 1) ** 2
+        self.bucket_size = self.bucket_count * self.count_size
+        self.state_count = (self.square_count + 3) * self.bucket_size
+        # the values are read from [afterstates, buy decisions, bankruptcy]
+        self.decision_offset = self.state_count
+        self.bankruptcy = self.state_count + self.square_count * self.bucket_size
+
+    # ---------------------------------------------------------
+    # indexes
+
+    def state_index(self, jail_state: int, position: int, bucket: int, owned: int, owned_by_others: int) -> int:
+        counts = owned * (self.property_count + 1) + owned_by_others
+        if jail_state == FREE:
+            return (position - 1) * self.bucket_size + bucket * self.count_size + counts
+        return (self.square_count + jail_state - 1) * self.bucket_size + bucket * self.count_size + counts
+
+    def bucket_value(self, bucket: int) -> float:
+        """
+        :return: The balance standing for a bucket, at its middle.
+        """
+        return (bucket + 0.5) * self.bucket_width
+
+    def split(self, balance: float) -> List[Tuple[int, float]]:
+        """
+        :return: The two nearest buckets of a balance with their weights, so the expected balance is kept.
+        """
+        position = balance / self.bucket_width - 0.5
+        if position <= 0:
+            return [(0, 1.0)]
+        if position >= self.bucket_count - 1:
+            return [(self.bucket_count - 1, 1.0)]
+        lower = int(position)
+        weight = position - lower
+        return [(lower, 1.0 - weight), (lower + 1, weight)]
+
+    # ---------------------------------------------------------
+    # the transitions of the turn of the player
+
+    def __add_afterstate(self, edges, row: int, probability: float, jail_state: int, position: int, balance: float,
+                         owned: int, owned_by_others: int, advantage: float = 0.0):
+        """
+        :param advantage: What the player gains on the average balance of the others, besides their own balance.
+        """
+        if balance < 0:
+            edges.append((row, probability, self.bankruptcy, 0.0))
+            return
+        for bucket, weight in self.split(balance):
+            if weight:
+                target = self.state_index(jail_state, position, bucket, owned, owned_by_others)
+                edges.append((row, probability * weight, target, advantage))
+
+    def __add_move(self, edges, row: int, probability: float, position: int, balance: float, total: int,
+                   owned: int, owned_by_others: int):
+        # the go squares passed through or landed on
+        for go_position in self.go_positions:
+            step = (go_position - position) % self.square_count or self.square_count
+            if step <= total:
+                balance += self.rules.salary * ((total - step) // self.square_count + 1)
+
+        destination = (position - 1 + total) % self.square_count + 1
+        square = self.layout.squares[destination - 1]
+
+        if isinstance(square, PropertySquare):
+            free = self.property_count - owned - owned_by_others
+            if owned:
+                self.__add_afterstate(edges, row, probability * owned / self.property_count, FREE, destination,
+                                      balance, owned, owned_by_others)
+            if owned_by_others:
+                # the rent goes to another player
+                self.__add_afterstate(edges, row, probability * owned_by_others / self.property_count, FREE,
+                                      destination, balance - square.rent, owned, owned_by_others,
+                                      -square.rent / self.opponent_count)
+            if free:
+                probability *= free / self.property_count
+                if balance < 0:
+                    edges.append((row, probability, self.bankruptcy, 0.0))
+                    return
+                # the player decides whether to buy
+                for bucket, weight in self.split(balance):
+                    if weight:
+                        target = self.decision_offset + self.state_index(FREE, destination, bucket, owned,
+                                                                         owned_by_others)
+                        edges.append((row, probability * weight, target, 0.0))
+        elif isinstance(square, IncomeTaxSquare):
+            tax = int(0.1 * balance - (0.1 * balance) % 10) if balance > 0 else 0
+            self.__add_afterstate(edges, row, probability, FREE, destination, balance - tax, owned, owned_by_others)
+        elif isinstance(square, ChanceSquare):
+            for amount in (self.chance_gain, -self.chance_loss):
+                self.__add_afterstate(edges, row, probability / 2, FREE, destination, balance + amount, owned,
+                                      owned_by_others)
+        elif isinstance(square, GoToJailSquare):
+            self.__add_afterstate(edges, row, probability, JAILED, self.jail_position, balance, owned,
+                                  owned_by_others)
+        else:
+            self.__add_afterstate(edges, row, probability, FREE, destination, balance, owned, owned_by_others)
+
+    def __add_free_turn(self, edges, row, position, balance, owned, owned_by_others):
+        for total, probability in self.totals:
+            self.__add_move(edges, row, probability, position, balance, total, owned, owned_by_others)
+
+    def __add_lucky_turn(self, edges, row, missed: int, balance, owned, owned_by_others):
+        """
+        :param missed: The number of doubles missed before this turn.
+        """
+        for probability, total, is_double in self.outcomes:
+            if is_double:
+                self.__add_move(edges, row, probability, self.jail_position, balance, total, owned, owned_by_others)
+            elif missed < 2:
+                self.__add_afterstate(edges, row, probability, MISSED_ONCE + missed, self.jail_position, balance,
+                                      owned, owned_by_others)
+            else:
+                self.__add_move(edges, row, probability, self.jail_position, balance - self.rules.jail_fine, total,
+                                owned, owned_by_others)
+
+    # ---------------------------------------------------------
+
+    def solve(self, tolerance: float = 0.5, max_sweeps: int = 5000) -> PolicyTable:
+        """
+        :param tolerance: The largest change of a value at which the iteration stops.
+        :param max_sweeps: The maximum number of iterations.
+        :return: The policy table.
+        """
+        p = self.property_count
+        counts = [(owned, owned_by_others) for owned in range(p + 1) for owned_by_others in range(p + 1 - owned)]
+
+        # the rows of the turn: one per state, two for a jailed player who selects a strategy.
+        edges = []
+        row_states = []
+        jail_rows = {}
+        for bucket in range(self.bucket_count):
+            balance = self.bucket_value(bucket)
+            for owned, owned_by_others in counts:
+                for position in range(1, self.square_count + 1):
+                    row_states.append(self.state_index(FREE, position, bucket, owned, owned_by_others))
+                    self.__add_free_turn(edges, len(row_states) - 1, position, balance, owned, owned_by_others)
+
+                for missed, jail_state in ((1, MISSED_ONCE), (2, MISSED_TWICE)):
+                    row_states.append(self.state_index(jail_state, self.jail_position, bucket, owned,
+                                                       owned_by_others))
+                    self.__add_lucky_turn(edges, len(row_states) - 1, missed, balance, owned, owned_by_others)
+
+                # a jailed player either feels lucky or pays the bail and moves
+                state = self.state_index(JAILED, self.jail_position, bucket, owned, owned_by_others)
+                row_states.append(state)
+                lucky_row = len(row_states) - 1
+                self.__add_lucky_turn(edges, lucky_row, 0, balance, owned, owned_by_others)
+                row_states.append(state)
+                self.__add_free_turn(edges, lucky_row + 1, self.jail_position, balance - self.rules.jail_fine,
+                                     owned, owned_by_others)
+                jail_rows[bucket, owned, owned_by_others] = lucky_row
+
+        self.__edge_rows = np.array([edge[0] for edge in edges], dtype=np.int64)
+        self.__edge_probabilities = np.array([edge[1] for edge in edges])
+        self.__edge_targets = np.array([edge[2] for edge in edges], dtype=np.int64)
+        self.__edge_advantages = np.array([edge[1] * edge[3] for edge in edges])
+        self.__row_count = len(row_states)
+        row_states = np.array(row_states, dtype=np.int64)
+        lucky_rows = np.array(list(jail_rows.values()), dtype=np.int64)
+        jailed_states = row_states[lucky_rows]
+        single_rows = np.ones(len(row_states), dtype=bool)
+        single_rows[lucky_rows] = False
+        single_rows[lucky_rows + 1] = False
+
+        self.__opponent_phase(counts)
+        decisions = self.__buy_decisions(counts)
+
+        balances = np.array([self.bucket_value((index % self.bucket_size) // self.count_size)
+                             for index in range(self.state_count)])
+        values = balances.copy()
+        for _ in range(max_sweeps):
+            row_values, _, _ = self.__sweep(values)
+            turn_values = values.copy()
+            turn_values[row_states[single_rows]] = row_values[single_rows]
+            turn_values[jailed_states] = np.maximum(row_values[lucky_rows], row_values[lucky_rows + 1])
+            new_values = (1.0 - self.discount) * balances + self.discount * turn_values
+
+            change = np.abs(new_values - values).max()
+            values = new_values
+            if change < tolerance:
+                break
+
+        row_values, buy_values, decline_values = self.__sweep(values)
+        table = PolicyTable(self.square_count, p, self.bucket_width, self.bucket_count, self.opponent_count)
+        for decision, buy_value, decline_value in zip(decisions, buy_values, decline_values):
+            position, remainder = divmod(int(decision), self.bucket_size)
+            bucket, remainder = divmod(remainder, self.count_size)
+            owned, owned_by_others = divmod(remainder, p + 1)
+            table.set_buy(position + 1, bucket, owned, owned_by_others, buy_value > decline_value)
+        for (bucket, owned, owned_by_others), lucky_row in jail_rows.items():
+            table.set_feeling_lucky(bucket, owned, owned_by_others, row_values[lucky_row] > row_values[lucky_row + 1])
+        return table
+
+    def __sweep(self, values):
+        """
+        :param values: The values of the states at the start of a turn.
+        :return: The value of every row of the turn, and of buying and declining at every buy decision.
+        """
+        # the afterstates are read from the states after the turns of the others, and bankruptcy is last.
+        afterstate_values = (self.__opponent_weights * values[self.__opponent_targets]).sum(axis=0)
+        afterstate_values = np.append(afterstate_values + self.__opponent_advantages, -self.bankruptcy_penalty)
+        buy_values = (self.__buy_weights * afterstate_values[self.__buy_targets]).sum(axis=0)
+        decline_values = afterstate_values[self.__decline_targets]
+
+        decision_values = np.zeros(self.square_count * self.bucket_size)
+        decision_values[self.__decisions] = np.maximum(buy_values, decline_values)
+        readable = np.concatenate((afterstate_values[:-1], decision_values, [-self.bankruptcy_penalty]))
+
+        row_values = np.bincount(self.__edge_rows, weights=self.__edge_probabilities * readable[self.__edge_targets],
+                                 minlength=self.__row_count)
+        row_values += np.bincount(self.__edge_rows, weights=self.__edge_advantages, minlength=self.__row_count)
+        return row_values, buy_values, decline_values
+
+    def __opponent_phase(self, counts):
+        """
+        Compile the turns of the others: for every afterstate, the 4 states of the next turn with their
+        probabilities, and what the player gains on the others meanwhile.
+        """
+        targets = np.tile(np.arange(self.state_count), (4, 1))
+        weights = np.zeros((4, self.state_count))
+        weights[0] = 1.0
+        advantages = np.zeros(self.state_count)
+        average_price = sum(self.layout.prices) / self.property_count if self.property_count else 0.0
+
+        p = self.property_count
+        positions = [(FREE, position) for position in range(1, self.square_count + 1)]
+        positions += [(jail_state, self.jail_position) for jail_state in (JAILED, MISSED_ONCE, MISSED_TWICE)]
+        for owned, owned_by_others in counts:
+            rent = self.opponent_count * self.property_landing * owned / p * self.average_rent if p else 0.0
+            free = p - owned - owned_by_others
+            buy = min(1.0, self.opponent_count * self.property_landing * free / p * self.opponent_buy_rate) \
+                if free else 0.0
+            # the rent is paid by the others, and so is the price of what they buy.
+            advantage = (rent + buy * average_price) / self.opponent_count
+            for bucket in range(self.bucket_count):
+                splits = self.split(self.bucket_value(bucket) + rent)
+                for jail_state, position in positions:
+                    state = self.state_index(jail_state, position, bucket, owned, owned_by_others)
+                    advantages[state] = advantage
+                    slot = 0
+                    for next_bucket, weight in splits:
+                        for bought, probability in ((0, 1.0 - buy), (1, buy)):
+                            if probability and weight:
+                                targets[slot, state] = self.state_index(jail_state, position, next_bucket, owned,
+                                                                        owned_by_others + bought)
+                                weights[slot, state] = weight * probability
+                                slot += 1
+                    weights[slot:, state] = 0.0
+        self.__opponent_targets = targets
+        self.__opponent_weights = weights
+        self.__opponent_advantages = advantages
+
+    def __buy_decisions(self, counts):
+        """
+        Compile the buy decisions, and for each of them the afterstates of buying and declining.
+        :return: The indexes of the decisions.
+        """
+        decisions = []
+        buy_targets = ([], [])
+        buy_weights = ([], [])
+        decline_targets = []
+        for position in range(1, self.square_count + 1):
+            square = self.layout.squares[position - 1]
+            if not isinstance(square, PropertySquare):
+                continue
+            for owned, owned_by_others in counts:
+                if owned + owned_by_others == self.property_count:
+                    continue
+                for bucket in range(self.bucket_count):
+                    state = self.state_index(FREE, position, bucket, owned, owned_by_others)
+                    decisions.append(state)
+                    decline_targets.append(state)
+
+                    balance = self.bucket_value(bucket) - square.price
+                    splits = [(self.state_count, 1.0)] if balance < 0 else \
+                        [(self.state_index(FREE, position, next_bucket, owned + 1, owned_by_others), weight)
+                         for next_bucket, weight in self.split(balance)]
+                    splits += [(splits[0][0], 0.0)] * (2 - len(splits))
+                    for slot, (target, weight) in enumerate(splits):
+                        buy_targets[slot].append(target)
+                        buy_weights[slot].append(weight)
+
+        self.__decisions = np.array(decisions, dtype=np.int64)
+        self.__buy_targets = np.array(buy_targets, dtype=np.int64)
+        self.__buy_weights = np.array(buy_weights)
+        self.__decline_targets = np.array(decline_targets, dtype=np.int64)
+        return self.__decisions
+
+
+def solve_policy(layout: BoardLayout = None, rules: RuleSet = None, opponent_count: int = 1,
+                 **options) -> PolicyTable:
+    """
+    Compute the policy table of a board and rule set.
+    :param layout: The board, the standard one by default.
+    :param rules: The rules, the standard ones by default.
+    :param opponent_count: The number of other players.
+    :param options: The other options of PolicySolver.
+    :return: The policy table.
+    """
+    return PolicySolver(layout, rules, opponent_count, **options).solve()
+
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else POLICIES_PATH / 'standard.table'
+    solve_policy(opponent_count=STANDARD_OPPONENT_COUNT).save(path)
+    print(f'Saved the policy table to {path}')
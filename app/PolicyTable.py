@@ -0,0 +1,187 @@
+"""
+Precomputed buy and jail decisions, answered with a single table lookup.
+
+A policy table is computed offline by PolicySolver over an abstract state:
+the position of the player, their balance rounded down to a bucket, the
+number of properties they own and the number owned by the other players.
+It is saved to a small binary file, one bit per decision, and loaded once.
+"""
+from functools import lru_cache
+from pathlib import Path
+from struct import Struct
+
+from app.DecisionProvider import BotDecisionProvider, JailStrategy
+
+# the folder of the policy tables shipped with the game
+POLICIES_PATH = Path(__file__).parent / 'policies'
+# the standard table is computed for a game of four players
+STANDARD_OPPONENT_COUNT = 3
+
+
+class PolicyTable:
+    """
+    The decisions of a policy, one bit per abstract state.
+    """
+
+    # magic, square count, property count, bucket width, bucket count, opponent count
+    HEADER = Struct('<4sHHIHH')
+    MAGIC = b'MPT1'
+
+    def __init__(self, square_count: int, property_count: int, bucket_width: int, bucket_count: int,
+                 opponent_count: int, buy: bytes = None, feeling_lucky: bytes = None):
+        """
+        :param square_count: The number of squares of the board.
+        :param property_count: The number of properties of the board.
+        :param bucket_width: The width of a balance bucket.
+        :param bucket_count: The number of balance buckets, the last one holds all the higher balances.
+        :param opponent_count: The number of opponents the policy was computed for.
+        :param buy: The bits of the buy decisions, by position, bucket and property counts.
+        :param feeling_lucky: The bits of the jail decisions, by bucket and property counts.
+        """
+        self.square_count = square_count
+        self.property_count = property_count
+        self.bucket_width = bucket_width
+        self.bucket_count = bucket_count
+        self.opponent_count = opponent_count
+
+        self.__count_size = (property_count + 1) ** 2
+        buy_size = (square_count * bucket_count * self.__count_size + 7) // 8
+        jail_size = (bucket_count * self.__count_size + 7) // 8
+        self.buy = bytearray(buy) if buy is not None else bytearray(buy_size)
+        self.feeling_lucky = bytearray(feeling_lucky) if feeling_lucky is not None else bytearray(jail_size)
+        if len(self.buy) != buy_size or len(self.feeling_lucky) != jail_size:
+            raise ValueError('The decisions do not match the size of the table')
+
+    def get_bucket(self, balance: int) -> int:
+        """
+        :return: The bucket of a balance.
+        """
+        return min(max(balance // self.bucket_width, 0), self.bucket_count - 1)
+
+    def get_index(self, bucket: int, owned: int, owned_by_others: int) -> int:
+        """
+        :return: The index of an abstract state, without its position.
+        """
+        if owned + owned_by_others > self.property_count:
+            raise ValueError(f'More properties owned than the {self.property_count} of the board')
+        return (bucket * (self.property_count + 1) + owned) * (self.property_count + 1) + owned_by_others
+
+    @staticmethod
+    def __get_bit(bits: bytearray, index: int) -> bool:
+        return bool(bits[index >> 3] & (1 << (index & 7)))
+
+    @staticmethod
+    def __set_bit(bits: bytearray, index: int, value: bool):
+        if value:
+            bits[index >> 3] |= 1 << (index & 7)
+        else:
+            bits[index >> 3] &= ~(1 << (index & 7))
+
+    def should_buy(self, position: int, balance: int, owned: int, owned_by_others: int) -> bool:
+        """
+        :return: Whether to buy the property at the position.
+        """
+        if position <= 0 or position > self.square_count:
+            raise ValueError(f'Invalid position: {position}')
+        index = (position - 1) * self.bucket_count * self.__count_size
+        return self.__get_bit(self.buy, index + self.get_index(self.get_bucket(balance), owned, owned_by_others))
+
+    def is_feeling_lucky(self, balance: int, owned: int, owned_by_others: int) -> bool:
+        """
+        :return: Whether to try throwing doubles to get out of jail, rather than paying the bail.
+        """
+        return self.__get_bit(self.feeling_lucky, self.get_index(self.get_bucket(balance), owned, owned_by_others))
+
+    def set_buy(self, position: int, bucket: int, owned: int, owned_by_others: int, value: bool):
+        """
+        Set the buy decision of the property at the position, in an abstract state.
+        """
+        index = (position - 1) * self.bucket_count * self.__count_size
+        self.__set_bit(self.buy, index + self.get_index(bucket, owned, owned_by_others), value)
+
+    def set_feeling_lucky(self, bucket: int, owned: int, owned_by_others: int, value: bool):
+        """
+        Set the jail decision of an abstract state.
+        """
+        self.__set_bit(self.feeling_lucky, self.get_index(bucket, owned, owned_by_others), value)
+
+    def to_bytes(self) -> bytes:
+        """
+        :return: The header followed by the bits of the decisions.
+        """
+        header = self.HEADER.pack(self.MAGIC, self.square_count, self.property_count, self.bucket_width,
+                                  self.bucket_count, self.opponent_count)
+        return header + bytes(self.buy) + bytes(self.feeling_lucky)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'PolicyTable':
+        """
+        :param data: The bytes written by to_bytes.
+        :return: The table.
+        """
+        if len(data) < cls.HEADER.size:
+            raise ValueError('Not a policy table')
+        magic, square_count, property_count, bucket_width, bucket_count, opponent_count = \
+            cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError('Not a policy table')
+
+        table = cls(square_count, property_count, bucket_width, bucket_count, opponent_count)
+        buy_end = cls.HEADER.size + len(table.buy)
+        if len(data) != buy_end + len(table.feeling_lucky):
+            raise ValueError('The policy table is truncated')
+        table.buy[:] = data[cls.HEADER.size:buy_end]
+        table.feeling_lucky[:] = data[buy_end:]
+        return table
+
+    def save(self, path):
+        """
+        Save the table to a file.
+        :param path: The path of the file.
+        """
+        Path(path).write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path) -> 'PolicyTable':
+        """
+        :param path: The path of a file written by save.
+        :return: The table.
+        """
+        return cls.from_bytes(Path(path).read_bytes())
+
+
+@lru_cache(maxsize=None)
+def standard_policy() -> PolicyTable:
+    """
+    :return: The policy of the standard board against three opponents, loaded once.
+    """
+    return PolicyTable.load(POLICIES_PATH / 'standard.table')
+
+
+class PolicyTableProvider(BotDecisionProvider):
+    """
+    Buys and selects a jail strategy by looking the decision up in a policy table.
+    """
+
+    def __init__(self, table: PolicyTable = None, pay_bail_now: bool = True):
+        """
+        :param table: The policy, the one of the standard board by default.
+        :param pay_bail_now: Whether the bail is paid in the first turn in jail.
+        """
+        super().__init__(pay_bail_now=pay_bail_now)
+        self.table = table if table is not None else standard_policy()
+
+    def __counts(self, player):
+        ownership = player.game.board.ownership
+        owned = ownership.count(player.token)
+        return owned, ownership.count_owned() - owned
+
+    def should_buy(self, player, property_square) -> bool:
+        owned, owned_by_others = self.__counts(player)
+        return self.table.should_buy(property_square.position, player.balance, owned, owned_by_others)
+
+    def select_jail_strategy(self, player) -> str:
+        owned, owned_by_others = self.__counts(player)
+        if self.table.is_feeling_lucky(player.balance, owned, owned_by_others):
+            return JailStrategy.FEELING_LUCKY
+        return JailStrategy.BAIL
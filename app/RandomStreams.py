@@ -0,0 +1,80 @@
+"""
+Seedable random streams owned by a single game.
+
+Every game draws its dice and its chance outcomes from its own generators,
+derived from a seed and the index of the game. A game is therefore fully
+reproducible from (seed, game index), and games running in parallel never
+share random state.
+"""
+from hashlib import blake2b
+from random import Random, SystemRandom
+from typing import Optional, Tuple
+
+
+def derive_seed(*parts) -> int:
+    """
+    Derive an independent 64 bit seed from any number of parts.
+    :param parts: The values identifying the stream, e.g. (seed, game index, name).
+    :return: The seed.
+    """
+    key = ':'.join(str(part) for part in parts)
+    return int.from_bytes(blake2b(key.encode(), digest_size=8).digest(), 'little')
+
+
+class RandomStreams:
+    """
+    The random generators of one game.
+    """
+
+    def __init__(self, seed: Optional[int] = None, game_index: int = 0):
+        # an unseeded game still records the seed it was given, so it can be replayed.
+        if seed is None:
+            seed = SystemRandom().getrandbits(64)
+
+        self.seed = seed
+        self.game_index = game_index
+
+        # the independent child streams
+        self.dice = self.stream('dice')
+        self.chance = self.stream('chance')
+
+    def stream(self, name: str) -> Random:
+        """
+        :param name: The name of the stream.
+        :return: A new generator, always the same for a given seed, game index and name.
+        """
+        return Random(derive_seed(self.seed, self.game_index, name))
+
+    def reseed(self, seed: int, game_index: int = 0):
+        """
+        Start the streams again from another seed, in place, like new streams of that seed.
+        :param seed: The seed.
+        :param game_index: The index of the game.
+        """
+        self.seed = seed
+        self.game_index = game_index
+        self.dice.seed(derive_seed(seed, game_index, 'dice'))
+        self.chance.seed(derive_seed(seed, game_index, 'chance'))
+
+    def snapshot(self) -> Tuple:
+        """
+        :return: The state of the dice and chance streams.
+        """
+        return self.dice.getstate(), self.chance.getstate()
+
+    def restore(self, snapshot: Tuple):
+        """
+        Go back to a snapshot of these streams.
+        :param snapshot: The snapshot.
+        """
+        dice, chance = snapshot
+        self.dice.setstate(dice)
+        self.chance.setstate(chance)
+
+    def spawn(self, index: int) -> 'RandomStreams':
+        """
+        Split off the streams of a child, e.g. a parallel worker or a simulated continuation.
+        :param index: The index of the child.
+        :return: The random streams of the child.
+        """
+        return RandomStreams(derive_seed(self.seed, self.game_index, 'spawn', index))
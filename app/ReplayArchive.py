@@ -0,0 +1,290 @@
+"""
+Recorded games, to go back to any turn without playing the game again.
+
+A replay is one file: a keyframe every few turns, i.e. the whole state of
+the game in the binary save of GameCodec, and between them one record per
+turn of what the turn changed, the records of TurnJournal. A footer lists
+the keyframes by turn, so that the state after any turn is the nearest
+keyframe before it and at most the keyframe interval of records.
+
+The file is read through mmap. A range of turns is streamed one turn at
+a time into the same game, or as light records, so that even a long
+game is never held in memory as a whole.
+"""
+import mmap
+import zlib
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from struct import Struct
+from typing import Iterator, NamedTuple, Tuple
+
+from app.GameCodec import decode_game, encode_game
+from app.TurnJournal import TurnEncoder, apply_turn, TURN, PLAYER_STATE, SQUARE
+
+REPLAY_EXTENSION = '.mrpl'
+
+# magic, version, keyframe interval
+HEADER = Struct('<4sBxxxI')
+MAGIC = b'MRPL'
+VERSION = 1
+
+# kind, length and checksum of a block
+BLOCK = Struct('<BII')
+KEYFRAME = 1
+DELTA = 2
+# the turn of a keyframe, before the save
+KEYFRAME_TURN = Struct('<I')
+
+# turn and offset of a keyframe
+INDEX_ENTRY = Struct('<IQ')
+# offset of the index, keyframe count, last turn, magic
+TRAILER = Struct('<QII4s')
+TRAILER_MAGIC = b'MRPX'
+
+
+class TurnRecord(NamedTuple):
+    """
+    What a single turn of a recorded game changed.
+    """
+    turn: int
+    # the turn which comes next
+    current_round: int
+    current_player_id: int
+    # the last roll of the turn, or (0, 0)
+    dice: Tuple[int, int]
+    # seat, balance, position, moves since jail and flags of every player who changed
+    players: Tuple[Tuple[int, int, int, int, int], ...]
+    # position and seat of the new owner, or -1, of every square which changed owner
+    squares: Tuple[Tuple[int, int], ...]
+
+
+def read_turn(body) -> TurnRecord:
+    """
+    :param body: The record of a turn.
+    :return: The decoded record.
+    """
+    turn, current_round, current_player_id, die1, die2, player_count, square_count = TURN.unpack_from(body)
+    position = TURN.size
+    players = []
+    for _ in range(player_count):
+        players.append(PLAYER_STATE.unpack_from(body, position))
+        position += PLAYER_STATE.size
+    squares = []
+    for _ in range(square_count):
+        squares.append(SQUARE.unpack_from(body, position))
+        position += SQUARE.size
+    return TurnRecord(turn, current_round, current_player_id, (die1, die2), tuple(players), tuple(squares))
+
+
+class ReplayRecorder:
+    """
+    Records every turn of a game, attached to it as game.replay.
+    """
+
+    def __init__(self, path, game, keyframe_interval: int = 64):
+        """
+        Start recording a game, from its current state.
+        :param path: The path of the replay.
+        :param game: The game.
+        :param keyframe_interval: The number of turns between keyframes, the most turns applied to seek.
+        """
+        if keyframe_interval < 1:
+            raise ValueError(f'Invalid keyframe interval: {keyframe_interval}')
+
+        self.path = Path(path)
+        self.keyframe_interval = keyframe_interval
+        self.turn = 0
+        self.__encoder = TurnEncoder(game)
+        self.__keyframes = []
+        # the turn which came next at the last record
+        self.__next_turn = (game.current_round, game.current_player_id)
+        self.__file = self.path.open('wb')
+        self.__offset = self.__file.write(HEADER.pack(MAGIC, VERSION, keyframe_interval))
+
+        self.__write_keyframe(game)
+        game.replay = self
+
+    def __write_block(self, kind: int, body: bytes):
+        self.__file.write(BLOCK.pack(kind, len(body), zlib.crc32(body)))
+        self.__file.write(body)
+        self.__offset += BLOCK.size + len(body)
+
+    def __write_keyframe(self, game):
+        self.__keyframes.append((self.turn, self.__offset))
+        self.__write_block(KEYFRAME, KEYFRAME_TURN.pack(self.turn) + encode_game(game))
+
+    def record(self, game):
+        """
+        Append the turn which has just been played.
+        :param game: The game.
+        """
+        self.turn += 1
+        self.__write_block(DELTA, self.__encoder.encode(game, self.turn))
+        self.__next_turn = (game.current_round, game.current_player_id)
+        if self.turn % self.keyframe_interval == 0:
+            self.__write_keyframe(game)
+
+    def close(self, game=None):
+        """
+        Write the index of the keyframes and close the replay.
+        :param game: The game, to record the turns skipped since the last turn played, e.g. of the players
+        who exited, so that the last turn is the final state of the game.
+        """
+        if self.__file is None:
+            return
+        if game is not None and (game.current_round, game.current_player_id) != self.__next_turn:
+            self.record(game)
+        index_offset = self.__offset
+        for turn, offset in self.__keyframes:
+            self.__file.write(INDEX_ENTRY.pack(turn, offset))
+        self.__file.write(TRAILER.pack(index_offset, len(self.__keyframes), self.turn, TRAILER_MAGIC))
+        self.__file.close()
+        self.__file = None
+
+
+class ReplayReader:
+    """
+    Seeks and streams the turns of a replay.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The path of the replay.
+        """
+        self.path = Path(path)
+        with self.path.open('rb') as f:
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.__map) < HEADER.size:
+            self.close()
+            raise ValueError(f'Not a replay: {self.path}')
+        magic, version, self.keyframe_interval = HEADER.unpack_from(self.__map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'Not a replay: {self.path}')
+
+        self.keyframe_turns = array('I')
+        self.keyframe_offsets = array('Q')
+        if not self.__read_index():
+            # a replay which was not closed, e.g. after a crash
+            self.__scan()
+        if not self.keyframe_turns:
+            self.close()
+            raise ValueError(f'The replay has no keyframe: {self.path}')
+
+    def __read_index(self) -> bool:
+        """
+        Read the index of the keyframes in the footer.
+        :return: Whether there is a valid footer.
+        """
+        replay_map = self.__map
+        if len(replay_map) < HEADER.size + TRAILER.size:
+            return False
+        index_offset, count, self.last_turn, magic = TRAILER.unpack_from(replay_map, len(replay_map) - TRAILER.size)
+        if magic != TRAILER_MAGIC or index_offset + count * INDEX_ENTRY.size + TRAILER.size != len(replay_map):
+            return False
+        for position in range(index_offset, index_offset + count * INDEX_ENTRY.size, INDEX_ENTRY.size):
+            turn, offset = INDEX_ENTRY.unpack_from(replay_map, position)
+            self.keyframe_turns.append(turn)
+            self.keyframe_offsets.append(offset)
+        self.__end = index_offset
+        return True
+
+    def __scan(self):
+        """
+        Find the keyframes by reading every block, up to the first torn one.
+        """
+        self.__end = len(self.__map)
+        self.last_turn = 0
+        for kind, offset, body in self.__blocks(HEADER.size):
+            # both kinds of blocks start with their turn
+            turn = KEYFRAME_TURN.unpack_from(body)[0]
+            if kind == KEYFRAME:
+                self.keyframe_turns.append(turn)
+                self.keyframe_offsets.append(offset)
+            self.last_turn = turn
+
+    def __blocks(self, offset: int) -> Iterator[Tuple[int, int, bytes]]:
+        """
+        :return: The blocks from an offset, up to a torn one: their kind, offset and body.
+        """
+        replay_map = self.__map
+        end = self.__end
+        while offset + BLOCK.size <= end:
+            kind, length, checksum = BLOCK.unpack_from(replay_map, offset)
+            start = offset + BLOCK.size
+            body = replay_map[start:start + length]
+            if len(body) != length or zlib.crc32(body) != checksum:
+                return
+            yield kind, offset, body
+            offset = start + length
+
+    def __keyframe(self, turn: int) -> int:
+        """
+        :return: The position of the last keyframe at or before a turn.
+        """
+        if not 0 <= turn <= self.last_turn:
+            raise ValueError(f'The replay has no turn {turn}, only 0 to {self.last_turn}')
+        return bisect_right(self.keyframe_turns, turn) - 1
+
+    def seek(self, turn: int, **game_options):
+        """
+        :param turn: The number of turns played, 0 for the state the recording started from.
+        :param game_options: The other arguments of Game.
+        :return: A game in the state after the turn.
+        """
+        for _, game in self.replay(turn, turn + 1, **game_options):
+            return game
+
+    def replay(self, start: int = 0, stop: int = None, **game_options) -> Iterator[Tuple[int, object]]:
+        """
+        Stream a range of turns into a single game.
+        :param start: The first turn.
+        :param stop: The turn at which the stream stops, excluded, after the last one by default.
+        :param game_options: The other arguments of Game.
+        :return: The turns, and the game in the state after each of them. The game is the same every time.
+        """
+        stop = self.last_turn + 1 if stop is None else min(stop, self.last_turn + 1)
+        position = self.__keyframe(start)
+        game = None
+        for kind, _, body in self.__blocks(self.keyframe_offsets[position]):
+            if game is None:
+                game = decode_game(body[KEYFRAME_TURN.size:], **game_options)
+                turn = self.keyframe_turns[position]
+            elif kind == DELTA:
+                turn = apply_turn(game, body)
+            else:
+                continue
+            if turn >= stop:
+                return
+            if turn >= start:
+                yield turn, game
+
+    def records(self, start: int = 1, stop: int = None) -> Iterator[TurnRecord]:
+        """
+        Stream a range of turns as records, without creating a game.
+        :param start: The first turn, at least 1.
+        :param stop: The turn at which the stream stops, excluded, after the last one by default.
+        :return: The records of the turns.
+        """
+        stop = self.last_turn + 1 if stop is None else stop
+        start = max(start, 1)
+        if start > self.last_turn:
+            return
+        for kind, _, body in self.__blocks(self.keyframe_offsets[self.__keyframe(start)]):
+            if kind != DELTA:
+                continue
+            record = read_turn(body)
+            if record.turn >= stop:
+                return
+            if record.turn >= start:
+                yield record
+
+    def close(self):
+        self.__map.close()
+
+    def __enter__(self) -> 'ReplayReader':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,48 @@
+"""
+The rules of a game, fixed for its whole duration.
+
+A rule set is an immutable value: every game holds its own, so games with
+different rules can run side by side in one process. Config only provides
+the defaults, read once when a rule set is created from it.
+"""
+from typing import NamedTuple, Optional, Tuple
+
+from app.Config import Config
+
+
+class RuleSet(NamedTuple):
+    """
+    The rules of a game. The defaults are the standard rules, played with real dice.
+    """
+    currency: str = 'HKD'
+    salary: int = 1500
+    jail_square_position: int = 6
+    jail_fine: int = 150
+    max_round_count: int = 100
+    min_player_count: int = 2
+    max_player_count: int = 6
+    # the faces of the two dice, the ones of Die by default.
+    die_pools: Optional[Tuple[Tuple[int, ...], ...]] = None
+    # the amounts that can be lost to or gained from chance, all the way to HKD 300 and HKD 200.
+    chance_loss_amounts: Tuple[int, ...] = tuple(i * 10 for i in range(1, 31))
+    chance_gain_amounts: Tuple[int, ...] = tuple(i * 10 for i in range(1, 21))
+
+    @classmethod
+    def from_config(cls) -> 'RuleSet':
+        """
+        :return: The rules currently defined by Config, with fixed dice in the test environment.
+        """
+        die_pools = None
+        if Config.IS_TEST_ENVIRONMENT:
+            die_pools = ((Config.DIE_1_VALUE,), (Config.DIE_2_VALUE,))
+
+        return cls(
+            currency=Config.CURRENCY,
+            salary=Config.SALARY,
+            jail_square_position=Config.JAIL_SQUARE_POSITION,
+            jail_fine=Config.JAIL_FINE,
+            max_round_count=Config.MAX_ROUND_COUNT,
+            min_player_count=Config.MIN_PLAYER_COUNT,
+            max_player_count=Config.MAX_PLAYER_COUNT,
+            die_pools=die_pools,
+        )
@@ -0,0 +1,453 @@
+"""
+A single-file archive of saved games, read through mmap.
+
+The archive is two files. The pack file holds the records, appended one
+after the other: the save id, the length and checksum of the save, then
+the save itself. A deletion appends a record without a save. The index
+file holds one fixed-size entry per live save, sorted by id: the id, and
+the offset and length of the save in the pack. Both are mapped in
+memory, so reading a save is a binary search and a slice, without any
+open or seek.
+
+New saves are indexed in memory until the index is flushed, which merges
+them in. When an archive is opened, the records appended after the last
+flush are read again, so a crash loses nothing which was written to the
+pack. Compaction writes a new pack of the live saves only.
+
+An archive is only written by one process at a time: an archive opened
+for writing locks its pack until it is closed, and the other writers wait
+for the lock, so an archive should only be kept open for writing while
+saving. An archive opened read-only never changes its files nor waits,
+e.g. to look a save up.
+"""
+import heapq
+import mmap
+import os
+import zlib
+from pathlib import Path
+from struct import Struct
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from app.SaveIds import new_save_id
+
+try:
+    import fcntl
+except ImportError:
+    # without file locks, e.g. on Windows, nothing stops two writers
+    fcntl = None
+
+# magic, version, generation
+PACK_HEADER = Struct('<4sIQ')
+PACK_MAGIC = b'MPAK'
+# id, length of the save, checksum of the save
+RECORD = Struct('<16sII')
+# the length of a deletion record
+DELETED = 0xFFFFFFFF
+
+# magic, version, generation of the pack, entry count, size of the pack covered by the index
+INDEX_HEADER = Struct('<4sIQQQ')
+INDEX_MAGIC = b'MIDX'
+# id, offset and length of the save
+ENTRY = Struct('<16sQI')
+
+VERSION = 1
+
+# the name of the archive in the saved_games folder
+ARCHIVE_NAME = 'games'
+
+
+def _id_bytes(save_id: int) -> bytes:
+    # big endian, so that the bytes sort like the ids
+    return save_id.to_bytes(16, 'big')
+
+
+class SaveArchive:
+    """
+    Saved games by id, in a pack file and its index.
+    """
+
+    def __init__(self, path, flush_threshold: int = 4096, read_only: bool = False):
+        """
+        Open an archive, or create it.
+        :param path: The path of the archive, without extension.
+        :param flush_threshold: The number of changes kept in memory before the index is flushed.
+        :param read_only: Whether to only read an existing archive, without ever writing to its files.
+        """
+        self.path = Path(path)
+        self.pack_path = self.path.with_suffix('.pack')
+        self.index_path = self.path.with_suffix('.index')
+        self.flush_threshold = flush_threshold
+        self.read_only = read_only
+
+        # the changes since the index was last written: new saves by id, and deleted ids
+        self.__pending: Dict[int, Tuple[int, int]] = {}
+        self.__deleted: Set[int] = set()
+
+        self.__pack = self.pack_path.open('rb') if read_only else self.__open_locked()
+        header = self.__pack.read(PACK_HEADER.size)
+        if len(header) != PACK_HEADER.size:
+            self.__pack.close()
+            raise ValueError(f'Not a save archive: {self.pack_path}')
+        magic, version, self.generation = PACK_HEADER.unpack(header)
+        if magic != PACK_MAGIC or version != VERSION:
+            self.__pack.close()
+            raise ValueError(f'Not a save archive: {self.pack_path}')
+        self.__pack_map: Optional[mmap.mmap] = None
+        self.__pack_size = self.__pack.seek(0, os.SEEK_END)
+
+        self.__index_file = None
+        self.__index_map: Optional[mmap.mmap] = None
+        self.__count = 0
+        self.__indexed_size = PACK_HEADER.size
+        self.__open_index()
+        # read again the records appended since the last flush
+        self.__scan(self.__indexed_size)
+
+    def __open_locked(self):
+        """
+        Open the pack for writing, creating it if needed, once no other process writes to it.
+        :return: The pack file, locked until it is closed.
+        """
+        while True:
+            pack = os.fdopen(os.open(self.pack_path, os.O_RDWR | os.O_CREAT), 'r+b')
+            self.__lock(pack)
+            # a compaction may have replaced the pack while waiting for the lock
+            if os.path.samestat(os.fstat(pack.fileno()), os.stat(self.pack_path)):
+                break
+            pack.close()
+
+        # the pack was just created, whoever created it writes its header under the lock
+        if pack.seek(0, os.SEEK_END) == 0:
+            pack.write(PACK_HEADER.pack(PACK_MAGIC, VERSION, int.from_bytes(os.urandom(8), 'little')))
+            pack.flush()
+        pack.seek(0)
+        return pack
+
+    @staticmethod
+    def __lock(pack):
+        if fcntl is not None:
+            fcntl.flock(pack.fileno(), fcntl.LOCK_EX)
+
+    @staticmethod
+    def __create_pack(path: Path, generation: int):
+        with path.open('wb') as f:
+            f.write(PACK_HEADER.pack(PACK_MAGIC, VERSION, generation))
+
+    def __open_index(self):
+        """
+        Map the index, if it is the one of the pack.
+        """
+        self.__indexed_size = PACK_HEADER.size
+        if not self.index_path.exists():
+            return
+
+        index_file = self.index_path.open('rb')
+        header = index_file.read(INDEX_HEADER.size)
+        if len(header) != INDEX_HEADER.size:
+            index_file.close()
+            return
+        magic, version, generation, count, indexed_size = INDEX_HEADER.unpack(header)
+        if magic != INDEX_MAGIC or version != VERSION or generation != self.generation or \
+                indexed_size > self.__pack_size or \
+                os.fstat(index_file.fileno()).st_size != INDEX_HEADER.size + count * ENTRY.size:
+            # an index of another pack, e.g. left by an interrupted compaction
+            index_file.close()
+            return
+
+        self.__index_file = index_file
+        self.__count = count
+        self.__indexed_size = indexed_size
+        if count:
+            self.__index_map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __scan(self, offset: int):
+        """
+        Index the records of the pack from an offset.
+        """
+        pack_map = self.__get_pack_map()
+        while offset + RECORD.size <= self.__pack_size:
+            id_bytes, length, checksum = RECORD.unpack_from(pack_map, offset)
+            save_id = int.from_bytes(id_bytes, 'big')
+            offset += RECORD.size
+            if length == DELETED:
+                self.__forget(save_id)
+                continue
+            if offset + length > self.__pack_size or zlib.crc32(pack_map[offset:offset + length]) != checksum:
+                # a record cut short by a crash, drop it
+                break
+            self.__deleted.discard(save_id)
+            self.__pending[save_id] = (offset, length)
+            offset += length
+
+        if offset != self.__pack_size:
+            # a read-only archive only ignores the torn record
+            if not self.read_only:
+                self.__pack.truncate(offset)
+            self.__pack_size = offset
+            self.__close_pack_map()
+
+    def __get_pack_map(self) -> mmap.mmap:
+        # map the pack again once it has grown
+        if self.__pack_map is None or len(self.__pack_map) != self.__pack_size:
+            self.__close_pack_map()
+            self.__pack.flush()
+            self.__pack_map = mmap.mmap(self.__pack.fileno(), self.__pack_size, access=mmap.ACCESS_READ)
+        return self.__pack_map
+
+    def __close_pack_map(self):
+        if self.__pack_map is not None:
+            self.__pack_map.close()
+            self.__pack_map = None
+
+    # ---------------------------------------------------------
+    # the index written to disk
+
+    def __find(self, save_id: int) -> Optional[Tuple[int, int]]:
+        """
+        :return: The offset and length of a save in the written index, by binary search.
+        """
+        key = _id_bytes(save_id)
+        index_map = self.__index_map
+        low, high = 0, self.__count
+        while low < high:
+            middle = (low + high) // 2
+            position = INDEX_HEADER.size + middle * ENTRY.size
+            middle_key = index_map[position:position + 16]
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                _, offset, length = ENTRY.unpack_from(index_map, position)
+                return offset, length
+        return None
+
+    def __indexed(self, start: int = 0) -> Iterator[Tuple[int, int, int]]:
+        """
+        :return: The entries of the written index from a position: id, offset and length.
+        """
+        index_map = self.__index_map
+        if index_map is None:
+            return
+        for position in range(INDEX_HEADER.size + start * ENTRY.size, INDEX_HEADER.size + self.__count * ENTRY.size,
+                              ENTRY.size):
+            id_bytes, offset, length = ENTRY.unpack_from(index_map, position)
+            yield int.from_bytes(id_bytes, 'big'), offset, length
+
+    def __lower_bound(self, save_id: int) -> int:
+        """
+        :return: The position of the first entry of the written index which is not below the id.
+        """
+        key = _id_bytes(save_id)
+        low, high = 0, self.__count
+        while low < high:
+            middle = (low + high) // 2
+            position = INDEX_HEADER.size + middle * ENTRY.size
+            if self.__index_map[position:position + 16] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def __locate(self, save_id: int) -> Optional[Tuple[int, int]]:
+        location = self.__pending.get(save_id)
+        if location is not None:
+            return location
+        if save_id in self.__deleted or not self.__count:
+            return None
+        return self.__find(save_id)
+
+    # ---------------------------------------------------------
+
+    def __contains__(self, save_id: int) -> bool:
+        return self.__locate(save_id) is not None
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.ids())
+
+    def get(self, save_id: int) -> Optional[bytes]:
+        """
+        :param save_id: The id of the save.
+        :return: The save, or None if there is no such save.
+        """
+        location = self.__locate(save_id)
+        if location is None:
+            return None
+        offset, length = location
+        return self.__get_pack_map()[offset:offset + length]
+
+    def put(self, data: bytes, save_id: int = None) -> int:
+        """
+        Append a save, replacing any save with the same id.
+        :param data: The save.
+        :param save_id: The id of the save, a new one by default.
+        :return: The id of the save.
+        """
+        self.__check_writable()
+        if save_id is None:
+            save_id = new_save_id()
+        self.__append(RECORD.pack(_id_bytes(save_id), len(data), zlib.crc32(data)) + data)
+        self.__deleted.discard(save_id)
+        self.__pending[save_id] = (self.__pack_size - len(data), len(data))
+        self.__flush_if_needed()
+        return save_id
+
+    def delete(self, save_id: int) -> bool:
+        """
+        :param save_id: The id of the save.
+        :return: Whether there was such a save.
+        """
+        self.__check_writable()
+        if save_id not in self:
+            return False
+        self.__append(RECORD.pack(_id_bytes(save_id), DELETED, 0))
+        self.__forget(save_id)
+        self.__flush_if_needed()
+        return True
+
+    def __check_writable(self):
+        if self.read_only:
+            raise ValueError(f'The save archive is read-only: {self.path}')
+
+    def __forget(self, save_id: int):
+        self.__pending.pop(save_id, None)
+        self.__deleted.add(save_id)
+
+    def __append(self, record: bytes):
+        self.__pack.seek(self.__pack_size)
+        self.__pack.write(record)
+        self.__pack_size += len(record)
+
+    def ids(self, start: int = None, stop: int = None) -> Iterator[int]:
+        """
+        :param start: The lowest id listed, the first one by default.
+        :param stop: The id at which the listing stops, excluded, the last one by default.
+        :return: The ids of the saves in the range, in order.
+        """
+        first = self.__lower_bound(start) if start is not None else 0
+        written = (save_id for save_id, _, _ in self.__indexed(first)
+                   if save_id not in self.__deleted and save_id not in self.__pending)
+        pending = sorted(save_id for save_id in self.__pending if start is None or save_id >= start)
+        for save_id in heapq.merge(written, pending):
+            if stop is not None and save_id >= stop:
+                return
+            yield save_id
+
+    def load_game(self, save_id: int, **game_options):
+        """
+        Create a game from a save of the archive.
+        :param save_id: The id of the save.
+        :param game_options: The other arguments of Game.
+        :return: The game.
+        """
+        from app.GameCodec import decode_game
+
+        data = self.get(save_id)
+        if data is None:
+            raise ValueError(f'No save with id {save_id}')
+        return decode_game(data, **game_options)
+
+    # ---------------------------------------------------------
+
+    def __flush_if_needed(self):
+        if len(self.__pending) + len(self.__deleted) >= self.flush_threshold:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the pack to disk, and merge the changes kept in memory into the index.
+        A read-only archive keeps them in memory.
+        """
+        if self.read_only or self.__indexed_size == self.__pack_size:
+            return
+        self.__pack.flush()
+        os.fsync(self.__pack.fileno())
+        entries = ((save_id, *self.__locate(save_id)) for save_id in self.ids())
+        self.__write_index(self.generation, entries, self.__pack_size)
+        self.__pending.clear()
+        self.__deleted.clear()
+
+    def __write_index(self, generation: int, entries, pack_size: int):
+        """
+        Replace the index, atomically.
+        """
+        temporary_path = self.index_path.with_suffix('.index.tmp')
+        count = 0
+        with temporary_path.open('wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, generation, 0, 0))
+            for save_id, offset, length in entries:
+                f.write(ENTRY.pack(_id_bytes(save_id), offset, length))
+                count += 1
+            f.seek(0)
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, generation, count, pack_size))
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.__close_index()
+        os.replace(temporary_path, self.index_path)
+        self.__open_index()
+
+    def __close_index(self):
+        if self.__index_map is not None:
+            self.__index_map.close()
+            self.__index_map = None
+        if self.__index_file is not None:
+            self.__index_file.close()
+            self.__index_file = None
+        self.__count = 0
+
+    def compact(self):
+        """
+        Write a new pack with the live saves only, in id order.
+        """
+        self.__check_writable()
+        generation = int.from_bytes(os.urandom(8), 'little')
+        temporary_path = self.pack_path.with_suffix('.pack.tmp')
+        self.__create_pack(temporary_path, generation)
+
+        entries = []
+        pack_map = self.__get_pack_map()
+        with temporary_path.open('ab') as f:
+            offset = PACK_HEADER.size
+            for save_id in self.ids():
+                source, length = self.__locate(save_id)
+                data = pack_map[source:source + length]
+                f.write(RECORD.pack(_id_bytes(save_id), length, zlib.crc32(data)))
+                f.write(data)
+                offset += RECORD.size
+                entries.append((save_id, offset, length))
+                offset += length
+            f.flush()
+            os.fsync(f.fileno())
+
+        # the old index does not match the new pack, and is rebuilt if the index is not written.
+        # the new pack is locked before it replaces the old one, so that no other writer takes it meanwhile.
+        self.__close_pack_map()
+        pack = temporary_path.open('r+b')
+        self.__lock(pack)
+        os.replace(temporary_path, self.pack_path)
+        self.__pack.close()
+        self.__pack = pack
+        self.__pack_size = offset
+        self.generation = generation
+        self.__pending.clear()
+        self.__deleted.clear()
+        self.__write_index(generation, entries, offset)
+
+    def close(self):
+        """
+        Flush the index, unless the archive is read-only, and close the files.
+        """
+        if self.__pack is None:
+            return
+        self.flush()
+        self.__close_index()
+        self.__close_pack_map()
+        self.__pack.close()
+        self.__pack = None
+
+    def __enter__(self) -> 'SaveArchive':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,90 @@
+"""
+Unique ids of the saved games, allocated without any shared file or lock.
+
+An id is 128 bits, in the ULID layout: the time in milliseconds in the
+high 48 bits and 80 random bits. Within a process, the ids of the same
+millisecond add one to the first random draw, so the ids of a process
+always increase. Two processes collide only by drawing the same 80 bits
+in the same millisecond. Ids are written as 26 characters of Crockford's
+base 32, so their text sorts like their value.
+"""
+import os
+import threading
+import time
+
+# Crockford's base 32
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+ID_LENGTH = 26
+
+RANDOM_BITS = 80
+
+
+class SaveIdGenerator:
+    """
+    Allocates increasing ids in one process, safely from any thread.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__last_id = 0
+        # a forked process draws its own random bits
+        self.__pid = os.getpid()
+
+    def new_id(self) -> int:
+        """
+        :return: A new id, greater than the previous ones of this process.
+        """
+        with self.__lock:
+            pid = os.getpid()
+            if pid != self.__pid:
+                self.__pid = pid
+                self.__last_id = 0
+
+            milliseconds = time.time_ns() // 1_000_000
+            if milliseconds <= self.__last_id >> RANDOM_BITS:
+                # the same millisecond, or the clock went back
+                save_id = self.__last_id + 1
+            else:
+                save_id = milliseconds << RANDOM_BITS | int.from_bytes(os.urandom(10), 'big')
+            self.__last_id = save_id
+            return save_id
+
+
+# the generator of this process
+_generator = SaveIdGenerator()
+
+
+def new_save_id() -> int:
+    """
+    :return: A new id, unique among all the processes.
+    """
+    return _generator.new_id()
+
+
+def format_save_id(save_id: int) -> str:
+    """
+    :return: The 26 characters of an id.
+    """
+    characters = []
+    for _ in range(ID_LENGTH):
+        characters.append(ALPHABET[save_id & 31])
+        save_id >>= 5
+    return ''.join(reversed(characters))
+
+
+def parse_save_id(text: str) -> int:
+    """
+    :param text: The 26 characters of an id, in any case.
+    :return: The id.
+    """
+    if len(text) != ID_LENGTH:
+        raise ValueError(f'Invalid save id: {text}')
+    save_id = 0
+    for character in text.upper():
+        digit = ALPHABET.find(character)
+        if digit < 0:
+            raise ValueError(f'Invalid save id: {text}')
+        save_id = save_id << 5 | digit
+    if save_id >> 128:
+        raise ValueError(f'Invalid save id: {text}')
+    return save_id
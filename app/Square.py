@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from random import choice
+from typing import Optional
 
-from app.Config import Config
+from app.Event import SquareLanded, SalaryCollected, SquarePassed, PropertyDeclined, TaxPaid, ChanceResolved, \
+    PlayerJailed
+from app.OwnershipIndex import OwnershipIndex
 from app.Player import Player
 
 
@@ -10,6 +12,8 @@ class Square(ABC):
     Represents an abstract square on the board.
     """
 
+    __slots__ = ('position', 'name')
+
     def __init__(self, position: int, name: str):
         self.position = position
         self.name = name
@@ -21,7 +25,7 @@ class Square(ABC):
         Define what happens when a player lands on this square.
         :param player:  The player that lands on the square.
         """
-        print(f'{player.token} has landed on: {self.to_string()}')
+        player.game.event_sink.emit(SquareLanded(player.token, self.position, self.name))
 
     def pass_through(self, player: Player):
         """
@@ -39,18 +43,20 @@ class Square(ABC):
 
 # ---------------------------------------------------------
 class GoSquare(Square):
+    __slots__ = ()
 
     def land_on(self, player: Player):
         super(GoSquare, self).land_on(player)
         player.collect_salary()
-        print(f'{player.token} has collected a salary!')
+        player.game.event_sink.emit(SalaryCollected(player.token, player.game.rules.salary))
         # ask the player to declare balance
         player.declare_balance()
 
     def pass_through(self, player: Player):
         player.collect_salary()
-        print(f'{player.token} has passed through {self.to_string()}')
-        print(f'{player.token} has collected a salary!')
+        event_sink = player.game.event_sink
+        event_sink.emit(SquarePassed(player.token, self.position, self.name))
+        event_sink.emit(SalaryCollected(player.token, player.game.rules.salary))
         # ask the player to declare balance
         player.declare_balance()
 
@@ -58,15 +64,33 @@ class GoSquare(Square):
 # ---------------------------------------------------------
 
 class PropertySquare(Square):
-    def __init__(self, price: int, rent: int, position: int, name: str, owner_token: str = None):
+    __slots__ = ('ownership', 'rent', 'price')
+
+    def __init__(self, price: int, rent: int, position: int, name: str, owner_token: str = None,
+                 ownership: OwnershipIndex = None):
         super().__init__(position, name)
-        self.owner_token = owner_token
+        # a square on its own keeps its owner in its own index, the squares of a board share the one of the board.
+        self.ownership = ownership if ownership is not None else OwnershipIndex(position)
+        if owner_token is not None:
+            self.owner_token = owner_token
         self.rent = rent
         self.price = price
 
-        # whether the user should be prompted to buy
-        self.should_prompt_buy = True
-        self.automated_buy_prompt = '2'
+    @property
+    def owner_token(self) -> Optional[str]:
+        return self.ownership.get_owner(self.position)
+
+    @owner_token.setter
+    def owner_token(self, token: Optional[str]):
+        self.ownership.set_owner(self.position, token)
+
+    def bind(self, ownership: OwnershipIndex) -> 'PropertySquare':
+        """
+        Get the same square keeping its owner in the given index, e.g. the one of a board.
+        :param ownership: The ownership index.
+        :return: The bound square.
+        """
+        return PropertySquare(self.price, self.rent, self.position, self.name, ownership=ownership)
 
     def land_on(self, player: Player):
         super(PropertySquare, self).land_on(player)
@@ -78,25 +102,11 @@ class PropertySquare(Square):
         # ask if the property is interested in
         # owning this property
         if self.owner_token is None:
-            print(f'{player.token}, do you wish to buy this property for {Config.CURRENCY} {self.price}?')
-            print(f'Your current balance is: {player.balance} '
-                  f'and you will be able to collect {Config.CURRENCY} {self.rent} in rent.')
-            print('[1] Yes         [2] No')
-
-            if Config.IS_TEST_ENVIRONMENT:
-                answer = Config.DEFAULT_BUY_PROPERTY_CHOICE
-            else:
-                answer = input('Enter your choice (1/2):>').strip()
-
-            if answer not in ['1', '2']:
-                print('Invalid answer. Defaulting to [2] No.')
-                answer = '2'
-
             # the user wishes to purchase a property.
-            if answer == '1':
+            if player.decision_provider.should_buy(player, self):
                 player.buy_property(self)
             else:
-                print('Okay. Not buying now.')
+                player.game.event_sink.emit(PropertyDeclined(player.token, self.position, self.name))
 
             return
 
@@ -112,11 +122,12 @@ class PropertySquare(Square):
 # ---------------------------------------------------------
 
 class IncomeTaxSquare(Square):
+    __slots__ = ()
 
     def land_on(self, player: Player):
         super(IncomeTaxSquare, self).land_on(player)
         tax = player.pay_tax()
-        print(f'{player.token} has paid a tax of {Config.CURRENCY} {tax}!')
+        player.game.event_sink.emit(TaxPaid(player.token, tax))
         # ask the player to declare balance
         player.declare_balance()
 
@@ -124,6 +135,7 @@ class IncomeTaxSquare(Square):
 # ---------------------------------------------------------
 
 class InJailOrVisitingSquare(Square):
+    __slots__ = ()
 
     def land_on(self, player: Player):
         super(InJailOrVisitingSquare, self).land_on(player)
@@ -132,6 +144,7 @@ class InJailOrVisitingSquare(Square):
 # ---------------------------------------------------------
 
 class ChanceSquare(Square):
+    __slots__ = ()
 
     def land_on(self, player: Player):
         super(ChanceSquare, self).land_on(player)
@@ -141,22 +154,20 @@ class ChanceSquare(Square):
         straws = (True, False)
 
         # whether the user is lucky
-        is_lucky = choice(straws)
+        is_lucky = player.game.random_streams.chance.choice(straws)
         if is_lucky:
             amount = player.gain_from_chance()
-            print(f'{player.token} gained {Config.CURRENCY} {amount}!')
-            # ask the player to declare balance
-            player.declare_balance()
         else:
             amount = player.lose_to_chance()
-            print(f'{player.token} lost {Config.CURRENCY} {amount}!')
-            # ask the player to declare balance
-            player.declare_balance()
+        player.game.event_sink.emit(ChanceResolved(player.token, amount, gained=is_lucky))
+        # ask the player to declare balance
+        player.declare_balance()
 
 
 # ---------------------------------------------------------
 
 class FreeParkingSquare(Square):
+    __slots__ = ()
 
     def land_on(self, player: Player):
         super(FreeParkingSquare, self).land_on(player)
@@ -165,8 +176,9 @@ class FreeParkingSquare(Square):
 # ---------------------------------------------------------
 
 class GoToJailSquare(Square):
+    __slots__ = ()
 
     def land_on(self, player: Player):
         super(GoToJailSquare, self).land_on(player)
         player.go_to_jail()
-        print(f'{player.token} has been jailed!')
+        player.game.event_sink.emit(PlayerJailed(player.token))
@@ -0,0 +1,81 @@
+"""
+A bounded table of the values of searched states, by Zobrist hash.
+
+The table has a fixed number of buckets of two entries. The first entry
+of a bucket keeps the deepest search which landed in it, the second one
+always takes the latest search which did not replace the first. Deep
+results, the expensive ones, survive, while the second entry still
+caches the many shallow states near the leaves.
+"""
+from array import array
+from typing import Optional
+
+# marks an empty entry
+NO_DEPTH = -1
+
+
+class TranspositionTable:
+    """
+    Caches the values of searched states.
+    """
+
+    def __init__(self, size_bits: int = 16):
+        """
+        :param size_bits: The log2 of the number of buckets.
+        """
+        if not 0 <= size_bits <= 30:
+            raise ValueError(f'Invalid table size: 2^{size_bits}')
+
+        self.size_bits = size_bits
+        self.__mask = (1 << size_bits) - 1
+        entry_count = 2 << size_bits
+        self.keys = array('Q', [0]) * entry_count
+        self.depths = array('b', [NO_DEPTH]) * entry_count
+        self.values = array('d', [0.0]) * entry_count
+
+        # statistics
+        self.hits = 0
+        self.misses = 0
+        self.replacements = 0
+
+    def __len__(self) -> int:
+        return len(self.depths) - self.depths.count(NO_DEPTH)
+
+    def lookup(self, key: int, depth: int) -> Optional[float]:
+        """
+        :param key: The hash of the state.
+        :param depth: The depth the state is searched to.
+        :return: The value of the state searched at least that deep, or None.
+        """
+        index = (key & self.__mask) << 1
+        for entry in (index, index + 1):
+            if self.keys[entry] == key and self.depths[entry] >= depth:
+                self.hits += 1
+                return self.values[entry]
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, value: float):
+        """
+        :param key: The hash of the state.
+        :param depth: The depth the state was searched to, at most 127.
+        :param value: The value of the state.
+        """
+        index = (key & self.__mask) << 1
+        if self.depths[index] == NO_DEPTH or self.keys[index] == key or depth >= self.depths[index]:
+            entry = index
+        else:
+            entry = index + 1
+        if self.depths[entry] != NO_DEPTH and self.keys[entry] != key:
+            self.replacements += 1
+
+        self.keys[entry] = key
+        self.depths[entry] = depth
+        self.values[entry] = value
+
+    def clear(self):
+        """
+        Forget every state, e.g. when the rules of the evaluation change.
+        """
+        self.depths[:] = array('b', [NO_DEPTH]) * len(self.depths)
+        self.hits = self.misses = self.replacements = 0
@@ -0,0 +1,279 @@
+"""
+A write-ahead journal of the turns of a live game, to resume it after a crash.
+
+A journaled game is kept as a snapshot, the binary save of GameCodec, and
+a journal of the turns played since. Every turn appends one small record:
+the dice of the turn, the turn which comes next, and what the turn
+changed, i.e. the players whose balance, position or jail state moved
+and the squares which changed owner. The decisions of the players are in
+what they changed, e.g. a purchase is a balance and an owner.
+
+Records are kept in memory and written with a single fsync every few
+turns, so a turn costs a comparison with the previous state and a few
+packed bytes. Every record has a checksum, and a record torn by a crash
+ends the journal. After a number of turns, the snapshot is written again
+and the journal restarts, so that resuming never replays more turns than
+that.
+"""
+import os
+import zlib
+from pathlib import Path
+from struct import Struct
+from typing import Dict, List
+
+from app.GameCodec import (decode_game, encode_game, player_flags, IS_JAILED, HAS_EXITED, JAIL_BAIL_MODE,
+                           JAIL_FEELING_LUCKY_MODE, NO_OWNER)
+
+# the files of a journaled game
+SNAPSHOT_EXTENSION = '.snap'
+JOURNAL_EXTENSION = '.journal'
+
+# magic, turn of the snapshot
+SNAPSHOT_HEADER = Struct('<4sI')
+SNAPSHOT_MAGIC = b'MSNP'
+# magic, version, turn the journal starts after
+JOURNAL_HEADER = Struct('<4sBxxxI')
+JOURNAL_MAGIC = b'MJNL'
+VERSION = 1
+
+# length and checksum of a record
+FRAME = Struct('<HI')
+# turn, current round, current player id, dice, changed player count, changed square count
+TURN = Struct('<IIBBBBB')
+# seat, balance, position, moves since jail, flags
+PLAYER_STATE = Struct('<BiHBB')
+# position, seat of the owner
+SQUARE = Struct('<Hb')
+
+
+def _write_atomically(path: Path, data: bytes):
+    temporary_path = path.with_name(path.name + '.tmp')
+    with temporary_path.open('wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, path)
+
+
+class TurnEncoder:
+    """
+    Encodes what each turn of a game changed, as a compact record.
+    """
+
+    def __init__(self, game):
+        """
+        :param game: The game, in the state the first record starts from.
+        """
+        self.__seats: Dict[str, int] = {player.token: seat for seat, player in enumerate(game.players)}
+        self.__players: List[tuple] = []
+        self.__owner_ids = None
+        self.reset(game)
+
+    def reset(self, game):
+        """
+        Start the next record from the current state of the game.
+        """
+        self.__players = [player.snapshot() for player in game.players]
+        self.__owner_ids = game.board.ownership.owner_ids[:]
+
+    def encode(self, game, turn: int) -> bytes:
+        """
+        :param game: The game, once the turn is played.
+        :param turn: The number of the turn.
+        :return: The record of what changed since the last record.
+        """
+        parts = []
+        players = self.__players
+        for seat, player in enumerate(game.players):
+            state = player.snapshot()
+            if state != players[seat]:
+                players[seat] = state
+                parts.append(PLAYER_STATE.pack(seat, state[0], state[2], state[3], player_flags(state)))
+        player_count = len(parts)
+
+        ownership = game.board.ownership
+        if ownership.owner_ids != self.__owner_ids:
+            for index, (previous_id, owner_id) in enumerate(zip(self.__owner_ids, ownership.owner_ids)):
+                if previous_id != owner_id:
+                    seat = NO_OWNER if owner_id == NO_OWNER else self.__seats[ownership.tokens[owner_id]]
+                    parts.append(SQUARE.pack(index + 1, seat))
+            self.__owner_ids[:] = ownership.owner_ids
+
+        # the dice of the last roll of the turn, if any
+        die_pair = game.die_pair
+        return TURN.pack(turn, game.current_round, game.current_player_id, die_pair.die1.value or 0,
+                         die_pair.die2.value or 0, player_count, len(parts) - player_count) + b''.join(parts)
+
+
+def apply_turn(game, body) -> int:
+    """
+    Bring a game to the state after a turn.
+    :param game: The game, in the state before the turn.
+    :param body: The record of the turn.
+    :return: The number of the turn.
+    """
+    turn, current_round, current_player_id, _, _, player_count, square_count = TURN.unpack_from(body)
+    game.current_round = current_round
+    game.current_player_id = current_player_id
+
+    players = game.players
+    position = TURN.size
+    for _ in range(player_count):
+        seat, balance, square_position, move_count_since_jail, flags = PLAYER_STATE.unpack_from(body, position)
+        position += PLAYER_STATE.size
+        players[seat].restore((balance, bool(flags & IS_JAILED), square_position, move_count_since_jail,
+                               bool(flags & HAS_EXITED), bool(flags & JAIL_BAIL_MODE),
+                               bool(flags & JAIL_FEELING_LUCKY_MODE)))
+
+    ownership = game.board.ownership
+    for _ in range(square_count):
+        square_position, seat = SQUARE.unpack_from(body, position)
+        position += SQUARE.size
+        ownership.set_owner(square_position, None if seat == NO_OWNER else players[seat].token)
+    return turn
+
+
+class TurnJournal:
+    """
+    Journals the turns of a game, attached to it as game.journal.
+    """
+
+    def __init__(self, path, game, checkpoint_interval: int = 256, sync_every: int = 16):
+        """
+        Start journaling a game, from a snapshot of its current state.
+        :param path: The path of the files of the game, without extension.
+        :param game: The game.
+        :param checkpoint_interval: The number of turns after which the snapshot is written again.
+        :param sync_every: The number of turns written to disk at once, the most a crash can lose.
+        """
+        if checkpoint_interval < 1 or sync_every < 1:
+            raise ValueError(f'Invalid journal intervals: {checkpoint_interval}, {sync_every}')
+
+        self.path = Path(path)
+        self.snapshot_path = self.path.with_suffix(SNAPSHOT_EXTENSION)
+        self.journal_path = self.path.with_suffix(JOURNAL_EXTENSION)
+        self.checkpoint_interval = checkpoint_interval
+        self.sync_every = sync_every
+
+        # the number of turns played, the snapshot one and the records not yet written
+        self.turn = 0
+        self.snapshot_turn = 0
+        self.__pending = bytearray()
+        self.__pending_count = 0
+        self.__file = None
+
+        # finds what every turn changes
+        self.__encoder = TurnEncoder(game)
+
+        self.checkpoint(game)
+        game.journal = self
+
+    def record(self, game):
+        """
+        Append the turn which has just been played.
+        :param game: The game.
+        """
+        self.turn += 1
+        body = self.__encoder.encode(game, self.turn)
+        self.__pending += FRAME.pack(len(body), zlib.crc32(body))
+        self.__pending += body
+        self.__pending_count += 1
+
+        if self.turn - self.snapshot_turn >= self.checkpoint_interval:
+            self.checkpoint(game)
+        elif self.__pending_count >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        """
+        Write the pending records to disk.
+        """
+        if not self.__pending:
+            return
+        self.__file.write(self.__pending)
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+        self.__pending.clear()
+        self.__pending_count = 0
+
+    def checkpoint(self, game):
+        """
+        Write the snapshot of the game, and start the journal again.
+        :param game: The game.
+        """
+        # the records before the snapshot are not needed any more, and are skipped if the journal is not restarted.
+        _write_atomically(self.snapshot_path, SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, self.turn) + encode_game(game))
+        if self.__file is not None:
+            self.__file.close()
+        _write_atomically(self.journal_path, JOURNAL_HEADER.pack(JOURNAL_MAGIC, VERSION, self.turn))
+        self.__file = self.journal_path.open('ab')
+
+        self.snapshot_turn = self.turn
+        self.__pending.clear()
+        self.__pending_count = 0
+        self.__encoder.reset(game)
+
+    def close(self):
+        """
+        Write the pending records, e.g. when the game is saved and exited.
+        """
+        if self.__file is None:
+            return
+        self.sync()
+        self.__file.close()
+        self.__file = None
+
+    def discard(self):
+        """
+        Remove the files of the game, once it is over.
+        """
+        self.close()
+        for path in (self.snapshot_path, self.journal_path):
+            if path.exists():
+                path.unlink()
+
+
+def find_journals(directory) -> List[Path]:
+    """
+    :param directory: The folder of the journaled games.
+    :return: The paths of the games which can be resumed, without extension.
+    """
+    return sorted(path.with_suffix('') for path in Path(directory).glob('*' + SNAPSHOT_EXTENSION))
+
+
+def recover_game(path, **game_options):
+    """
+    Resume a journaled game: load its snapshot and replay the journal.
+    :param path: The path of the files of the game, without extension.
+    :param game_options: The other arguments of Game.
+    :return: The game, in the state of the last turn written.
+    """
+    path = Path(path)
+    data = path.with_suffix(SNAPSHOT_EXTENSION).read_bytes()
+    if len(data) < SNAPSHOT_HEADER.size or data[:4] != SNAPSHOT_MAGIC:
+        raise ValueError(f'Not a snapshot: {path}')
+    _, turn = SNAPSHOT_HEADER.unpack_from(data)
+    game = decode_game(data[SNAPSHOT_HEADER.size:], **game_options)
+
+    journal_path = path.with_suffix(JOURNAL_EXTENSION)
+    journal = journal_path.read_bytes() if journal_path.exists() else b''
+    if len(journal) < JOURNAL_HEADER.size:
+        return game
+    magic, version, _ = JOURNAL_HEADER.unpack_from(journal)
+    if magic != JOURNAL_MAGIC or version != VERSION:
+        raise ValueError(f'Not a journal: {journal_path}')
+
+    offset = JOURNAL_HEADER.size
+    while offset + FRAME.size <= len(journal):
+        length, checksum = FRAME.unpack_from(journal, offset)
+        offset += FRAME.size
+        body = journal[offset:offset + length]
+        if len(body) != length or zlib.crc32(body) != checksum:
+            # a record torn by a crash
+            break
+        offset += length
+
+        # the records of a journal which was not restarted after its snapshot are skipped.
+        if TURN.unpack_from(body)[0] > turn:
+            turn = apply_turn(game, body)
+    return game
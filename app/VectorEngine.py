@@ -0,0 +1,293 @@
+"""
+A lockstep engine that plays many games at once with NumPy arrays.
+
+All games of a batch have the same number of players, so they share
+the current round and the current seat. Every step plays the turn of
+that seat in all the games which are still running. The rules are the
+ones implemented by Player and the Square classes, including their
+order of evaluation, so both engines agree on identical random streams.
+
+This module needs NumPy.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.BoardLayout import BoardLayout, standard_layout
+from app.DecisionProvider import DecisionProvider, AlwaysBuyProvider, NeverBuyProvider, ThresholdBuyProvider, \
+    JailStrategy
+from app.Die import Die
+from app.RuleSet import RuleSet
+from app.Square import GoSquare, PropertySquare, IncomeTaxSquare, ChanceSquare, GoToJailSquare
+
+# the kinds of squares the engine tells apart
+OTHER = 0
+PROPERTY = 1
+INCOME_TAX = 2
+CHANCE = 3
+GO_TO_JAIL = 4
+
+# marks a property without owner
+NO_OWNER = -1
+
+
+class VectorEngine:
+    """
+    Plays `game_count` games in lockstep.
+
+    By default, dice and chance are drawn from a NumPy generator. For
+    validation, explicit streams can be given instead:
+    - dice: int array (games, rolls, 2) with the values of the two dice of each roll.
+    - chance: float array (games, draws, 2) of uniform numbers in [0, 1). The first
+      one picks the luck of a chance square, the second one the amount.
+    """
+
+    def __init__(self, game_count: int, providers: Sequence[DecisionProvider], seed: Optional[int] = None,
+                 dice: np.ndarray = None, chance: np.ndarray = None, rules: RuleSet = None,
+                 board_layout: BoardLayout = None):
+        # the standard rules with real dice by default
+        if rules is None:
+            rules = RuleSet()
+        if len(providers) < rules.min_player_count or len(providers) > rules.max_player_count:
+            raise ValueError(f'Invalid number of players: {len(providers)}')
+
+        self.game_count = game_count
+        self.player_count = len(providers)
+        self.rng = np.random.default_rng(seed)
+        self.dice = dice
+        self.chance = chance
+
+        # the rules
+        self.rules = rules
+        self.salary = rules.salary
+        self.jail_fine = rules.jail_fine
+        self.jail_position = rules.jail_square_position
+        self.max_round_count = rules.max_round_count
+        die_pools = rules.die_pools if rules.die_pools is not None else (Die.die_pool, Die.die_pool)
+        self.die_pools = [np.array(die_pool) for die_pool in die_pools]
+        self.gain_amounts = np.array(rules.chance_gain_amounts)
+        self.loss_amounts = np.array(rules.chance_loss_amounts)
+
+        # the board
+        layout = board_layout if board_layout is not None else standard_layout()
+        squares = layout.squares
+        self.square_count = layout.square_count
+        self.kinds = np.array([self.__kind_of(square) for square in squares])
+        self.prices = np.array(layout.prices, dtype=np.int64)
+        self.rents = np.array(layout.rents, dtype=np.int64)
+        # only the go squares do something when passed through.
+        self.go_positions = [square.position for square in squares if isinstance(square, GoSquare)]
+
+        # the decisions of every seat
+        self.buy_reserves = np.empty(self.player_count)
+        self.feeling_lucky = np.empty(self.player_count, dtype=bool)
+        self.pay_bail_now = np.empty(self.player_count, dtype=bool)
+        for seat, provider in enumerate(providers):
+            self.buy_reserves[seat], self.feeling_lucky[seat], self.pay_bail_now[seat] = self.__policy_of(provider)
+
+        # the state of the games
+        shape = (game_count, self.player_count)
+        self.positions = np.ones(shape, dtype=np.int64)
+        self.balances = np.full(shape, self.salary, dtype=np.int64)
+        self.is_jailed = np.zeros(shape, dtype=bool)
+        self.move_count_since_jail = np.zeros(shape, dtype=np.int64)
+        self.jail_bail_mode = np.zeros(shape, dtype=bool)
+        self.jail_feeling_lucky_mode = np.zeros(shape, dtype=bool)
+        self.has_exited = np.zeros(shape, dtype=bool)
+        self.owners = np.full((game_count, self.square_count), NO_OWNER, dtype=np.int64)
+        self.current_round = 1
+        self.current_player_id = 0
+
+        # the round and seat at which each game ended, 0 while it is running
+        self.end_round = np.zeros(game_count, dtype=np.int64)
+        self.end_player_id = np.zeros(game_count, dtype=np.int64)
+
+        # the position in the explicit random streams of each game
+        self.dice_cursor = np.zeros(game_count, dtype=np.int64)
+        self.chance_cursor = np.zeros(game_count, dtype=np.int64)
+
+    @staticmethod
+    def __kind_of(square) -> int:
+        if isinstance(square, PropertySquare):
+            return PROPERTY
+        if isinstance(square, IncomeTaxSquare):
+            return INCOME_TAX
+        if isinstance(square, ChanceSquare):
+            return CHANCE
+        if isinstance(square, GoToJailSquare):
+            return GO_TO_JAIL
+        return OTHER
+
+    @staticmethod
+    def __policy_of(provider: DecisionProvider):
+        """
+        :return: The buy reserve, whether the jail strategy is feeling lucky and whether bail is paid now.
+        """
+        if isinstance(provider, AlwaysBuyProvider):
+            reserve = -np.inf
+        elif isinstance(provider, NeverBuyProvider):
+            reserve = np.inf
+        elif isinstance(provider, ThresholdBuyProvider):
+            reserve = provider.reserve
+        else:
+            raise ValueError(f'Unsupported decision provider: {type(provider).__name__}')
+        return reserve, provider.jail_strategy == JailStrategy.FEELING_LUCKY, provider.pay_bail_now
+
+    # ---------------------------------------------------------
+
+    def is_game_over(self) -> np.ndarray:
+        """
+        :return: For each game, whether it is over.
+        """
+        active_player_count = (~self.has_exited).sum(axis=1)
+        return (active_player_count == 1) | (self.current_round > self.max_round_count)
+
+    def get_winners(self) -> np.ndarray:
+        """
+        :return: For each game and player, whether the player is one of the winners.
+        """
+        active = ~self.has_exited
+        highest_balance = np.maximum(np.where(active, self.balances, 0).max(axis=1), 0)
+        return active & (self.balances == highest_balance[:, None])
+
+    def run(self):
+        """
+        Play all the games until they are over.
+        """
+        while not (self.end_round > 0).all():
+            self.step()
+
+    def step(self):
+        """
+        Play the turn of the current seat in every running game.
+        """
+        seat = self.current_player_id
+        is_game_over = self.is_game_over()
+
+        # remember when the games ended
+        ended = is_game_over & (self.end_round == 0)
+        self.end_round[ended] = self.current_round
+        self.end_player_id[ended] = seat
+
+        games = np.nonzero(~is_game_over & ~self.has_exited[:, seat])[0]
+        if len(games):
+            self.__play(games, seat)
+
+        # hand the turn over to the next player
+        if seat == self.player_count - 1:
+            self.current_round += 1
+            self.current_player_id = 0
+        else:
+            self.current_player_id += 1
+
+    # ---------------------------------------------------------
+
+    def __roll_dice(self, games: np.ndarray):
+        if self.dice is None:
+            rolls = np.stack([self.rng.choice(die_pool, size=len(games)) for die_pool in self.die_pools], axis=1)
+        else:
+            rolls = self.dice[games, self.dice_cursor[games]]
+            self.dice_cursor[games] += 1
+        return rolls[:, 0], rolls[:, 1]
+
+    def __draw_chance(self, games: np.ndarray):
+        if self.chance is None:
+            draws = self.rng.random((len(games), 2))
+        else:
+            draws = self.chance[games, self.chance_cursor[games]]
+            self.chance_cursor[games] += 1
+        return draws[:, 0], draws[:, 1]
+
+    def __play(self, games: np.ndarray, seat: int):
+        die1, die2 = self.__roll_dice(games)
+        dice_total = die1 + die2
+        is_double = die1 == die2
+
+        jailed = self.is_jailed[games, seat]
+
+        # the jailed players without a strategy select one.
+        selecting = jailed & ~(self.jail_feeling_lucky_mode[games, seat] | self.jail_bail_mode[games, seat])
+        self.jail_feeling_lucky_mode[games[selecting], seat] = self.feeling_lucky[seat]
+        self.jail_bail_mode[games[selecting], seat] = not self.feeling_lucky[seat]
+
+        lucky = jailed & self.jail_feeling_lucky_mode[games, seat]
+        bail = jailed & ~self.jail_feeling_lucky_mode[games, seat]
+
+        # both jail strategies count the moves since being jailed.
+        self.move_count_since_jail[games[jailed], seat] += 1
+        move_count = self.move_count_since_jail[games, seat]
+
+        # feeling lucky: leave with a double, or pay by the third turn.
+        lucky_paying = lucky & ~is_double & (move_count == 3)
+        lucky_leaving = lucky & (is_double | lucky_paying)
+
+        # bail: pay in the first turn when agreed to, in the second one otherwise.
+        bail_paying = bail & ((move_count > 1) | self.pay_bail_now[seat])
+
+        paying = lucky_paying | bail_paying
+        self.balances[games[paying], seat] -= self.jail_fine
+        self.is_jailed[games[lucky_leaving | bail_paying], seat] = False
+
+        moving = ~jailed | lucky_leaving | bail
+        self.__move_and_land(games[moving], seat, dice_total[moving])
+
+        # the bankrupt players exit and disown their properties.
+        bankrupt = games[self.balances[games, seat] < 0]
+        self.has_exited[bankrupt, seat] = True
+        owned = self.owners[bankrupt] == seat
+        self.owners[bankrupt] = np.where(owned, NO_OWNER, self.owners[bankrupt])
+
+    def __move_and_land(self, games: np.ndarray, seat: int, dice_total: np.ndarray):
+        start = self.positions[games, seat] - 1
+        end = start + dice_total
+
+        # collect a salary for every go square passed through or landed on.
+        for go_position in self.go_positions:
+            offset = go_position - 1
+            crossings = (end - offset) // self.square_count - (start - offset) // self.square_count
+            self.balances[games, seat] += crossings * self.salary
+
+        position = end % self.square_count + 1
+        self.positions[games, seat] = position
+        kinds = self.kinds[position - 1]
+
+        self.__land_on_property(games[kinds == PROPERTY], seat, position[kinds == PROPERTY])
+        self.__land_on_income_tax(games[kinds == INCOME_TAX], seat)
+        self.__land_on_chance(games[kinds == CHANCE], seat)
+        self.__land_on_go_to_jail(games[kinds == GO_TO_JAIL], seat)
+
+    def __land_on_property(self, games: np.ndarray, seat: int, position: np.ndarray):
+        index = position - 1
+        owner = self.owners[games, index]
+        price = self.prices[index]
+        rent = self.rents[index]
+
+        # buy the unowned properties if the decision allows it.
+        buying = (owner == NO_OWNER) & (self.balances[games, seat] - price >= self.buy_reserves[seat])
+        self.balances[games[buying], seat] -= price[buying]
+        self.owners[games[buying], index[buying]] = seat
+
+        # pay rent for the properties owned by someone else.
+        renting = (owner != NO_OWNER) & (owner != seat)
+        self.balances[games[renting], seat] -= rent[renting]
+        self.balances[games[renting], owner[renting]] += rent[renting]
+
+    def __land_on_income_tax(self, games: np.ndarray, seat: int):
+        # 10 percent of the balance, rounded down to a multiple of 10
+        raw_tax = 0.1 * self.balances[games, seat]
+        tax = (raw_tax - np.mod(raw_tax, 10)).astype(np.int64)
+        self.balances[games, seat] -= tax
+
+    def __land_on_chance(self, games: np.ndarray, seat: int):
+        luck, pick = self.__draw_chance(games)
+        is_lucky = luck < 0.5
+        gain = self.gain_amounts[(pick * len(self.gain_amounts)).astype(np.int64)]
+        loss = self.loss_amounts[(pick * len(self.loss_amounts)).astype(np.int64)]
+        self.balances[games, seat] += np.where(is_lucky, gain, -loss)
+
+    def __land_on_go_to_jail(self, games: np.ndarray, seat: int):
+        self.is_jailed[games, seat] = True
+        self.move_count_since_jail[games, seat] = 0
+        self.positions[games, seat] = self.jail_position
+        self.jail_feeling_lucky_mode[games, seat] = False
+        self.jail_bail_mode[games, seat] = False
@@ -0,0 +1,76 @@
+"""
+Zobrist keys to hash the state of a game incrementally.
+
+The hash of a game is the XOR of the keys of its parts: who owns which
+square, and the balance, position and jail state of every player. A part
+which changes swaps its old key for the new one, in O(1), so the hash is
+always up to date. Every value reads its key from a table, and a balance
+XORs one key per byte of its 32 low bits.
+"""
+from functools import lru_cache
+from typing import Tuple
+
+from app.RandomStreams import derive_seed
+
+MASK = (1 << 64) - 1
+
+
+def mix(value: int) -> int:
+    """
+    Scramble a 64 bit value, with the finalizer of splitmix64.
+    :param value: Any integer, only its low 64 bits are used.
+    :return: The scrambled value.
+    """
+    value = (value + 0x9E3779B97F4A7C15) & MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK
+    return value ^ (value >> 31)
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(name: str, count: int) -> Tuple[int, ...]:
+    """
+    :param name: What the keys stand for, e.g. the token of an owner.
+    :param count: The number of keys.
+    :return: Random 64 bit keys, always the same for a given name.
+    """
+    return tuple(derive_seed('zobrist', name, index) for index in range(count))
+
+
+class PlayerKeys:
+    """
+    The keys of the state of the player in one seat.
+    """
+
+    __slots__ = ('balance', 'position', 'move_count', 'is_jailed', 'jail_bail_mode', 'jail_feeling_lucky_mode',
+                 'has_exited', 'initial_hash')
+
+    def __init__(self, player_id: int, square_count: int):
+        # 4 tables of 256 keys, one per byte
+        self.balance = zobrist_keys(f'player {player_id} balance', 1024)
+        self.position = zobrist_keys(f'player {player_id} position', square_count + 1)
+        self.move_count = zobrist_keys(f'player {player_id} move count', 8)
+        self.is_jailed, self.jail_bail_mode, self.jail_feeling_lucky_mode, self.has_exited = \
+            zobrist_keys(f'player {player_id} flags', 4)
+        # the hash of a player with every value at 0 and every flag off
+        self.initial_hash = self.balance_hash(0) ^ self.position[0] ^ self.move_count[0]
+
+    def balance_hash(self, balance: int) -> int:
+        """
+        :return: The key of a balance, negative ones included.
+        """
+        keys = self.balance
+        return (keys[balance & 0xFF] ^ keys[256 | (balance >> 8) & 0xFF] ^ keys[512 | (balance >> 16) & 0xFF] ^
+                keys[768 | (balance >> 24) & 0xFF])
+
+
+@lru_cache(maxsize=None)
+def player_keys(player_id: int, square_count: int) -> PlayerKeys:
+    """
+    :return: The keys of the player in a seat, shared by all games on boards of the same size.
+    """
+    return PlayerKeys(player_id, square_count)
+
+
+# the key of the round and the current player
+TURN_KEY = derive_seed('zobrist', 'turn')
@@ -1,8 +1,47 @@
 # launch the game here.
 from app.Game import Game
+from app.Autosave import Autosaver, autosave_name
 from app.Config import Config
+from app.GameCodec import load_game_file
+from app.SaveArchive import SaveArchive, ARCHIVE_NAME
+from app.SaveIds import parse_save_id, new_save_id, format_save_id
+from app.TurnJournal import TurnJournal, find_journals, recover_game
 from pathlib import Path
-from json import loads
+
+# the prefix of the journals of the games being played
+LIVE_PREFIX = 'live_'
+
+
+def find_archived_save(name):
+    """
+    :return: The id of a save of the archive of saved_games, or None.
+    """
+    try:
+        save_id = parse_save_id(name)
+    except ValueError:
+        return None
+    if not Path('saved_games').joinpath(ARCHIVE_NAME).with_suffix('.pack').exists():
+        return None
+    with SaveArchive(Path('saved_games').joinpath(ARCHIVE_NAME), read_only=True) as archive:
+        return save_id if save_id in archive else None
+
+
+def play_journaled(game, path=None):
+    """
+    Play a game, journaling every turn so that it can be resumed after a crash,
+    and autosaving it in the background. A player who saves and exits saves it to the archive.
+    """
+    if path is None:
+        path = Path('saved_games').joinpath(LIVE_PREFIX + format_save_id(new_save_id()))
+    TurnJournal(path, game)
+    # the autosave is named after the journal, so that the games played at the same time keep their own
+    game_id = Path(path).name.replace(LIVE_PREFIX, '', 1)
+    Autosaver(Path('saved_games').joinpath(autosave_name(game_id)), game)
+    # the archive is only opened for writing to save, so that the other games can save to it meanwhile
+    game.archive = Path('saved_games').joinpath(ARCHIVE_NAME)
+    game.launch_game()
+    game.archive = None
+
 
 if __name__ == '__main__':
     # the game is being played (not executed by tests)
@@ -11,8 +50,17 @@ if __name__ == '__main__':
     print('----------- Welcome to MONOPOLY -------------')
     print('1. Load Game  From file')
     print('2. Start A New Game')
+    # the games which were interrupted before they were over or saved
+    interrupted = find_journals('saved_games')
+    if interrupted:
+        print(f'3. Resume An Interrupted Game ({len(interrupted)} found)')
     choice = input('Enter your selection :>')
-    if choice == '1':
+    if choice == '3' and interrupted:
+        # resume the latest one, from its snapshot and the turns journaled since
+        game = recover_game(interrupted[-1])
+        print('\nThe game was resumed successfully!\n')
+        play_journaled(game, interrupted[-1])
+    elif choice == '1':
         # file_name = input('Enter the file name (e.g monopoly_1.json) :>').strip()
         # path = Path('saved_games').joinpath(file_name)
         # if not path.exists():
@@ -20,24 +68,29 @@ if __name__ == '__main__':
         exists = True
         file_name = ''
         path = None
+        archived_id = None
         while exists:
-            file_name = input('Enter the file name (e.g monopoly_1.json) :>').strip()
+            file_name = input(f'Enter the save id or the file name '
+                              f'(e.g <id>, monopoly_<id>.msav or {autosave_name("<id>")}) :>').strip()
             path = Path('saved_games').joinpath(file_name)
             # if not path.exists():
             #     print(f'Error: File {file_name} was not found in the folder \'saved games\'. Try again.')
-            exists = path.exists()
+            archived_id = find_archived_save(file_name)
+            exists = path.is_file() or archived_id is not None
             if not exists:
                 print("Please Enter a correct file name or restart the game.")
                 exists = True
             else:
                 break
         try:
-            with path.open('r') as f:
-                game_dict = loads(f.read())
-            # create the game
-            game = Game(game_dict=game_dict)
+            # create the game, from the archive, or from a binary or a JSON save
+            if archived_id is not None:
+                with SaveArchive(Path('saved_games').joinpath(ARCHIVE_NAME), read_only=True) as archive:
+                    game = archive.load_game(archived_id)
+            else:
+                game = load_game_file(path)
             print('\nThe game was loaded successfully!\n')
-            game.launch_game()
+            play_journaled(game)
         except:
             print(f'Error. File {file_name} could not be read. Try again.')
     else:
@@ -51,7 +104,7 @@ if __name__ == '__main__':
 
         # create the game
         game = Game(player_count=players_num)
-        game.launch_game()
+        play_journaled(game)
 
 
 
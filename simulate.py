@@ -0,0 +1,41 @@
+# simulate many games without any interaction.
+import argparse
+import json
+import time
+from collections import Counter
+
+from app.BatchRunner import iter_batch
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Simulate many games of monopoly.')
+    parser.add_argument('games', type=int, help='The number of games to play.')
+    parser.add_argument('--policies', nargs='+', default=['always', 'always'],
+                        help='The policy of each player: always, never, random, threshold:<reserve>, '
+                             'mcts:<iterations>, expectimax:<depth> or table.')
+    parser.add_argument('--seed', type=int, default=0, help='The seed of the batch.')
+    parser.add_argument('--workers', type=int, default=None, help='The number of worker processes.')
+    parser.add_argument('--chunk-size', type=int, default=None, help='The number of games per unit of work.')
+    parser.add_argument('--output', default=None, help='Write one JSON summary per game to this file.')
+    args = parser.parse_args()
+
+    wins = Counter()
+    total_rounds = 0
+    started = time.perf_counter()
+
+    output = open(args.output, 'w') if args.output else None
+    try:
+        for summary in iter_batch(args.games, args.policies, args.seed, args.workers, args.chunk_size):
+            total_rounds += summary.rounds
+            for winner in summary.winners:
+                wins[winner] += 1
+            if output is not None:
+                output.write(json.dumps(summary._asdict()) + '\n')
+    finally:
+        if output is not None:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    print(f'Played {args.games} games in {elapsed:.2f}s ({args.games / elapsed:.0f} games/s)')
+    print(f'Average rounds: {total_rounds / max(args.games, 1):.1f}')
+    for seat, policy in enumerate(args.policies, start=1):
+        print(f'Player {seat} ({policy}): {wins[f"Player {seat}"]} wins')
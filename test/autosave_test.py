@@ -0,0 +1,163 @@
+"""
+Tests for the background autosave.
+"""
+import pytest
+
+from app.Autosave import Autosaver, autosave_name
+from app.DecisionProvider import AlwaysBuyProvider
+from app.Event import AutosaveFailed, GameOver
+from app.EventSink import EventSink, NullEventSink
+from app.Game import Game
+from app.GameCodec import load_game_file, COMPRESSED_MAGIC
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+
+
+def new_game() -> Game:
+    return Game(3, event_sink=NullEventSink(), decision_providers=[AlwaysBuyProvider()] * 3,
+                random_streams=RandomStreams(2), rules=RuleSet())
+
+
+def play(game: Game, turns: int):
+    for _ in range(turns):
+        game.play_turn(game.get_player_by_id(game.current_player_id))
+
+
+def test_every_turns(tmp_path):
+    """
+    The game is saved every few turns, and the autosave is loaded like any save.
+    """
+    game = new_game()
+    autosaver = Autosaver(tmp_path / 'autosave.msavz', game, every_turns=5, every_seconds=None)
+    play(game, 12)
+    autosaver.close()
+
+    assert autosaver.saved == 2
+    assert autosaver.written + autosaver.dropped == 2
+    assert (tmp_path / 'autosave.msavz').read_bytes().startswith(COMPRESSED_MAGIC)
+    # the state after the 10th turn
+    expected = new_game()
+    play(expected, 10)
+    loaded = load_game_file(tmp_path / 'autosave.msavz', event_sink=NullEventSink(), rules=RuleSet())
+    assert loaded.to_dict() == expected.to_dict()
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_last_save(tmp_path):
+    """
+    Closing with the game saves its final state.
+    """
+    game = new_game()
+    autosaver = Autosaver(tmp_path / 'autosave.msavz', game, every_turns=None, every_seconds=3600)
+    play(game, 7)
+    assert autosaver.saved == 0
+    autosaver.close(game)
+
+    loaded = load_game_file(tmp_path / 'autosave.msavz', event_sink=NullEventSink(), rules=RuleSet())
+    assert loaded.to_dict() == game.to_dict()
+
+
+def test_every_seconds(tmp_path, monkeypatch):
+    """
+    The game is saved once the time is up, whatever the number of turns.
+    """
+    now = [100.0]
+    monkeypatch.setattr('app.Autosave.time.monotonic', lambda: now[0])
+    game = new_game()
+    autosaver = Autosaver(tmp_path / 'autosave.msavz', game, every_turns=None, every_seconds=2)
+    play(game, 3)
+    assert autosaver.saved == 0
+    now[0] += 2
+    play(game, 1)
+    assert autosaver.saved == 1
+    play(game, 1)
+    assert autosaver.saved == 1
+    autosaver.close()
+
+
+def test_launch_game(tmp_path):
+    """
+    A game played to the end leaves its final state in the autosave.
+    """
+    game = new_game()
+    Autosaver(tmp_path / 'autosave.msavz', game, every_turns=3)
+    game.launch_game()
+    assert game.autosave is None
+
+    loaded = load_game_file(tmp_path / 'autosave.msavz', event_sink=NullEventSink(), rules=RuleSet())
+    assert loaded.to_dict() == game.to_dict()
+
+
+def test_write_error(tmp_path):
+    """
+    An error of the writer does not stop the game, and is raised once the autosave is closed.
+    """
+    game = new_game()
+    autosaver = Autosaver(tmp_path / 'missing' / 'autosave.msavz', game, every_turns=1)
+    play(game, 3)
+    with pytest.raises(OSError):
+        autosaver.close()
+
+    # the temporary file of a save which could not replace the autosave is removed
+    (tmp_path / 'autosave.msavz').mkdir()
+    game = new_game()
+    autosaver = Autosaver(tmp_path / 'autosave.msavz', game, every_turns=1)
+    play(game, 2)
+    with pytest.raises(OSError):
+        autosaver.close()
+    assert [path.name for path in tmp_path.iterdir()] == ['autosave.msavz']
+
+
+def test_games_at_the_same_time(tmp_path):
+    """
+    The games played at the same time are autosaved to their own files, through their own temporary files.
+    """
+    games = [new_game(), new_game()]
+    names = [autosave_name('1'), autosave_name('2')]
+    assert names[0] != names[1]
+    autosavers = [Autosaver(tmp_path / name, game, every_turns=1) for name, game in zip(names, games)]
+    play(games[0], 5)
+    play(games[1], 8)
+    for autosaver in autosavers:
+        autosaver.close()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(names)
+    for name, game in zip(names, games):
+        assert load_game_file(tmp_path / name, event_sink=NullEventSink(), rules=RuleSet()).to_dict() == game.to_dict()
+
+
+class EventRecorder(EventSink):
+    """
+    Keeps the events of the kinds it is asked for.
+    """
+
+    def __init__(self, *kinds):
+        self.kinds = kinds
+        self.events = []
+
+    def emit(self, event):
+        if isinstance(event, self.kinds):
+            self.events.append(event)
+
+
+def test_launch_game_write_error(tmp_path):
+    """
+    A game whose autosave failed is still settled, and the error is reported with the winners.
+    """
+    game = new_game()
+    game.event_sink = recorder = EventRecorder(AutosaveFailed, GameOver)
+    Autosaver(tmp_path / 'missing' / 'autosave.msavz', game, every_turns=3)
+    game.launch_game()
+
+    assert game.autosave is None
+    failed, game_over = recorder.events
+    assert isinstance(failed, AutosaveFailed) and failed.error.startswith('FileNotFoundError')
+    assert isinstance(game_over, GameOver)
+
+
+def test_invalid_interval(tmp_path):
+    """
+    An autosave needs an interval.
+    """
+    with pytest.raises(ValueError):
+        Autosaver(tmp_path / 'autosave.msavz', new_game(), every_turns=None, every_seconds=None)
@@ -0,0 +1,56 @@
+"""
+Tests for the batch runner.
+"""
+import pytest
+
+from app.BatchRunner import run_batch, play_game
+from app.Config import Config
+
+
+def test_batch_is_deterministic():
+    """
+    The same batch seed always produces the same games, in or out of process.
+    """
+    policies = ['always', 'threshold:300', 'random']
+    inline = run_batch(6, policies, seed=11, workers=1)
+    pooled = run_batch(6, policies, seed=11, workers=2, chunk_size=2)
+
+    assert inline == pooled
+    assert [summary.game_index for summary in inline] == list(range(6))
+    assert inline != run_batch(6, policies, seed=12, workers=1)
+
+
+def test_single_game_replay():
+    """
+    A single game of a batch can be replayed from its index.
+    """
+    summaries = run_batch(4, seed=5, workers=1)
+
+    Config.IS_TEST_ENVIRONMENT = False
+    try:
+        replayed = play_game(2, 5, ('always', 'always'))
+    finally:
+        Config.IS_TEST_ENVIRONMENT = True
+
+    assert replayed == summaries[2]
+    assert replayed.seed == 5
+
+
+def test_summary_contents():
+    """
+    The summaries hold the outcome of the games.
+    """
+    for summary in run_batch(5, ['always', 'never'], seed=1, workers=1):
+        assert 1 <= summary.rounds <= Config.MAX_ROUND_COUNT
+        assert len(summary.balances) == 2
+        assert len(summary.winners) >= 1
+        # the player who never buys owns nothing.
+        assert summary.properties[1] == ()
+
+
+def test_invalid_player_count():
+    """
+    The batch needs a valid number of players.
+    """
+    with pytest.raises(ValueError):
+        run_batch(1, ['always'], workers=1)
@@ -0,0 +1,103 @@
+"""
+Tests for the board layouts and their definitions.
+"""
+import json
+
+import pytest
+
+from app.Board import Board
+from app.BoardLayout import layout_from_dict, layout_from_bytes, load_layout, standard_layout
+from app.DecisionProvider import AlwaysBuyProvider
+from app.EventSink import NullEventSink
+from app.Game import Game
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+from app.Square import GoSquare, PropertySquare, ChanceSquare
+
+
+def large_definition(square_count: int) -> dict:
+    """
+    A board with a go square, then properties and chance squares in turn.
+    """
+    squares = [{'type': 'go', 'name': 'Go'}]
+    for position in range(2, square_count + 1):
+        if position % 2:
+            squares.append({'type': 'chance', 'name': f'Chance {position}'})
+        else:
+            squares.append({'type': 'property', 'name': f'Street {position}', 'price': 100, 'rent': position})
+    squares[5] = {'type': 'jail', 'name': 'In Jail/Visiting'}
+    return {'squares': squares}
+
+
+def test_standard_layout():
+    """
+    The standard board is read from its definition.
+    """
+    layout = standard_layout()
+    assert layout.square_count == 20
+    assert isinstance(layout.squares[0], GoSquare)
+    assert layout.squares[1].name == 'Central'
+    assert layout.prices[1] == 800
+    assert layout.rents[19] == 25
+    assert standard_layout() is layout
+
+
+def test_invalid_definitions():
+    """
+    The definitions are validated before they are compiled.
+    """
+    with pytest.raises(ValueError):
+        layout_from_dict({'squares': []})
+    with pytest.raises(ValueError):
+        layout_from_dict({'squares': [{'type': 'castle', 'name': 'Castle'}]})
+    with pytest.raises(ValueError):
+        layout_from_dict({'squares': [{'type': 'go'}]})
+    with pytest.raises(ValueError):
+        layout_from_dict({'squares': [{'type': 'property', 'name': 'Central', 'price': -1, 'rent': 10}]})
+    with pytest.raises(ValueError):
+        layout_from_dict({'squares': [{'type': 'property', 'name': 'Central', 'price': 800}]})
+    with pytest.raises(ValueError):
+        layout_from_bytes(b'{not json')
+
+
+def test_layouts_are_cached_by_content(tmp_path):
+    """
+    The same definition is compiled once, whatever file it comes from.
+    """
+    data = json.dumps(large_definition(30)).encode()
+    first = tmp_path / 'first.json'
+    second = tmp_path / 'second.json'
+    first.write_bytes(data)
+    second.write_bytes(data)
+
+    layout = load_layout(first)
+    assert load_layout(second) is layout
+    assert layout.square_count == 30
+
+    # a different definition is compiled on its own
+    second.write_bytes(json.dumps(large_definition(31)).encode())
+    assert load_layout(second) is not layout
+
+
+def test_large_board():
+    """
+    A game is played on a board with thousands of squares.
+    """
+    layout = layout_from_dict(large_definition(5000))
+    board = Board(layout)
+    assert isinstance(board.get_square(4000), PropertySquare)
+    assert isinstance(board.get_square(4001), ChanceSquare)
+    assert board.get_square(5001) is None
+    assert board.get_destination(4999, 5) == 4
+    assert board.get_passed_squares(4999, 5) == [layout.squares[0]]
+
+    rules = RuleSet(max_round_count=30)
+    game = Game(3, event_sink=NullEventSink(), decision_providers=[AlwaysBuyProvider()] * 3,
+                random_streams=RandomStreams(7), rules=rules, board_layout=layout)
+    game.launch_game()
+
+    assert game.is_game_over()
+    for player in game.players:
+        assert 1 <= player.square_position <= 5000
+        for square in player.get_properties():
+            assert square.owner_token == player.token
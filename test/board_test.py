@@ -2,6 +2,8 @@
 Tests for the board class.
 """
 from app.Board import Board
+from app.BoardLayout import BoardLayout, standard_layout
+from app.Square import GoSquare
 
 
 def test_get_square():
@@ -19,3 +21,53 @@ def test_get_square():
     assert s2.name == 'Blue Chance'
     assert s3.name == 'Tai O'
     assert s4 is None
+
+
+def test_pass_through_table():
+    """
+    Tests that the compiled pass through table matches walking the board square by square.
+    """
+    # add a second go square to check the order of the passes
+    squares = list(standard_layout().squares)
+    squares[10] = GoSquare(name='Go Again', position=11)
+    board = Board(BoardLayout(squares))
+
+    for position in range(1, 21):
+        for steps in range(1, 50):
+            walked = [board.get_square((position - 1 + i) % 20 + 1) for i in range(1, steps)]
+            expected = [square for square in walked if isinstance(square, GoSquare)]
+            assert board.get_passed_squares(position, steps) == expected
+            assert board.get_destination(position, steps) == (position - 1 + steps) % 20 + 1
+
+
+def test_pass_through_squares():
+    """
+    Tests that only the squares which do something when passed through are in the table.
+    """
+    board = Board()
+    assert [square.name for square in board.pass_through_squares] == ['Go']
+
+
+def test_squares_are_slotted():
+    """
+    Tests that the squares keep their state in slots, without a dictionary per square.
+    """
+    board = Board()
+    for square in board.squares:
+        assert not hasattr(square, '__dict__')
+
+
+def test_layout_is_shared():
+    """
+    Tests that the boards share their layout but not their owners.
+    """
+    board1 = Board()
+    board2 = Board()
+    assert board1.layout is board2.layout
+    assert board1.get_square(1) is board2.get_square(1)
+
+    board1.get_square(2).owner_token = 'Player 1'
+    assert board1.get_square(2).owner_token == 'Player 1'
+    assert board2.get_square(2).owner_token is None
+    # the property squares of a board are bound once
+    assert board1.get_square(2) is board1.get_square(2)
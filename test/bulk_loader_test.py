@@ -0,0 +1,136 @@
+"""
+Tests for the parallel loading of saved games.
+"""
+import json
+
+import pytest
+
+from app.BoardLayout import standard_layout
+from app.BulkLoader import iter_saves, load_saves, SaveRecord
+from app.DecisionProvider import AlwaysBuyProvider
+from app.EventSink import NullEventSink
+from app.Game import Game
+from app.GameCodec import compress_save, encode_game, encode_json, validate_game_dict
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+
+
+def played_game(seed: int) -> Game:
+    game = Game(3, event_sink=NullEventSink(), decision_providers=[AlwaysBuyProvider()] * 3,
+                random_streams=RandomStreams(seed), rules=RuleSet())
+    for _ in range(seed % 30):
+        game.play_turn(game.get_player_by_id(game.current_player_id))
+    return game
+
+
+def write_saves(directory, count: int):
+    """
+    Write saves in every format.
+    :return: Their paths and games.
+    """
+    paths, games = [], []
+    for index in range(count):
+        game = played_game(index)
+        encoders = [encode_game, encode_json, lambda game: compress_save(encode_game(game))]
+        path = directory / f'game_{index}.save'
+        path.write_bytes(encoders[index % 3](game))
+        paths.append(path)
+        games.append(game)
+    return paths, games
+
+
+def test_records(tmp_path):
+    """
+    Saves of every format are loaded as records, in the order of their paths, with or without processes.
+    """
+    paths, games = write_saves(tmp_path, 40)
+    for workers in (1, 2):
+        results = load_saves(paths, workers=workers, chunk_size=3, max_chunks=2)
+        assert [result.path for result in results] == paths
+        for result, game in zip(results, games):
+            assert result.error is None
+            assert isinstance(result.value, SaveRecord)
+            assert result.value.balances == tuple(player.balance for player in game.players)
+            assert result.value.properties == tuple(tuple(player_dict['properties'])
+                                                    for player_dict in game.to_dict()['players'])
+            assert result.value.current_round == game.current_round
+
+
+def test_games(tmp_path):
+    """
+    The games themselves are created on demand.
+    """
+    paths, games = write_saves(tmp_path, 7)
+    results = iter_saves(paths, games=True, workers=2, chunk_size=2, event_sink=NullEventSink(), rules=RuleSet())
+    for result, game in zip(results, games):
+        assert result.value.to_dict() == game.to_dict()
+
+    # a save which cannot be created with the options is reported, and the others still created
+    two_players = tmp_path / 'two_players.msav'
+    two_players.write_bytes(encode_game(Game(2, event_sink=NullEventSink(), rules=RuleSet())))
+    results = load_saves(paths[:2] + [two_players] + paths[2:], games=True, workers=1, chunk_size=2,
+                         event_sink=NullEventSink(), rules=RuleSet(), decision_providers=[AlwaysBuyProvider()] * 3)
+    assert [result.error is None for result in results] == [True, True, False] + [True] * 5
+    assert results[2].value is None and 'decision providers' in results[2].error
+
+
+def test_rejected_saves(tmp_path):
+    """
+    Bad saves are reported, and the others still loaded.
+    """
+    paths, _ = write_saves(tmp_path, 3)
+    game_dict = played_game(20).to_dict()
+    game_dict['players'][1]['properties'].append(1)
+    (tmp_path / 'not_a_property.json').write_text(json.dumps(game_dict))
+    (tmp_path / 'garbage.json').write_bytes(b'\xff\x00 not a save')
+    (tmp_path / 'broken.msavz').write_bytes(b'MSAZ broken')
+    bad = [tmp_path / 'not_a_property.json', tmp_path / 'missing.json', tmp_path / 'garbage.json',
+           tmp_path / 'broken.msavz']
+
+    results = load_saves(paths[:1] + bad + paths[1:], workers=1, chunk_size=2)
+    assert [result.error is None for result in results] == [True, False, False, False, False, True, True]
+    assert 'not a property' in results[1].error
+    assert results[2].error.startswith('FileNotFoundError')
+    assert all(result.value is None for result in results[1:5])
+
+
+def test_corrupt_binary_save(tmp_path):
+    """
+    A binary save with an owner out of range is rejected, in and out of process, and the others are loaded.
+    """
+    paths, _ = write_saves(tmp_path, 6)
+    data = encode_game(played_game(12))
+    corrupt = tmp_path / 'corrupt.msav'
+    corrupt.write_bytes(data[:-1] + b'\x09')
+    for workers in (1, 2):
+        results = load_saves(paths[:3] + [corrupt] + paths[3:], workers=workers, chunk_size=4)
+        assert [result.error is None for result in results] == [True, True, True, False, True, True, True]
+        assert results[3].value is None
+        assert 'owner' in results[3].error
+
+
+def test_validate_game_dict():
+    """
+    Every field of a save is checked.
+    """
+    is_property = standard_layout().is_property
+    valid = played_game(25).to_dict()
+    validate_game_dict(valid, is_property)
+
+    changes = [
+        lambda game_dict: game_dict.pop('current_round'),
+        lambda game_dict: game_dict.update(current_player_id=3),
+        lambda game_dict: game_dict.update(players=[]),
+        lambda game_dict: game_dict['players'][0].update(balance='1500'),
+        lambda game_dict: game_dict['players'][0].update(is_jailed=0),
+        lambda game_dict: game_dict['players'][0].update(balance=True),
+        lambda game_dict: game_dict['players'][1].update(token='Player 1'),
+        lambda game_dict: game_dict['players'][1].update(player_id=2),
+        lambda game_dict: game_dict['players'][2].update(square_position=41),
+        lambda game_dict: game_dict['players'][2].update(properties=[2, 2]),
+    ]
+    for change in changes:
+        game_dict = json.loads(json.dumps(valid))
+        change(game_dict)
+        with pytest.raises(ValueError):
+            validate_game_dict(game_dict, is_property)
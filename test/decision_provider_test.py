@@ -0,0 +1,115 @@
+"""
+Tests for the decision providers.
+"""
+from random import Random
+
+import pytest
+
+from app.DecisionProvider import AlwaysBuyProvider, NeverBuyProvider, ThresholdBuyProvider, \
+    RandomDecisionProvider, ConsoleDecisionProvider, JailStrategy, AnswerProbe, ForcedDecision, JAIL_STRATEGY
+from app.EventSink import NullEventSink
+from app.Game import Game
+
+
+def test_always_and_never_buy():
+    """
+    Each player decides with their own provider.
+    """
+    game = Game(2, event_sink=NullEventSink(), decision_providers=[AlwaysBuyProvider(), NeverBuyProvider()])
+    buyer, other = game.players
+    game.board.get_square(2).land_on(other)
+    assert game.board.get_square(2).owner_token is None
+
+    game.board.get_square(2).land_on(buyer)
+    assert game.board.get_square(2).owner_token == buyer.token
+
+
+def test_threshold_buy():
+    """
+    The threshold bot only buys when it keeps its reserve.
+    """
+    game = Game(2, event_sink=NullEventSink(), decision_providers=[ThresholdBuyProvider(reserve=800)] * 2)
+    player = game.players[0]
+    central = game.board.get_square(2)  # price 800
+    shek_o = game.board.get_square(7)  # price 400
+
+    central.land_on(player)
+    assert central.owner_token is None
+
+    shek_o.land_on(player)
+    assert shek_o.owner_token == player.token
+    assert player.balance == 1100
+
+
+def test_bot_jail_decisions():
+    """
+    The bots pick their configured jail strategy and bail payment.
+    """
+    provider = NeverBuyProvider(jail_strategy=JailStrategy.BAIL, pay_bail_now=False)
+    game = Game(2, event_sink=NullEventSink(), decision_providers=[provider, NeverBuyProvider()])
+    player = game.players[0]
+    game.board.get_square(16).land_on(player)
+
+    player.play()
+
+    assert player.jail_bail_mode
+    assert player.is_jailed
+    assert player.balance == 1500
+
+
+def test_random_provider_is_reproducible():
+    """
+    Two random providers with the same seed make the same decisions.
+    """
+    game = Game(2, event_sink=NullEventSink())
+    player = game.players[0]
+    square = game.board.get_square(2)
+    a = RandomDecisionProvider(rng=Random(7))
+    b = RandomDecisionProvider(rng=Random(7))
+    assert [a.should_buy(player, square) for _ in range(20)] == [b.should_buy(player, square) for _ in range(20)]
+    assert a.select_jail_strategy(player) == b.select_jail_strategy(player)
+
+
+def test_console_provider(monkeypatch):
+    """
+    The console provider reads answers from the user and falls back on invalid input.
+    """
+    answers = iter(['1', 'x', '2'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+
+    game = Game(2, event_sink=NullEventSink())
+    player = game.players[0]
+    provider = ConsoleDecisionProvider()
+
+    assert provider.should_buy(player, game.board.get_square(2))
+    assert provider.select_jail_strategy(player) == JailStrategy.BAIL
+    assert provider.should_save_and_exit(player)
+
+
+def test_provider_count_must_match():
+    """
+    One provider is needed for every player.
+    """
+    with pytest.raises(ValueError):
+        Game(3, decision_providers=[AlwaysBuyProvider()])
+
+
+def test_choice_providers():
+    """
+    The providers of the searching bots offer the answer of the rollout bot first, then the other one.
+    """
+    game = Game(2, event_sink=NullEventSink(), decision_providers=[AlwaysBuyProvider()] * 2)
+    player = game.players[0]
+    square = game.board.get_square(2)
+
+    probe = AnswerProbe(AlwaysBuyProvider(jail_strategy=JailStrategy.FEELING_LUCKY))
+    probe.start((False,))
+    assert not probe.should_buy(player, square)
+    assert probe.select_jail_strategy(player) == JailStrategy.FEELING_LUCKY
+    assert probe.answers == [False, JailStrategy.FEELING_LUCKY]
+    assert probe.options == [(True, False), (JailStrategy.FEELING_LUCKY, JailStrategy.BAIL)]
+
+    forced = ForcedDecision(NeverBuyProvider(pay_bail_now=False), JAIL_STRATEGY, JailStrategy.FEELING_LUCKY)
+    assert forced.select_jail_strategy(player) == JailStrategy.FEELING_LUCKY
+    assert not forced.should_buy(player, square)
+    assert not forced.should_pay_bail_now(player)
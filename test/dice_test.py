@@ -0,0 +1,128 @@
+"""
+Tests for the generalized dice.
+"""
+from random import Random
+
+import pytest
+
+from app.Dice import Dice
+
+
+def test_two_four_sided_dice():
+    """
+    The distributions of the standard dice are exact.
+    """
+    dice = Dice([[1, 2, 3, 4], [1, 2, 3, 4]])
+
+    assert {total: round(p * 16, 9) for total, p in dice.sum_distribution.items()} == {
+        2: 1, 3: 2, 4: 3, 5: 4, 6: 3, 7: 2, 8: 1
+    }
+    assert dice.double_probability == pytest.approx(0.25)
+    assert sum(p for p, _, _ in dice.total_distribution()) == pytest.approx(1)
+
+
+def test_weighted_dice():
+    """
+    Weights change the distributions, and zero weight faces never show up.
+    """
+    dice = Dice([[1, 2], [1, 2], [1, 2]], weights=[[3, 1], [1, 0], [1, 1]], rng=Random(1), buffer_size=64)
+
+    assert dice.double_probability == pytest.approx(0.75 * 1 * 0.5)
+    assert dice.sum_distribution[6] == 0
+
+    for _ in range(500):
+        dice.roll()
+        assert dice.get_values()[1] == 1
+        assert dice.get_total_value() == sum(dice.get_values())
+        assert dice.is_double() == (len(set(dice.get_values())) == 1)
+
+
+def test_sampling_matches_distribution():
+    """
+    The alias table samples the outcomes with their probabilities.
+    """
+    dice = Dice([[1, 2, 3, 4, 5, 6]], weights=[[1, 2, 3, 4, 5, 6]], rng=Random(7))
+    rolls = 60000
+    counts = {}
+    for _ in range(rolls):
+        dice.roll()
+        total = dice.get_total_value()
+        counts[total] = counts.get(total, 0) + 1
+
+    for total, probability in dice.sum_distribution.items():
+        assert counts[total] / rolls == pytest.approx(probability, abs=0.01)
+
+
+def test_rolls_are_reproducible():
+    """
+    The same generator gives the same rolls.
+    """
+    a = Dice([[1, 2, 3, 4], [1, 2, 3, 4]], rng=Random(3), buffer_size=10)
+    b = Dice([[1, 2, 3, 4], [1, 2, 3, 4]], rng=Random(3), buffer_size=10)
+    assert [a.roll() for _ in range(35)] == [b.roll() for _ in range(35)]
+
+
+class CountingRandom(Random):
+    """
+    Counts the numbers it generates.
+    """
+
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.count = 0
+
+    def random(self):
+        self.count += 1
+        return super().random()
+
+
+def test_batches_grow():
+    """
+    Dice which roll a few times only generate a few rolls, and a copy starts again with a small batch.
+    """
+    rng = CountingRandom(4)
+    dice = Dice([range(1, 7)] * 2, rng=rng, buffer_size=4096)
+    dice.roll()
+    assert rng.count == 2 * 16
+    for _ in range(16):
+        dice.roll()
+    assert rng.count == 2 * (16 + 32)
+
+    # the size of the next batch is restored with the pending rolls
+    snapshot, state = dice.snapshot(), rng.getstate()
+    expected = [dice.roll() for _ in range(100)]
+    dice.restore(snapshot)
+    rng.setstate(state)
+    assert [dice.roll() for _ in range(100)] == expected
+
+    copy_rng = CountingRandom(5)
+    copy = dice.copy(copy_rng)
+    assert copy_rng.count == 0
+    copy.roll()
+    assert copy_rng.count == 2 * 16
+
+
+def test_invalid_dice():
+    """
+    Every die needs faces, every face a weight, and every die a face which can be rolled.
+    """
+    with pytest.raises(ValueError):
+        Dice([[]])
+    with pytest.raises(ValueError):
+        Dice([[1, 2]], weights=[[1]])
+    with pytest.raises(ValueError):
+        Dice([[1, 2], [1, 2]], weights=[[1, 1], [0, 0]])
+    with pytest.raises(ValueError):
+        Dice([[1, 2]], weights=[[2, -1]])
+
+
+def test_many_dice():
+    """
+    The distribution of many dice is found without enumerating their joint outcomes.
+    """
+    dice = Dice([range(1, 7)] * 20)
+
+    assert len(dice.sum_distribution) == 101
+    assert sum(dice.sum_distribution.values()) == pytest.approx(1)
+    assert dice.double_probability == pytest.approx(6 / 6 ** 20)
+    assert sum(probability for probability, _, _ in dice.total_distribution()) == pytest.approx(1)
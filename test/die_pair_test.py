@@ -59,3 +59,18 @@ def test_is_double():
 
     # checks the value of both the dices.
     assert die_pair.get_results() == 'Die 1: 2, Die 2: 2'
+
+
+def test_pool_change():
+    """
+    Changing the pool of a die is taken into account by the next roll.
+    """
+    die_pair = DiePair()
+    die_pair.die1.die_pool = [3]
+    die_pair.die2.die_pool = [3]
+    die_pair.roll_pair()
+    assert die_pair.get_total_value() == 6
+
+    die_pair.die2.die_pool = [4]
+    die_pair.roll_pair()
+    assert die_pair.get_results() == 'Die 1: 3, Die 2: 4'
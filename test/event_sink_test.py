@@ -0,0 +1,67 @@
+"""
+Tests for the event sinks.
+"""
+import io
+import json
+
+from app.Config import Config
+from app.Event import DiceRolled, RentPaid
+from app.EventSink import NullEventSink, JsonlEventSink
+from app.Game import Game
+
+
+def test_console_sink_renders_events(capsys):
+    """
+    The console sink prints the same text the game has always printed.
+    """
+    game = Game(2)
+    player = game.players[0]
+    game.board.get_square(4).land_on(player)
+
+    captured = capsys.readouterr()
+    assert captured.out == 'Player 1 has landed on: Square 4 (Income Tax)\n' \
+                           'Player 1 has paid a tax of HKD 150!\n' \
+                           'Player 1: My balance is now: HKD 1350\n'
+
+
+def test_null_sink_is_silent(capsys):
+    """
+    A headless game does not print anything while playing.
+    """
+    Config.DEFAULT_JAIL_STRATEGY = '1'
+    Config.DEFAULT_BUY_PROPERTY_CHOICE = '2'
+    Config.DIE_1_VALUE = 4
+    Config.DIE_2_VALUE = 1
+    game = Game(3, event_sink=NullEventSink())
+    game.launch_game()
+
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert game.is_game_over()
+
+
+def test_jsonl_sink_writes_structured_events():
+    """
+    The jsonl sink writes one json object per event.
+    """
+    stream = io.StringIO()
+    game = Game(2, event_sink=JsonlEventSink(stream))
+    player = game.players[0]
+    game.board.get_square(16).land_on(player)
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert records == [
+        {'event': 'square_landed', 'token': 'Player 1', 'position': 16, 'name': 'Go To Jail'},
+        {'event': 'player_jailed', 'token': 'Player 1'},
+    ]
+
+
+def test_event_to_dict():
+    """
+    Events serialize their fields.
+    """
+    assert DiceRolled('Player 1', 2, 3).to_dict() == {
+        'event': 'dice_rolled', 'token': 'Player 1', 'die1': 2, 'die2': 3
+    }
+    assert RentPaid('Player 2', 'Player 1', 90, 'Central').render('HKD') == \
+        'Player 2 has paid HKD 90 in rent for property: Central!'
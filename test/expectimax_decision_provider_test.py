@@ -0,0 +1,76 @@
+"""
+Tests for the expectimax search bot.
+"""
+from app.DecisionProvider import NeverBuyProvider, JailStrategy
+from app.EventSink import NullEventSink
+from app.ExpectimaxDecisionProvider import ExpectimaxDecisionProvider, dice_outcomes
+from app.Game import Game
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+from app.TranspositionTable import TranspositionTable
+
+
+class NoTable(TranspositionTable):
+    """
+    A table which never finds anything.
+    """
+
+    def lookup(self, key, depth):
+        self.misses += 1
+        return None
+
+
+def new_game(bot) -> Game:
+    """
+    A game between the bot and a player who never buys.
+    """
+    return Game(2, event_sink=NullEventSink(), decision_providers=[bot, NeverBuyProvider()],
+                random_streams=RandomStreams(4), rules=RuleSet())
+
+
+def test_dice_outcomes():
+    """
+    The outcomes tell doubles apart and add up to 1.
+    """
+    outcomes = dice_outcomes([1, 2, 3, 4], [1, 2, 3, 4])
+    assert sum(probability for probability, _ in outcomes) == 1.0
+    assert len(outcomes) == 9
+    assert (0.0625, (2, 2)) in outcomes
+    assert (0.125, (1, 3)) in outcomes
+
+
+def test_table_keeps_the_values():
+    """
+    The transposition table saves work without changing the value of any answer.
+    """
+    values = []
+    tables = (NoTable(), TranspositionTable())
+    for table in tables:
+        bot = ExpectimaxDecisionProvider(depth=4, table=table)
+        game = new_game(bot)
+        player = game.players[0]
+        player.square_position = 2
+        snapshot = game.snapshot()
+
+        bot.should_buy(player, game.board.get_square(2))
+        assert game.snapshot() == snapshot
+        values.append(bot.last_values)
+
+    assert values[0] == values[1]
+    assert tables[1].hits > 0
+    # every miss is a turn searched
+    assert tables[1].misses < tables[0].misses
+
+
+def test_jail_decision():
+    """
+    The bot compares both jail strategies.
+    """
+    bot = ExpectimaxDecisionProvider(depth=3)
+    game = new_game(bot)
+    player = game.players[0]
+    player.go_to_jail()
+
+    assert bot.select_jail_strategy(player) in (JailStrategy.FEELING_LUCKY, JailStrategy.BAIL)
+    assert set(bot.last_values) == {JailStrategy.FEELING_LUCKY, JailStrategy.BAIL}
+    assert all(0.0 <= value <= 1.0 for value in bot.last_values.values())
@@ -0,0 +1,147 @@
+"""
+Tests for the binary save format.
+"""
+import json
+
+import pytest
+
+from app.DecisionProvider import AlwaysBuyProvider, JailStrategy
+from app.EventSink import NullEventSink
+from app.Game import Game
+from app.GameCodec import (encode_game, encode_snapshot, decode_game, decode_game_dict, load_game_file, compress_save,
+                           JSON, HEADER, PLAYER)
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+
+
+def played_game(turns: int = 70) -> Game:
+    """
+    A game of 4 players, some jailed, bankrupt or owning properties.
+    """
+    providers = [AlwaysBuyProvider(jail_strategy=JailStrategy.FEELING_LUCKY)] + [AlwaysBuyProvider()] * 3
+    game = Game(4, event_sink=NullEventSink(), decision_providers=providers, random_streams=RandomStreams(8),
+                rules=RuleSet())
+    for _ in range(turns):
+        if game.is_game_over():
+            break
+        player = game.get_player_by_id(game.current_player_id)
+        if player.has_exited:
+            game.end_turn()
+        else:
+            game.play_turn(player)
+    return game
+
+
+def test_round_trip():
+    """
+    A decoded game is in the state of the encoded one, through both decoders.
+    """
+    for turns in (0, 5, 40, 200):
+        game = played_game(turns)
+        data = encode_game(game)
+
+        assert decode_game(data, event_sink=NullEventSink(), rules=RuleSet()).to_dict() == game.to_dict()
+        assert decode_game_dict(data) == game.to_dict()
+        assert len(data) < len(json.dumps(game.to_dict(), indent=4)) / 5
+
+
+def test_encode_snapshot():
+    """
+    A snapshot is encoded like the game it was taken from, even once the game has moved on.
+    """
+    for turns in (0, 40, 200):
+        game = played_game(turns)
+        snapshot = game.snapshot(with_random=False)
+        data = encode_game(game)
+        game.players[0].balance += 1
+        game.board.ownership.set_owner(2, None)
+        assert encode_snapshot(game, snapshot) == data
+
+
+def test_compressed_save(tmp_path):
+    """
+    A compressed save is loaded like the others.
+    """
+    game = played_game()
+    (tmp_path / 'game.msavz').write_bytes(compress_save(encode_game(game)))
+    loaded = load_game_file(tmp_path / 'game.msavz', event_sink=NullEventSink(), rules=RuleSet())
+    assert loaded.to_dict() == game.to_dict()
+
+
+def test_named_players():
+    """
+    Players with other tokens are saved and loaded too.
+    """
+    game_dict = played_game().to_dict()
+    for index, player_dict in enumerate(game_dict['players']):
+        player_dict['token'] = f'Ms. {index}'
+    game = Game(game_dict=game_dict, event_sink=NullEventSink(), rules=RuleSet())
+
+    loaded = decode_game(encode_game(game), event_sink=NullEventSink(), rules=RuleSet())
+    assert loaded.to_dict() == game.to_dict()
+
+
+def test_invalid_saves():
+    """
+    Saves which are not binary saves, truncated or of another version are refused.
+    """
+    data = encode_game(played_game())
+    for broken in (b'', b'{"players": []}', data[:-1], data + b'\x00', data[:4] + b'\x07' + data[5:]):
+        with pytest.raises(ValueError):
+            decode_game(broken)
+
+
+def test_out_of_range_saves():
+    """
+    Saves with an owner, current player, round, player id, position or token out of range are refused,
+    as are the games which own a square which is not a property.
+    """
+    data = encode_game(played_game())
+    first = PLAYER.unpack_from(data, HEADER.size)
+    second_token = HEADER.size + 2 * PLAYER.size + len('Player 1')
+
+    def with_first_player(balance, position, move_count, flags, player_id, token_length, token=b'Player 1'):
+        return data[:HEADER.size] + PLAYER.pack(balance, position, move_count, flags, player_id, token_length) + \
+            token + data[HEADER.size + PLAYER.size + len('Player 1'):]
+
+    broken_saves = [
+        data[:-1] + b'\x04', data[:-1] + b'\xfe',
+        data[:8] + b'\x00\x00\x00\x00' + data[12:],
+        data[:6] + b'\x04' + data[7:],
+        with_first_player(*first[:4], 1, first[5]),
+        with_first_player(first[0], 0, *first[2:]),
+        with_first_player(first[0], 21, *first[2:]),
+        with_first_player(*first[:5], 0, b''),
+        data[:second_token] + b'Player 1' + data[second_token + len('Player 2'):],
+    ]
+    for broken in broken_saves:
+        for decode in (decode_game, decode_game_dict):
+            with pytest.raises(ValueError):
+                decode(broken)
+
+    # the dictionary does not know the board, it is checked when the game is created
+    owned_go = data[:-20] + b'\x00' + data[-19:]
+    with pytest.raises(ValueError):
+        decode_game(owned_go)
+    with pytest.raises(ValueError):
+        decode_game(owned_go.replace(b'Player ', b'Player_'))
+
+
+def test_save_and_load(tmp_path, monkeypatch):
+    """
+    Games are saved in the binary format by default, JSON on demand, and both are loaded.
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'saved_games').mkdir()
+    game = played_game()
+
+    binary_name = game.save_game()
+    json_name = game.save_game(file_format=JSON)
+    assert binary_name.endswith('.msav') and json_name.endswith('.json')
+
+    for name in (binary_name, json_name):
+        loaded = load_game_file(tmp_path / 'saved_games' / name, event_sink=NullEventSink(), rules=RuleSet())
+        assert loaded.to_dict() == game.to_dict()
+
+    with pytest.raises(ValueError):
+        game.save_game(file_format='xml')
@@ -2,6 +2,7 @@ import os
 import json
 
 from app.Game import Game
+from app.Player import Player
 
 """
 Following functions test the Game class.
@@ -99,6 +100,38 @@ def test_get_winners(capsys):
     assert winners[0].token == game.players[0].token
 
 
+def test_active_player_tracking():
+    """
+    Tests that the active players follow the exits and returns of the players.
+    """
+    game = Game(4)
+    p1, p2, p3, p4 = game.players
+    assert game.get_player('Player 3') is p3
+    assert game.get_player('Player 9') is None
+
+    p3.exit_game()
+    p1.has_exited = True
+    assert game.get_active_players() == [p2, p4]
+    assert not game.is_game_over()
+
+    # a player who comes back keeps their seat order
+    p1.has_exited = False
+    assert game.get_active_players() == [p1, p2, p4]
+
+    p1.exit_game()
+    p4.exit_game()
+    assert game.is_game_over()
+
+    # a player outside of the game does not change it
+    stray = Player(game, token='Player 2')
+    stray.has_exited = True
+    assert game.get_active_players() == [p2]
+
+    # the loaded games know who is still playing
+    loaded = Game(game_dict=game.to_dict())
+    assert [player.token for player in loaded.get_active_players()] == ['Player 2']
+
+
 def test_save_game():
     """
     To test whether the game is being saved correctly or not.
@@ -0,0 +1,78 @@
+"""
+Tests for the Markov chain landing model.
+"""
+from app.DecisionProvider import JailStrategy, NeverBuyProvider
+from app.Die import Die
+from app.Event import SquareLanded
+from app.EventSink import EventSink
+from app.Game import Game
+from app.MarkovChain import landing_model
+from app.RandomStreams import RandomStreams
+
+
+class LandingCounter(EventSink):
+    """
+    Counts the landings on every square.
+    """
+
+    def __init__(self):
+        self.landings = [0] * 20
+
+    def emit(self, event):
+        if isinstance(event, SquareLanded):
+            self.landings[event.position - 1] += 1
+
+
+def test_first_turn():
+    """
+    From Go, the first throw lands on squares 3 to 9.
+    """
+    model = landing_model()
+    landing = model.landing_after(1)
+
+    expected = [0, 0, 1, 2, 3, 4, 3, 2, 1] + [0] * 11
+    assert [round(p * 16, 9) for p in landing] == expected
+
+
+def test_stationary_distribution():
+    """
+    The stationary distribution is the limit of the k-step distributions.
+    """
+    for strategy in (JailStrategy.BAIL, JailStrategy.FEELING_LUCKY):
+        model = landing_model(jail_strategy=strategy)
+        assert abs(sum(model.stationary) - 1) < 1e-9
+        late = model.landing_after(500)
+        for a, b in zip(model.stationary_landing, late):
+            assert abs(a - b) < 1e-9
+
+    # a bail player lands on a square every turn, a feeling lucky player may stay in jail.
+    assert abs(sum(landing_model(jail_strategy=JailStrategy.BAIL).stationary_landing) - 1) < 1e-9
+    assert sum(landing_model(jail_strategy=JailStrategy.FEELING_LUCKY).stationary_landing) < 1
+
+
+def test_models_are_cached():
+    """
+    The same board, dice and rules give the same model.
+    """
+    assert landing_model() is landing_model()
+    assert landing_model() is not landing_model(die_pools=([1, 2, 3, 4, 5, 6], [1, 2, 3, 4, 5, 6]))
+
+
+def test_matches_simulation():
+    """
+    The model agrees with a long simulation of a single player.
+    """
+    counter = LandingCounter()
+    game = Game(2, event_sink=counter, decision_providers=[NeverBuyProvider(), NeverBuyProvider()],
+                random_streams=RandomStreams(3))
+    game.die_pair.die1.die_pool = Die.die_pool
+    game.die_pair.die2.die_pool = Die.die_pool
+    player = game.players[0]
+
+    turns = 20000
+    for _ in range(turns):
+        player.play()
+
+    model = landing_model(jail_strategy=JailStrategy.BAIL)
+    for count, probability in zip(counter.landings, model.stationary_landing):
+        assert abs(count / turns - probability) < 0.01
@@ -0,0 +1,135 @@
+"""
+Tests for the Monte Carlo search bot.
+"""
+import time
+from random import Random
+
+import pytest
+
+from app.DecisionProvider import NeverBuyProvider, JailStrategy
+from app.EventSink import NullEventSink
+from app.Game import Game
+from app.MctsDecisionProvider import MctsDecisionProvider, BUY, JAIL_STRATEGY, playout, reward, run_playouts
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+
+
+def new_game(bot) -> Game:
+    """
+    A game between the bot and a player who never buys.
+    """
+    return Game(2, event_sink=NullEventSink(), decision_providers=[bot, NeverBuyProvider()],
+                random_streams=RandomStreams(4), rules=RuleSet())
+
+
+def test_buy_decision_keeps_the_game():
+    """
+    Searching does not change the game, and every playout is counted.
+    """
+    bot = MctsDecisionProvider(iterations=24, horizon=5, rng=Random(1))
+    game = new_game(bot)
+    player = game.players[0]
+    player.square_position = 2
+    snapshot = game.snapshot()
+
+    answer = bot.should_buy(player, game.board.get_square(2))
+
+    assert answer in (True, False)
+    assert game.snapshot() == snapshot
+    assert sum(count for count, _ in bot.last_statistics.values()) == 24
+
+
+def test_jail_decision():
+    """
+    The bot selects a jail strategy for a jailed player.
+    """
+    bot = MctsDecisionProvider(iterations=10, horizon=3, rng=Random(2))
+    game = new_game(bot)
+    player = game.players[0]
+    player.go_to_jail()
+
+    player.select_jail_strategy()
+    assert player.jail_feeling_lucky_mode or player.jail_bail_mode
+    assert set(bot.last_statistics) == {JailStrategy.FEELING_LUCKY, JailStrategy.BAIL}
+
+
+def test_playout_applies_the_answer():
+    """
+    A playout of a buy decision starts with the purchase.
+    """
+    game = new_game(NeverBuyProvider())
+    player = game.players[0]
+    player.square_position = 2
+
+    clone = game.clone(decision_providers=[NeverBuyProvider()] * 2, random_streams=RandomStreams(1))
+    result = playout(clone, 0, BUY, True, horizon=0)
+    assert clone.board.get_square(2).owner_token == player.token
+    assert result == reward(clone, 0)
+    assert 0.0 <= result <= 1.0
+
+    clone = game.clone(decision_providers=[NeverBuyProvider()] * 2, random_streams=RandomStreams(1))
+    playout(clone, 0, JAIL_STRATEGY, JailStrategy.BAIL, horizon=0)
+    assert game.board.get_square(2).owner_token is None
+
+
+def test_deadline():
+    """
+    The bot answers by its deadline, in and out of process.
+    """
+    for workers in (1, 2):
+        bot = MctsDecisionProvider(iterations=100000, time_limit=0.2, horizon=None, workers=workers, batch_size=4,
+                                   rng=Random(3))
+        game = new_game(bot)
+        player = game.players[0]
+        player.square_position = 2
+
+        start = time.monotonic()
+        answer = bot.should_buy(player, game.board.get_square(2))
+        bot.close()
+
+        assert answer in (True, False)
+        assert time.monotonic() - start < 2.0
+
+
+def test_time_limit_only():
+    """
+    Without a number of iterations, the bot plays out until its deadline.
+    """
+    for workers in (1, 2):
+        bot = MctsDecisionProvider(iterations=0, time_limit=0.3, horizon=2, workers=workers, batch_size=4,
+                                   rng=Random(5))
+        game = new_game(bot)
+        player = game.players[0]
+        player.square_position = 2
+
+        start = time.monotonic()
+        bot.should_buy(player, game.board.get_square(2))
+        elapsed = time.monotonic() - start
+        bot.close()
+
+        assert 0.3 <= elapsed < 2.0
+        assert sum(count for count, _ in bot.last_statistics.values()) > 0
+
+
+def test_invalid_search():
+    """
+    A search needs a number of iterations or a time limit.
+    """
+    with pytest.raises(ValueError):
+        MctsDecisionProvider(iterations=0)
+    with pytest.raises(ValueError):
+        MctsDecisionProvider(iterations=-1, time_limit=1.0)
+
+
+def test_batch_reuses_one_clone():
+    """
+    The playouts of a batch give the same rewards as playouts from fresh clones, and none starts after the deadline.
+    """
+    game = new_game(NeverBuyProvider())
+    player = game.players[0]
+    player.square_position = 2
+    seeds = [11, 12, 13, 14]
+
+    expected = [playout(game.clone(random_streams=RandomStreams(seed)), 0, BUY, True, horizon=4) for seed in seeds]
+    assert run_playouts(game, 0, BUY, True, 4, seeds) == expected
+    assert run_playouts(game, 0, BUY, True, 4, seeds, deadline=time.monotonic() - 1) == []
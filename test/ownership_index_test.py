@@ -0,0 +1,78 @@
+"""
+Tests for the ownership index.
+"""
+from app.Board import Board
+from app.Game import Game
+from app.OwnershipIndex import OwnershipIndex
+from app.Square import PropertySquare
+
+
+def test_set_owner():
+    """
+    Tests that owners, bitmasks and counts follow the changes of ownership.
+    """
+    index = OwnershipIndex(20)
+    index.set_owner(2, 'Player 1')
+    index.set_owner(7, 'Player 1')
+    index.set_owner(20, 'Player 2')
+
+    assert index.get_owner(2) == 'Player 1'
+    assert index.get_owner(3) is None
+    assert index.get_positions('Player 1') == [2, 7]
+    assert index.get_mask('Player 1') == (1 << 1) | (1 << 6)
+    assert index.count('Player 2') == 1
+    assert index.count('Player 3') == 0
+    assert index.count_owned() == 3
+
+    # the square changes hands
+    index.set_owner(7, 'Player 2')
+    assert index.get_positions('Player 1') == [2]
+    assert index.get_positions('Player 2') == [7, 20]
+
+    index.set_owner(2, None)
+    assert index.get_owner(2) is None
+    assert index.get_positions('Player 1') == []
+
+
+def test_board_squares_share_the_index():
+    """
+    Tests that the property squares of a board keep their owners in the index of the board.
+    """
+    board = Board()
+    central = board.get_square(2)
+    central.owner_token = 'Player 1'
+
+    assert board.ownership.get_positions('Player 1') == [2]
+
+    # a standalone square keeps its owner in its own index
+    square = PropertySquare(price=100, rent=10, position=3, name='Test', owner_token='Player 2')
+    assert square.owner_token == 'Player 2'
+    assert board.ownership.get_owner(3) is None
+
+    # a bound square shares the index of the board
+    bound = square.bind(board.ownership)
+    bound.owner_token = 'Player 3'
+    assert board.get_square(3).owner_token == 'Player 3'
+    assert square.owner_token == 'Player 2'
+
+
+def test_player_portfolio():
+    """
+    Tests that buying, exiting and loading keep the portfolio of the players in sync.
+    """
+    game = Game(player_count=2)
+    player = game.players[0]
+    player.buy_property(game.board.get_square(2))
+    player.buy_property(game.board.get_square(18))
+
+    assert [p.position for p in player.get_properties()] == [2, 18]
+    assert player.get_property_count() == 2
+    assert player.to_dict()['properties'] == [2, 18]
+
+    loaded = Game(game_dict=game.to_dict())
+    assert loaded.board.get_square(18).owner_token == player.token
+    assert loaded.players[0].get_property_count() == 2
+
+    player.exit_game()
+    assert player.get_property_count() == 0
+    assert game.board.get_square(2).owner_token is None
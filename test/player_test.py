@@ -1,6 +1,8 @@
 """
 Player test cases
 """
+import pytest
+
 from app.Config import Config
 from app.Game import Game
 from app.Player import Player
@@ -221,3 +223,14 @@ def test_to_dict():
     player.buy_property(game.board.get_square(3))
     player.balance = 10000
     assert player.to_dict() == expected_dict
+
+
+def test_player_is_slotted():
+    """
+    Tests that the players keep their state in slots, without a dictionary per player.
+    """
+    game = Game(2)
+    player = game.players[0]
+    assert not hasattr(player, '__dict__')
+    with pytest.raises(AttributeError):
+        player.unknown_attribute = 1
@@ -0,0 +1,52 @@
+"""
+Tests for the offline solver of the policy tables.
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from app.PolicySolver import PolicySolver, solve_policy
+from app.RuleSet import RuleSet
+
+
+def test_split_keeps_the_balance():
+    """
+    A balance is split between its two nearest buckets, keeping its expected value.
+    """
+    solver = PolicySolver(bucket_width=500, bucket_count=4)
+    assert solver.split(-10) == [(0, 1.0)]
+    assert solver.split(100000) == [(3, 1.0)]
+
+    splits = solver.split(1000)
+    assert sum(weight for _, weight in splits) == pytest.approx(1.0)
+    assert sum(solver.bucket_value(bucket) * weight for bucket, weight in splits) == pytest.approx(1000)
+
+
+def test_buy_decisions():
+    """
+    A property which the player cannot afford is never bought, and properties are bought in a long game.
+    """
+    table = solve_policy(bucket_width=1000, bucket_count=4, expected_turns=400)
+
+    # the first bucket stands for a balance of 500, below the price of Central
+    assert not table.should_buy(2, 0, 0, 0)
+    assert any(table.should_buy(position, 3000, 0, 0) for position in range(1, 21))
+
+
+def test_shorter_games_buy_less():
+    """
+    Properties pay for themselves over many turns, so a shorter game never buys more.
+    """
+    def buy_count(expected_turns):
+        table = solve_policy(rules=RuleSet(), bucket_width=1000, bucket_count=4, expected_turns=expected_turns)
+        return sum(bin(byte).count('1') for byte in table.buy)
+
+    assert buy_count(20) <= buy_count(400)
+
+
+def test_discount_from_rules():
+    """
+    The game lasts the number of rounds of the rules, unless told otherwise.
+    """
+    assert PolicySolver(rules=RuleSet(max_round_count=40)).discount == pytest.approx(1 - 1 / 40)
+    assert PolicySolver(rules=RuleSet(max_round_count=40), expected_turns=10).discount == pytest.approx(0.9)
@@ -0,0 +1,85 @@
+"""
+Tests for the policy tables and the bot which plays them.
+"""
+import pytest
+
+from app.DecisionProvider import JailStrategy, NeverBuyProvider
+from app.EventSink import NullEventSink
+from app.Game import Game
+from app.PolicyTable import PolicyTable, PolicyTableProvider, standard_policy
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+
+
+def test_lookup():
+    """
+    Decisions are set and read by position, balance bucket and property counts.
+    """
+    table = PolicyTable(20, 12, 500, 4, 1)
+    table.set_buy(2, 1, 0, 3, True)
+    table.set_feeling_lucky(3, 2, 2, True)
+
+    assert table.should_buy(2, 500, 0, 3)
+    assert table.should_buy(2, 999, 0, 3)
+    assert not table.should_buy(2, 1000, 0, 3)
+    assert not table.should_buy(3, 500, 0, 3)
+    assert not table.should_buy(2, 500, 3, 0)
+
+    # the last bucket holds all the higher balances, the first one the negative balances
+    assert table.is_feeling_lucky(100000, 2, 2)
+    assert not table.is_feeling_lucky(-100, 2, 2)
+
+    with pytest.raises(ValueError):
+        table.should_buy(21, 500, 0, 0)
+    with pytest.raises(ValueError):
+        table.should_buy(2, 500, 7, 6)
+
+
+def test_round_trip(tmp_path):
+    """
+    A saved table is loaded with the same decisions, and broken files are refused.
+    """
+    table = PolicyTable(20, 12, 500, 4, 2)
+    table.set_buy(20, 3, 12, 0, True)
+    table.set_feeling_lucky(0, 0, 0, True)
+    path = tmp_path / 'test.table'
+    table.save(path)
+
+    loaded = PolicyTable.load(path)
+    assert loaded.opponent_count == 2
+    assert loaded.buy == table.buy
+    assert loaded.feeling_lucky == table.feeling_lucky
+
+    data = table.to_bytes()
+    with pytest.raises(ValueError):
+        PolicyTable.from_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        PolicyTable.from_bytes(b'XXXX' + data[4:])
+
+
+def test_provider_plays_a_game():
+    """
+    The bot of the standard table plays a whole game, and answers from the table.
+    """
+    table = standard_policy()
+    assert table.square_count == 20 and table.property_count == 12
+
+    bot = PolicyTableProvider()
+    game = Game(2, event_sink=NullEventSink(), decision_providers=[bot, NeverBuyProvider()],
+                random_streams=RandomStreams(5), rules=RuleSet())
+    player = game.players[0]
+    assert bot.should_buy(player, game.board.get_square(2)) == table.should_buy(2, player.balance, 0, 0)
+    strategy = JailStrategy.FEELING_LUCKY if table.is_feeling_lucky(player.balance, 0, 0) else JailStrategy.BAIL
+    assert bot.select_jail_strategy(player) == strategy
+
+    game.launch_game()
+    assert game.is_game_over()
+
+
+def test_standard_table_buys():
+    """
+    The standard table is computed for four players, and buys some properties.
+    """
+    table = standard_policy()
+    assert table.opponent_count == 3
+    assert any(table.buy)
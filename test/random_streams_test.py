@@ -0,0 +1,65 @@
+"""
+Tests for the per-game random streams.
+"""
+from app.BatchRunner import summarize
+from app.Config import Config
+from app.DecisionProvider import AlwaysBuyProvider
+from app.EventSink import NullEventSink
+from app.Game import Game
+from app.RandomStreams import RandomStreams, derive_seed
+
+
+def play(seed: int, game_index: int):
+    """
+    Play a full game with real dice and summarize it.
+    """
+    Config.IS_TEST_ENVIRONMENT = False
+    try:
+        game = Game(3, event_sink=NullEventSink(), decision_providers=[AlwaysBuyProvider()] * 3,
+                    random_streams=RandomStreams(seed, game_index))
+    finally:
+        Config.IS_TEST_ENVIRONMENT = True
+    game.launch_game()
+    return summarize(game, game_index, seed)
+
+
+def test_game_is_reproducible():
+    """
+    A game is fully determined by its seed and index.
+    """
+    assert play(1, 4) == play(1, 4)
+    assert play(1, 4).balances != play(1, 5).balances
+
+
+def test_streams_are_independent():
+    """
+    The dice and chance streams differ, and are the same for the same seed.
+    """
+    a = RandomStreams(9, 2)
+    b = RandomStreams(9, 2)
+    dice = [a.dice.random() for _ in range(5)]
+    assert dice == [b.dice.random() for _ in range(5)]
+    assert dice != [a.chance.random() for _ in range(5)]
+
+    # drawing from chance does not move the dice stream.
+    c = RandomStreams(9, 2)
+    c.chance.random()
+    assert [c.dice.random() for _ in range(5)] == dice
+
+
+def test_spawn():
+    """
+    Spawned children are reproducible and independent of each other.
+    """
+    streams = RandomStreams(9)
+    assert streams.spawn(0).dice.random() == RandomStreams(9).spawn(0).dice.random()
+    assert streams.spawn(0).dice.random() != streams.spawn(1).dice.random()
+    assert derive_seed(1, 2) != derive_seed(2, 1)
+
+
+def test_unseeded_streams_record_their_seed():
+    """
+    An unseeded game can be replayed from the seed it picked.
+    """
+    streams = RandomStreams()
+    assert streams.dice.random() == RandomStreams(streams.seed).dice.random()
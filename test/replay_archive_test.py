@@ -0,0 +1,126 @@
+"""
+Tests for the recorded games.
+"""
+import pytest
+
+from app.DecisionProvider import AlwaysBuyProvider, JailStrategy
+from app.EventSink import NullEventSink
+from app.Game import Game
+from app.GameCodec import NO_OWNER
+from app.RandomStreams import RandomStreams
+from app.ReplayArchive import ReplayRecorder, ReplayReader, TRAILER
+from app.RuleSet import RuleSet
+
+
+def new_game(seed: int = 6) -> Game:
+    providers = [AlwaysBuyProvider(jail_strategy=JailStrategy.FEELING_LUCKY)] + [AlwaysBuyProvider()] * 3
+    return Game(4, event_sink=NullEventSink(), decision_providers=providers, random_streams=RandomStreams(seed),
+                rules=RuleSet())
+
+
+def record(path, turns: int, keyframe_interval: int = 10):
+    """
+    Record a game.
+    :return: The state of the game after every turn, and the recorder.
+    """
+    game = new_game()
+    recorder = ReplayRecorder(path, game, keyframe_interval=keyframe_interval)
+    states = [game.to_dict()]
+    while len(states) <= turns and not game.is_game_over():
+        player = game.get_player_by_id(game.current_player_id)
+        if player.has_exited:
+            game.end_turn()
+            continue
+        game.play_turn(player)
+        states.append(game.to_dict())
+    return states, recorder
+
+
+def test_seek(tmp_path):
+    """
+    Every turn is found again, from the nearest keyframe.
+    """
+    states, recorder = record(tmp_path / 'game.mrpl', 95)
+    recorder.close()
+
+    with ReplayReader(tmp_path / 'game.mrpl') as reader:
+        assert reader.last_turn == 95
+        assert list(reader.keyframe_turns) == list(range(0, 95, 10))
+        for turn in (0, 1, 9, 10, 11, 50, 94, 95):
+            assert reader.seek(turn, event_sink=NullEventSink(), rules=RuleSet()).to_dict() == states[turn]
+        with pytest.raises(ValueError):
+            reader.seek(96)
+
+
+def test_replay_range(tmp_path):
+    """
+    A range of turns is streamed into a single game.
+    """
+    states, recorder = record(tmp_path / 'game.mrpl', 60)
+    recorder.close()
+
+    with ReplayReader(tmp_path / 'game.mrpl') as reader:
+        streamed = [(turn, game.to_dict()) for turn, game in reader.replay(17, 42, event_sink=NullEventSink(),
+                                                                            rules=RuleSet())]
+        assert streamed == [(turn, states[turn]) for turn in range(17, 42)]
+        assert [turn for turn, _ in reader.replay(55)] == list(range(55, 61))
+
+
+def test_records(tmp_path):
+    """
+    The records of a range of turns say who moved, paid and bought.
+    """
+    states, recorder = record(tmp_path / 'game.mrpl', 40)
+    recorder.close()
+
+    with ReplayReader(tmp_path / 'game.mrpl') as reader:
+        turn_records = list(reader.records(5, 30))
+        assert [turn_record.turn for turn_record in turn_records] == list(range(5, 30))
+        for turn_record in turn_records:
+            state = states[turn_record.turn]
+            assert (turn_record.current_round, turn_record.current_player_id) == \
+                (state['current_round'], state['current_player_id'])
+            die1, die2 = turn_record.dice
+            assert 2 <= die1 + die2 <= 12
+            for seat, balance, position, _, _ in turn_record.players:
+                assert state['players'][seat]['balance'] == balance
+                assert state['players'][seat]['square_position'] == position
+            for position, seat in turn_record.squares:
+                owners = [player['properties'] for player in state['players']]
+                if seat == NO_OWNER:
+                    assert all(position not in properties for properties in owners)
+                else:
+                    assert position in owners[seat]
+
+
+def test_unclosed_replay(tmp_path):
+    """
+    A replay which was not closed is read up to its last whole block.
+    """
+    states, recorder = record(tmp_path / 'game.mrpl', 35)
+    recorder._ReplayRecorder__file.flush()
+    data = (tmp_path / 'game.mrpl').read_bytes()
+    (tmp_path / 'game.mrpl').write_bytes(data[:-3])
+
+    with ReplayReader(tmp_path / 'game.mrpl') as reader:
+        assert reader.last_turn == 34
+        assert list(reader.keyframe_turns) == [0, 10, 20, 30]
+        assert reader.seek(34, event_sink=NullEventSink(), rules=RuleSet()).to_dict() == states[34]
+
+    (tmp_path / 'other.mrpl').write_bytes(bytes(TRAILER.size))
+    with pytest.raises(ValueError):
+        ReplayReader(tmp_path / 'other.mrpl')
+
+
+def test_launch_game(tmp_path):
+    """
+    A game played to the end is recorded, and the replay is closed.
+    """
+    game = new_game()
+    ReplayRecorder(tmp_path / 'game.mrpl', game, keyframe_interval=32)
+    game.launch_game()
+    assert game.replay is None
+
+    with ReplayReader(tmp_path / 'game.mrpl') as reader:
+        final = reader.seek(reader.last_turn, event_sink=NullEventSink(), rules=RuleSet())
+        assert final.to_dict() == game.to_dict()
@@ -0,0 +1,65 @@
+"""
+Tests for the rule sets.
+"""
+import pytest
+
+from app.Config import Config
+from app.DecisionProvider import AlwaysBuyProvider
+from app.DiePair import DiePair
+from app.EventSink import NullEventSink
+from app.Game import Game
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+
+
+def test_from_config():
+    """
+    The rules of Config are read when the rule set is created.
+    """
+    rules = RuleSet.from_config()
+    assert rules.salary == Config.SALARY
+    assert rules.jail_fine == Config.JAIL_FINE
+    assert rules.die_pools == ((Config.DIE_1_VALUE,), (Config.DIE_2_VALUE,))
+
+    # the standard rules roll real dice
+    assert RuleSet().die_pools is None
+    assert RuleSet()._replace(die_pools=None) == RuleSet()
+
+
+def test_rules_are_immutable():
+    """
+    A rule set cannot be changed once created.
+    """
+    rules = RuleSet()
+    with pytest.raises(AttributeError):
+        rules.salary = 0
+
+
+def test_fixed_dice():
+    """
+    The dice pools of the rules fix the faces of the dice.
+    """
+    die_pair = DiePair(rules=RuleSet(die_pools=((2,), (2,))))
+    die_pair.roll_pair()
+    assert die_pair.get_total_value() == 4
+    assert die_pair.is_double()
+
+
+def test_games_with_different_rules():
+    """
+    Two games with different rules are played side by side.
+    """
+    rich = RuleSet(salary=5000, jail_fine=10, max_round_count=5)
+    poor = RuleSet(salary=100, currency='USD', max_round_count=5)
+
+    games = [Game(2, event_sink=NullEventSink(), decision_providers=[AlwaysBuyProvider()] * 2,
+                  random_streams=RandomStreams(3), rules=rules) for rules in (rich, poor)]
+    assert [game.players[0].balance for game in games] == [5000, 100]
+
+    for game in games:
+        game.launch_game()
+        assert game.current_round <= 6
+
+    # the global defaults are unchanged
+    assert Config.SALARY == 1500
+    assert Game(2).players[0].balance == Config.SALARY
@@ -0,0 +1,230 @@
+"""
+Tests for the archive of saved games.
+"""
+import threading
+
+import pytest
+
+from app.DecisionProvider import AlwaysBuyProvider, NeverBuyProvider
+from app.EventSink import NullEventSink
+from app.Game import Game
+from app.GameCodec import encode_game
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+from app.SaveArchive import SaveArchive, RECORD, fcntl
+from app.SaveIds import parse_save_id
+
+
+def test_put_and_get(tmp_path):
+    """
+    Saves are read back by id, before and after the index is written, and after reopening.
+    """
+    saves = {}
+    with SaveArchive(tmp_path / 'games', flush_threshold=10) as archive:
+        for index in range(25):
+            data = bytes([index]) * (index + 1)
+            saves[archive.put(data)] = data
+        assert all(archive.get(save_id) == data for save_id, data in saves.items())
+        assert archive.get(1) is None
+        assert len(archive) == 25
+
+    with SaveArchive(tmp_path / 'games') as archive:
+        assert all(archive.get(save_id) == data for save_id, data in saves.items())
+        assert list(archive.ids()) == sorted(saves)
+
+
+def test_replace_and_delete(tmp_path):
+    """
+    A save put again with its id replaces the old one, and deleted saves are gone.
+    """
+    with SaveArchive(tmp_path / 'games') as archive:
+        first = archive.put(b'first')
+        second = archive.put(b'second')
+        archive.flush()
+        archive.put(b'again', first)
+        assert archive.delete(second)
+        assert not archive.delete(second)
+        assert archive.get(first) == b'again'
+        assert second not in archive
+
+    with SaveArchive(tmp_path / 'games') as archive:
+        assert list(archive.ids()) == [first]
+        assert archive.get(first) == b'again'
+
+
+def test_ids_range(tmp_path):
+    """
+    The ids of a range are listed in order, from the index and the pending saves alike.
+    """
+    with SaveArchive(tmp_path / 'games') as archive:
+        for save_id in range(10, 20):
+            archive.put(b'written', save_id)
+        archive.flush()
+        for save_id in range(5, 25, 3):
+            archive.put(b'pending', save_id)
+
+        assert list(archive.ids(12, 18)) == [12, 13, 14, 15, 16, 17]
+        assert list(archive.ids(stop=9)) == [5, 8]
+        assert list(archive.ids(20)) == [20, 23]
+        assert list(archive.ids()) == sorted(set(range(10, 20)) | set(range(5, 25, 3)))
+
+
+def test_recovery(tmp_path):
+    """
+    The saves appended after the last flush are found again, and a torn record is dropped.
+    """
+    archive = SaveArchive(tmp_path / 'games')
+    kept = archive.put(b'kept')
+    archive.flush()
+    recovered = archive.put(b'recovered')
+    # a crash before the index is written, in the middle of a record
+    archive._SaveArchive__pack.write(RECORD.pack(b'\0' * 16, 100, 0) + b'torn')
+    # the lock of the pack is released with the process
+    archive._SaveArchive__close_pack_map()
+    archive._SaveArchive__pack.close()
+
+    reopened = SaveArchive(tmp_path / 'games')
+    assert list(reopened.ids()) == [kept, recovered]
+    assert reopened.get(recovered) == b'recovered'
+    size = reopened.pack_path.stat().st_size
+    reopened.put(b'after')
+    reopened.close()
+    assert SaveArchive(tmp_path / 'games').pack_path.stat().st_size == size + RECORD.size + len(b'after')
+
+
+def test_compact(tmp_path):
+    """
+    Compaction keeps the live saves only, and a stale index is not used with the new pack.
+    """
+    with SaveArchive(tmp_path / 'games') as archive:
+        ids = [archive.put(bytes(100)) for _ in range(20)]
+        for save_id in ids[::2]:
+            archive.delete(save_id)
+        archive.put(b'latest', ids[1])
+        size = archive.pack_path.stat().st_size
+
+        archive.compact()
+        assert archive.pack_path.stat().st_size < size / 2
+        assert list(archive.ids()) == ids[1::2]
+        assert archive.get(ids[1]) == b'latest'
+        archive.put(b'new', ids[0])
+
+    # a compaction interrupted before its index is written
+    (tmp_path / 'games.index').write_bytes((tmp_path / 'games.index').read_bytes()[:-1])
+    with SaveArchive(tmp_path / 'games') as archive:
+        assert list(archive.ids()) == sorted(ids[1::2] + [ids[0]])
+        assert archive.get(ids[3]) == bytes(100)
+
+
+@pytest.mark.skipif(fcntl is None, reason='no file locks')
+def test_single_writer(tmp_path):
+    """
+    A second writer waits until the first one closes the archive, then finds its saves.
+    """
+    first = SaveArchive(tmp_path / 'games')
+    save_id = first.put(b'first')
+    found = []
+
+    def write():
+        with SaveArchive(tmp_path / 'games') as second:
+            found.append(second.get(save_id))
+            second.put(b'second')
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    writer.join(0.2)
+    assert writer.is_alive()
+    first.close()
+    writer.join()
+    assert found == [b'first']
+    with SaveArchive(tmp_path / 'games', read_only=True) as archive:
+        assert len(archive) == 2
+
+
+def test_invalid_archive(tmp_path):
+    """
+    Another file is not read as an archive.
+    """
+    (tmp_path / 'games.pack').write_bytes(b'not an archive at all')
+    with pytest.raises(ValueError):
+        SaveArchive(tmp_path / 'games')
+    (tmp_path / 'games.pack').write_bytes(b'MPAK')
+    with pytest.raises(ValueError):
+        SaveArchive(tmp_path / 'games')
+
+
+def test_read_only(tmp_path):
+    """
+    An archive opened read-only is never created, truncated or written to.
+    """
+    with pytest.raises(FileNotFoundError):
+        SaveArchive(tmp_path / 'games', read_only=True)
+
+    archive = SaveArchive(tmp_path / 'games')
+    kept = archive.put(b'kept')
+    archive._SaveArchive__pack.write(RECORD.pack(b'\0' * 16, 100, 0) + b'torn')
+    archive._SaveArchive__pack.flush()
+    size = archive.pack_path.stat().st_size
+
+    with SaveArchive(tmp_path / 'games', read_only=True) as reader:
+        assert list(reader.ids()) == [kept]
+        assert reader.get(kept) == b'kept'
+        with pytest.raises(ValueError):
+            reader.put(b'new')
+        with pytest.raises(ValueError):
+            reader.delete(kept)
+    assert archive.pack_path.stat().st_size == size
+    assert not archive.index_path.exists()
+
+
+def test_save_game(tmp_path):
+    """
+    A game saved to an archive is loaded back by its id.
+    """
+    game = Game(3, event_sink=NullEventSink(), decision_providers=[AlwaysBuyProvider()] * 3,
+                random_streams=RandomStreams(4), rules=RuleSet())
+    for _ in range(12):
+        game.play_turn(game.get_player_by_id(game.current_player_id))
+    with SaveArchive(tmp_path / 'games') as archive:
+        save_id = game.save_game(archive=archive)
+        assert archive.get(parse_save_id(save_id)) == encode_game(game)
+
+    with SaveArchive(tmp_path / 'games') as archive:
+        loaded = archive.load_game(parse_save_id(save_id), event_sink=NullEventSink(), rules=RuleSet())
+        assert loaded.to_dict() == game.to_dict()
+        with pytest.raises(ValueError):
+            archive.load_game(0)
+        with pytest.raises(ValueError):
+            Game(event_sink=NullEventSink()).save_game(file_format='json', archive=archive)
+
+
+class SaveAndExitProvider(NeverBuyProvider):
+    """
+    Saves and exits in the first turn.
+    """
+
+    def should_save_and_exit(self, player) -> bool:
+        return True
+
+
+def test_save_and_exit(tmp_path):
+    """
+    A game with an archive is saved to it when a player saves and exits.
+    """
+    game = Game(2, event_sink=NullEventSink(), decision_providers=[SaveAndExitProvider()] * 2,
+                random_streams=RandomStreams(4), rules=RuleSet())
+    with SaveArchive(tmp_path / 'games') as archive:
+        game.archive = archive
+        game.launch_game()
+        assert game.game_aborted
+        [save_id] = archive.ids()
+        assert archive.get(save_id) == encode_game(game)
+
+    # an archive given by its path is only opened while saving, so it is not left locked
+    game = Game(2, event_sink=NullEventSink(), decision_providers=[SaveAndExitProvider()] * 2,
+                random_streams=RandomStreams(5), rules=RuleSet())
+    game.archive = tmp_path / 'games'
+    game.launch_game()
+    with SaveArchive(tmp_path / 'games') as archive:
+        assert len(archive) == 2
+        assert encode_game(game) in [archive.get(save_id) for save_id in archive.ids()]
@@ -0,0 +1,76 @@
+"""
+Tests for the allocation of save ids.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from app.EventSink import NullEventSink
+from app.Game import Game
+from app.RuleSet import RuleSet
+from app.SaveIds import SaveIdGenerator, new_save_id, format_save_id, parse_save_id
+
+
+def allocate(count: int):
+    """
+    Allocate ids in a worker.
+    """
+    return [new_save_id() for _ in range(count)]
+
+
+def save_games(path: str, count: int):
+    """
+    Save games from a worker.
+    """
+    game = Game(2, event_sink=NullEventSink(), rules=RuleSet())
+    return [game.save_game(path) for _ in range(count)]
+
+
+def test_ids_increase():
+    """
+    The ids of a process always increase, and start with the time.
+    """
+    generator = SaveIdGenerator()
+    ids = [generator.new_id() for _ in range(10000)]
+    assert ids == sorted(set(ids))
+    assert abs((ids[0] >> 80) - time.time() * 1000) < 60000
+
+
+def test_ids_are_unique():
+    """
+    Threads and processes allocating at once never get the same id.
+    """
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        ids = [save_id for batch in executor.map(allocate, [2000] * 8) for save_id in batch]
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        ids += [save_id for batch in executor.map(allocate, [2000] * 8) for save_id in batch]
+    assert len(set(ids)) == len(ids)
+
+
+def test_text():
+    """
+    The text of an id reads back, and sorts like the ids.
+    """
+    ids = [new_save_id() for _ in range(100)] + [0, (1 << 128) - 1]
+    texts = [format_save_id(save_id) for save_id in ids]
+    assert [parse_save_id(text) for text in texts] == ids
+    assert [parse_save_id(text.lower()) for text in texts] == ids
+    assert sorted(texts) == [format_save_id(save_id) for save_id in sorted(ids)]
+
+    for text in ('', 'U' * 26, '8' + 'Z' * 25, '0' * 25):
+        with pytest.raises(ValueError):
+            parse_save_id(text)
+
+
+def test_concurrent_saves(tmp_path):
+    """
+    Processes saving at once all get their own file.
+    """
+    (tmp_path / 'saved_games').mkdir()
+    prefix = f'{tmp_path}/'
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        names = [name for batch in executor.map(save_games, [prefix] * 8, [25] * 8) for name in batch]
+
+    assert len(set(names)) == 200
+    assert len(list((tmp_path / 'saved_games').iterdir())) == 200
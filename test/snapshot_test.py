@@ -0,0 +1,102 @@
+"""
+Tests for the snapshots and clones of games.
+"""
+from app.DecisionProvider import AlwaysBuyProvider, ThresholdBuyProvider, JailStrategy
+from app.EventSink import NullEventSink
+from app.Game import Game
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+
+
+def new_game(seed: int = 3) -> Game:
+    """
+    A game with real dice and bots.
+    """
+    providers = [AlwaysBuyProvider(jail_strategy=JailStrategy.FEELING_LUCKY), ThresholdBuyProvider(reserve=300),
+                 AlwaysBuyProvider()]
+    return Game(3, event_sink=NullEventSink(), decision_providers=providers, random_streams=RandomStreams(seed),
+                rules=RuleSet())
+
+
+def play_turns(game: Game, turns: int):
+    """
+    Play a number of turns, or until the game is over.
+    """
+    for _ in range(turns):
+        if game.is_game_over():
+            return
+        player = game.get_player_by_id(game.current_player_id)
+        if player.has_exited:
+            game.end_turn()
+        else:
+            game.play_turn(player)
+
+
+def test_restore():
+    """
+    A restored game plays the same turns again.
+    """
+    game = new_game()
+    play_turns(game, 20)
+
+    snapshot = game.snapshot()
+    play_turns(game, 40)
+    expected = game.to_dict()
+
+    game.restore(snapshot)
+    play_turns(game, 40)
+    assert game.to_dict() == expected
+
+
+def test_restore_exited_players():
+    """
+    Restoring a snapshot brings exited players and their properties back.
+    """
+    game = new_game()
+    play_turns(game, 20)
+    assert len(game.get_active_players()) == 3
+    snapshot = game.snapshot()
+    properties = game.to_dict()['players'][0]['properties']
+    assert properties
+
+    game.players[0].exit_game()
+    assert len(game.get_active_players()) == 2
+
+    game.restore(snapshot)
+    assert len(game.get_active_players()) == 3
+    assert game.to_dict()['players'][0]['properties'] == properties
+
+
+def test_clone():
+    """
+    A clone plays exactly like the original game, without changing it.
+    """
+    game = new_game()
+    play_turns(game, 25)
+    before = game.to_dict()
+
+    clone = game.clone()
+    assert clone.to_dict() == before
+    play_turns(clone, 60)
+    assert game.to_dict() == before
+
+    play_turns(game, 60)
+    assert game.to_dict() == clone.to_dict()
+
+
+def test_clone_with_new_streams():
+    """
+    A clone with its own random streams explores another future.
+    """
+    game = new_game()
+    play_turns(game, 25)
+    before = game.to_dict()
+
+    futures = []
+    for index in range(5):
+        clone = game.clone(random_streams=RandomStreams(index))
+        play_turns(clone, 30)
+        futures.append(clone.to_dict())
+
+    assert game.to_dict() == before
+    assert len({str(future) for future in futures}) > 1
@@ -0,0 +1,49 @@
+"""
+Tests for the transposition table.
+"""
+import pytest
+
+from app.TranspositionTable import TranspositionTable
+
+
+def test_lookup():
+    """
+    A value is found for its key, searched at least as deep.
+    """
+    table = TranspositionTable(size_bits=4)
+    table.store(12345, 3, 0.25)
+
+    assert table.lookup(12345, 3) == 0.25
+    assert table.lookup(12345, 2) == 0.25
+    assert table.lookup(12345, 4) is None
+    assert table.lookup(54321, 1) is None
+    assert (table.hits, table.misses) == (2, 2)
+
+
+def test_replacement():
+    """
+    The deepest search of a bucket is kept, the latest shallow one takes the other entry.
+    """
+    table = TranspositionTable(size_bits=2)
+    # the same bucket: equal low bits
+    deep, shallow, newer = 1 << 10, 2 << 10, 3 << 10
+    table.store(deep, 5, 1.0)
+    table.store(shallow, 1, 2.0)
+    table.store(newer, 2, 3.0)
+
+    assert table.lookup(deep, 5) == 1.0
+    assert table.lookup(shallow, 1) is None
+    assert table.lookup(newer, 2) == 3.0
+    assert table.replacements == 1
+    assert len(table) == 2
+
+    # a deeper search takes the first entry
+    table.store(shallow, 6, 4.0)
+    assert table.lookup(shallow, 6) == 4.0
+
+    table.clear()
+    assert len(table) == 0
+    assert table.lookup(shallow, 0) is None
+
+    with pytest.raises(ValueError):
+        TranspositionTable(size_bits=40)
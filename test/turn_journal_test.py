@@ -0,0 +1,119 @@
+"""
+Tests for the journal of the turns of a live game.
+"""
+import pytest
+
+from app.DecisionProvider import AlwaysBuyProvider, JailStrategy
+from app.EventSink import NullEventSink
+from app.Game import Game
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+from app.TurnJournal import TurnJournal, find_journals, recover_game, FRAME
+
+
+def new_game(seed: int = 3) -> Game:
+    providers = [AlwaysBuyProvider(jail_strategy=JailStrategy.FEELING_LUCKY)] + [AlwaysBuyProvider()] * 3
+    return Game(4, event_sink=NullEventSink(), decision_providers=providers, random_streams=RandomStreams(seed),
+                rules=RuleSet())
+
+
+def play(game: Game, turns: int):
+    for _ in range(turns):
+        if game.is_game_over():
+            break
+        player = game.get_player_by_id(game.current_player_id)
+        if player.has_exited:
+            game.end_turn()
+        else:
+            game.play_turn(player)
+
+
+def recover(path) -> Game:
+    return recover_game(path, event_sink=NullEventSink(), rules=RuleSet())
+
+
+def test_recover(tmp_path):
+    """
+    A game is resumed in the state of its last written turn, across checkpoints.
+    """
+    for turns in (0, 1, 7, 30, 100, 300):
+        game = new_game()
+        journal = TurnJournal(tmp_path / 'live', game, checkpoint_interval=40, sync_every=4)
+        play(game, turns)
+        journal.close()
+
+        assert recover(tmp_path / 'live').to_dict() == game.to_dict()
+        assert journal.turn - journal.snapshot_turn < 40
+
+
+def test_unsynced_turns(tmp_path):
+    """
+    The turns not yet written are lost in a crash, the written ones are not.
+    """
+    game = new_game()
+    journal = TurnJournal(tmp_path / 'live', game, sync_every=8)
+    play(game, 8)
+    expected = game.to_dict()
+    play(game, 5)
+
+    assert journal.turn == 13
+    assert recover(tmp_path / 'live').to_dict() == expected
+
+
+def test_torn_record(tmp_path):
+    """
+    A record torn by a crash ends the journal.
+    """
+    game = new_game()
+    journal = TurnJournal(tmp_path / 'live', game, sync_every=1)
+    play(game, 10)
+    expected = game.to_dict()
+    journal.close()
+    with journal.journal_path.open('ab') as f:
+        f.write(FRAME.pack(30, 0) + b'torn')
+
+    assert recover(tmp_path / 'live').to_dict() == expected
+
+
+def test_stale_journal(tmp_path):
+    """
+    The records of a journal which was not restarted after its snapshot are skipped.
+    """
+    game = new_game()
+    journal = TurnJournal(tmp_path / 'live', game, sync_every=1)
+    play(game, 10)
+    journal.close()
+    stale = journal.journal_path.read_bytes()
+
+    journal = TurnJournal(tmp_path / 'live', game, sync_every=1)
+    journal.turn = 10
+    journal.checkpoint(game)
+    journal.close()
+    # a crash between the snapshot and the restart of the journal
+    journal.journal_path.write_bytes(stale)
+
+    assert recover(tmp_path / 'live').to_dict() == game.to_dict()
+
+
+def test_launch_game(tmp_path):
+    """
+    A journaled game is resumed from its files, which are removed once it is over.
+    """
+    game = new_game(5)
+    TurnJournal(tmp_path / 'live', game, sync_every=1)
+    play(game, 20)
+    assert find_journals(tmp_path) == [tmp_path / 'live']
+
+    resumed = recover(tmp_path / 'live')
+    TurnJournal(tmp_path / 'live', resumed)
+    resumed.launch_game()
+    assert resumed.journal is None
+    assert find_journals(tmp_path) == []
+
+
+def test_invalid_intervals(tmp_path):
+    """
+    A journal writes at least every turn.
+    """
+    with pytest.raises(ValueError):
+        TurnJournal(tmp_path / 'live', new_game(), sync_every=0)
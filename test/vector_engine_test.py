@@ -0,0 +1,117 @@
+"""
+Tests for the vectorized engine. It must agree with the object engine.
+"""
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from app.DecisionProvider import AlwaysBuyProvider, NeverBuyProvider, ThresholdBuyProvider, JailStrategy, \
+    RandomDecisionProvider
+from app.DiePair import DiePair
+from app.EventSink import NullEventSink
+from app.Game import Game
+from app.RandomStreams import RandomStreams
+from app.VectorEngine import VectorEngine, NO_OWNER
+
+
+class ScriptedDiePair(DiePair):
+    """
+    Rolls the dice values of a stream.
+    """
+
+    def __init__(self, rolls):
+        super().__init__()
+        self.rolls = iter(rolls.tolist())
+
+    def roll_pair(self):
+        self.die1.value, self.die2.value = next(self.rolls)
+
+
+class ScriptedChance:
+    """
+    Picks from a sequence with the uniform numbers of a stream.
+    """
+
+    def __init__(self, values):
+        self.values = iter(values.ravel().tolist())
+
+    def choice(self, seq):
+        return seq[int(next(self.values) * len(seq))]
+
+
+def play_object_game(providers, dice, chance) -> Game:
+    """
+    Play one game with the object engine, drawing from the given streams.
+    """
+    random_streams = RandomStreams(0)
+    random_streams.chance = ScriptedChance(chance)
+    game = Game(len(providers), event_sink=NullEventSink(), decision_providers=providers,
+                random_streams=random_streams)
+    game.die_pair = ScriptedDiePair(dice)
+    game.launch_game()
+    return game
+
+
+@pytest.mark.parametrize('providers', [
+    [AlwaysBuyProvider(jail_strategy=JailStrategy.FEELING_LUCKY), NeverBuyProvider()],
+    [AlwaysBuyProvider(), ThresholdBuyProvider(reserve=300, pay_bail_now=False),
+     ThresholdBuyProvider(reserve=0, jail_strategy=JailStrategy.FEELING_LUCKY)],
+    [AlwaysBuyProvider(pay_bail_now=False)] * 4,
+])
+def test_matches_object_engine(providers):
+    """
+    On identical dice and chance streams, both engines end every game in the same state.
+    """
+    game_count = 25
+    rng = np.random.default_rng(len(providers))
+    dice = rng.integers(1, 5, size=(game_count, 500, 2))
+    chance = rng.random((game_count, 500, 2))
+
+    engine = VectorEngine(game_count, providers, dice=dice, chance=chance)
+    engine.run()
+    winners = engine.get_winners()
+
+    bankruptcies = 0
+    for g in range(game_count):
+        game = play_object_game(providers, dice[g], chance[g])
+
+        assert engine.end_round[g] == game.current_round
+        assert engine.end_player_id[g] == game.current_player_id
+        for seat, player in enumerate(game.players):
+            assert engine.balances[g, seat] == player.balance
+            assert engine.positions[g, seat] == player.square_position
+            assert engine.is_jailed[g, seat] == player.is_jailed
+            assert engine.move_count_since_jail[g, seat] == player.move_count_since_jail
+            assert engine.jail_bail_mode[g, seat] == player.jail_bail_mode
+            assert engine.jail_feeling_lucky_mode[g, seat] == player.jail_feeling_lucky_mode
+            assert engine.has_exited[g, seat] == player.has_exited
+            bankruptcies += player.has_exited
+
+        for index, square in enumerate(game.board.squares):
+            owner = getattr(square, 'owner_token', None)
+            expected = NO_OWNER if owner is None else game.get_player(owner).player_id
+            assert engine.owners[g, index] == expected
+
+        assert [p.token for p in game.players if winners[g, p.player_id]] == [w.token for w in game.get_winners()]
+
+    # the streams exercise bankruptcy too.
+    assert bankruptcies > 0
+
+
+def test_random_run():
+    """
+    Without streams, the engine draws its own dice and finishes every game.
+    """
+    engine = VectorEngine(200, [AlwaysBuyProvider(), ThresholdBuyProvider()], seed=3)
+    engine.run()
+
+    assert (engine.end_round > 0).all()
+    assert engine.get_winners().any(axis=1).all()
+
+
+def test_unsupported_provider():
+    """
+    Only the deterministic bots can be vectorized.
+    """
+    with pytest.raises(ValueError):
+        VectorEngine(1, [RandomDecisionProvider(), AlwaysBuyProvider()])
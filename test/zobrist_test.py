@@ -0,0 +1,126 @@
+"""
+Tests for the Zobrist hashes of games.
+"""
+import pytest
+
+from app.DecisionProvider import AlwaysBuyProvider, NeverBuyProvider
+from app.EventSink import NullEventSink
+from app.Game import Game
+from app.Player import HashedPlayer
+from app.RandomStreams import RandomStreams
+from app.RuleSet import RuleSet
+
+
+def new_game(seed: int = 2) -> Game:
+    """
+    A game which hashes its state.
+    """
+    return Game(3, event_sink=NullEventSink(), decision_providers=[AlwaysBuyProvider()] * 3,
+                random_streams=RandomStreams(seed), rules=RuleSet(), hash_state=True)
+
+
+def play_turns(game: Game, turns: int):
+    """
+    Play a number of turns, or until the game is over.
+    """
+    for _ in range(turns):
+        if game.is_game_over():
+            return
+        player = game.get_player_by_id(game.current_player_id)
+        if player.has_exited:
+            game.end_turn()
+        else:
+            game.play_turn(player)
+
+
+def rebuilt_hash(game: Game) -> int:
+    """
+    The hash of a fresh game put in the same state.
+    """
+    fresh = Game(3, event_sink=NullEventSink(), rules=RuleSet(), hash_state=True)
+    fresh.restore(game.snapshot(with_random=False))
+    return fresh.get_state_hash()
+
+
+def test_incremental_hash():
+    """
+    The hash kept up to date along a game is the one of its state, however it was reached.
+    """
+    game = new_game()
+    assert isinstance(game.players[0], HashedPlayer)
+    for _ in range(30):
+        play_turns(game, 7)
+        assert game.get_state_hash() == rebuilt_hash(game)
+
+
+def test_hash_changes_with_the_state():
+    """
+    Moves, purchases, balance changes and jail transitions all change the hash, and undoing them restores it.
+    """
+    game = new_game()
+    player = game.players[1]
+    initial_hash = game.get_state_hash()
+
+    changes = [
+        lambda: setattr(player, 'square_position', 5),
+        lambda: player.buy_property(game.board.get_square(2)),
+        lambda: setattr(player, 'balance', player.balance - 10),
+        player.go_to_jail,
+        lambda: setattr(player, 'jail_bail_mode', True),
+    ]
+    hashes = {initial_hash}
+    for change in changes:
+        snapshot = game.snapshot(with_random=False)
+        change()
+        assert game.get_state_hash() not in hashes
+        hashes.add(game.get_state_hash())
+        game.restore(snapshot)
+        assert game.get_state_hash() == initial_hash
+
+
+def test_transposition():
+    """
+    Two players swapping the order of their moves reach the same hash.
+    """
+    game = new_game()
+    first, second = game.players[0], game.players[1]
+    snapshot = game.snapshot(with_random=False)
+
+    first.move_and_land_on_square(3)
+    second.move_and_land_on_square(6)
+    one_order = game.get_state_hash()
+
+    game.restore(snapshot)
+    second.move_and_land_on_square(6)
+    first.move_and_land_on_square(3)
+    assert game.get_state_hash() == one_order
+
+
+def test_clone_and_plain_games():
+    """
+    A clone keeps hashing like its game, and a plain game has no hash.
+    """
+    game = new_game()
+    play_turns(game, 10)
+    assert game.clone().get_state_hash() == game.get_state_hash()
+
+    plain = Game(2, event_sink=NullEventSink(), decision_providers=[NeverBuyProvider()] * 2, rules=RuleSet())
+    with pytest.raises(ValueError):
+        plain.get_state_hash()
+    fresh = Game(2, event_sink=NullEventSink(), rules=RuleSet(), hash_state=True)
+    assert plain.clone(hash_state=True).get_state_hash() == fresh.get_state_hash()
+
+
+def test_plain_games_skip_the_ownership_hash():
+    """
+    Only the games which hash their state hash who owns what, and a hashed clone of a plain game starts right.
+    """
+    plain = Game(3, event_sink=NullEventSink(), decision_providers=[AlwaysBuyProvider()] * 3,
+                 random_streams=RandomStreams(2), rules=RuleSet())
+    play_turns(plain, 30)
+    assert plain.board.ownership.count_owned() > 0
+    assert plain.board.ownership.hash == 0
+
+    hashed = new_game(2)
+    play_turns(hashed, 30)
+    assert plain.clone(hash_state=True).get_state_hash() == hashed.get_state_hash()